@@ -0,0 +1,60 @@
+'''
+Benchmark how `batch_reduce` scales with the number of extracts.
+
+Synthetic `question_extractor` extracts are built with a fixed number of
+classifications per subject, so the number of subjects grows with the
+number of rows.  The run time per row should stay roughly flat as the
+size increases.
+
+Usage: python benchmarks/batch_reduce_scaling.py [max_rows]
+'''
+import sys
+import time
+import numpy as np
+import pandas
+from panoptes_aggregation.scripts.batch_utils import batch_reduce
+
+CLASSIFICATIONS_PER_SUBJECT = 10
+TASKS = ['T0', 'T1']
+
+
+def make_extracts(number_of_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    rows_per_task = number_of_rows // len(TASKS)
+    subject_id = np.arange(rows_per_task) // CLASSIFICATIONS_PER_SUBJECT
+    user_id = np.arange(rows_per_task) % CLASSIFICATIONS_PER_SUBJECT
+    created_at = pandas.Timestamp('2020-01-01', tz='UTC') + pandas.to_timedelta(user_id, unit='s')
+    answers = rng.integers(0, 2, rows_per_task)
+    frames = []
+    for task in TASKS:
+        frames.append(pandas.DataFrame({
+            'classification_id': np.arange(rows_per_task),
+            'user_name': user_id,
+            'user_id': user_id,
+            'workflow_id': 1,
+            'task': task,
+            'created_at': created_at,
+            'subject_id': subject_id,
+            'extractor': 'question_extractor',
+            'data.yes': np.where(answers == 1, 1.0, np.nan),
+            'data.no': np.where(answers == 0, 1.0, np.nan)
+        }))
+    return pandas.concat(frames, ignore_index=True)
+
+
+def main(max_rows=64000):
+    config = {'reducer_config': {'question_reducer': {}}}
+    print(f'{"rows":>10} {"subjects":>10} {"seconds":>10} {"us/row":>10}')
+    number_of_rows = 1000
+    while number_of_rows <= max_rows:
+        extracts = make_extracts(number_of_rows)
+        start = time.perf_counter()
+        batch_reduce(extracts, config, hide_progressbar=True)
+        elapsed = time.perf_counter() - start
+        number_of_subjects = extracts.subject_id.nunique()
+        print(f'{number_of_rows:>10} {number_of_subjects:>10} {elapsed:>10.2f} {1e6 * elapsed / number_of_rows:>10.1f}')
+        number_of_rows *= 2
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,80 @@
+'''
+Benchmark the size and load time of extraction files saved as csv and parquet.
+
+Synthetic `point_extractor_by_frame` extracts (lists of `x` and `y` values
+for a few tools) are flattened the same way `extract_csv` does and saved
+in both formats.  The load time includes turning each row back into the
+nested extract (as `reduce_csv` does before reducing).
+
+Usage: python benchmarks/extract_file_format.py [number_of_rows]
+'''
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas
+from panoptes_aggregation.csv_utils import flatten_data, unflatten_dataframe
+from panoptes_aggregation.parquet_utils import read_parquet, write_parquet
+
+TOOLS = ['T0_tool0', 'T0_tool1', 'T0_tool2']
+
+
+def make_extracts(number_of_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    data = []
+    for _ in range(number_of_rows):
+        frame = {}
+        for tool in TOOLS:
+            number_of_points = rng.integers(0, 8)
+            frame['{0}_x'.format(tool)] = rng.uniform(0, 1000, number_of_points).round(2).tolist()
+            frame['{0}_y'.format(tool)] = rng.uniform(0, 1000, number_of_points).round(2).tolist()
+        data.append({'frame0': frame})
+    return flatten_data(pandas.DataFrame({
+        'classification_id': np.arange(number_of_rows),
+        'user_name': ['user{0}'.format(i % 100) for i in range(number_of_rows)],
+        'user_id': np.arange(number_of_rows) % 100,
+        'workflow_id': 1,
+        'task': 'T0',
+        'created_at': '2020-01-01 00:00:00 UTC',
+        'subject_id': np.arange(number_of_rows) // 10,
+        'extractor': 'point_extractor_by_frame',
+        'data': data
+    }))
+
+
+def main(number_of_rows=100000):
+    extracts = make_extracts(number_of_rows)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'extractions.csv')
+        parquet_path = os.path.join(directory, 'extractions.parquet')
+        timings = {}
+        start = time.perf_counter()
+        extracts.to_csv(csv_path, index=False, encoding='utf-8')
+        timings['csv write'] = time.perf_counter() - start
+        start = time.perf_counter()
+        write_parquet(extracts, parquet_path)
+        timings['parquet write'] = time.perf_counter() - start
+        start = time.perf_counter()
+        unflatten_dataframe(pandas.read_csv(csv_path, parse_dates=['created_at'], encoding='utf-8'))
+        timings['csv load'] = time.perf_counter() - start
+        start = time.perf_counter()
+        extracted = read_parquet(parquet_path)
+        extracted['created_at'] = pandas.to_datetime(extracted.created_at)
+        unflatten_dataframe(extracted)
+        timings['parquet load'] = time.perf_counter() - start
+        sizes = {
+            'csv': os.path.getsize(csv_path) / 1e6,
+            'parquet': os.path.getsize(parquet_path) / 1e6
+        }
+    print(f'{number_of_rows} rows')
+    print(f'{"format":>10} {"MB":>10} {"write (s)":>10} {"load (s)":>10}')
+    for file_format in ['csv', 'parquet']:
+        print(
+            f'{file_format:>10} {sizes[file_format]:>10.1f} '
+            f'{timings[file_format + " write"]:>10.2f} {timings[file_format + " load"]:>10.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,52 @@
+'''
+Benchmark the cold start of a web worker.
+
+Each module is imported in a fresh interpreter and the wall time of the
+import and the peak resident memory of the process are recorded.  With the
+lazy extractor and reducer registries, importing `panoptes_aggregation.routes`
+and building the flask app should not import any of the clustering or text
+alignment libraries.
+
+Usage: python benchmarks/import_time.py [repeats]
+'''
+import subprocess
+import sys
+
+MODULES = [
+    ('panoptes_aggregation', 'import panoptes_aggregation'),
+    ('panoptes_aggregation.routes', 'import panoptes_aggregation.routes'),
+    ('make_application', 'import panoptes_aggregation.routes as r; r.make_application()'),
+    ('all reducers loaded', 'import panoptes_aggregation as p; [p.reducers.reducers[r] for r in p.reducers.reducers]'),
+]
+
+TEMPLATE = '''
+import resource, sys, time
+start = time.perf_counter()
+{0}
+elapsed = time.perf_counter() - start
+heavy = [m for m in ('sklearn', 'hdbscan', 'collatex', 'shapely', 'bezier') if m in sys.modules]
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, ','.join(heavy) or '-')
+'''
+
+
+def run(statement):
+    output = subprocess.run(
+        [sys.executable, '-c', TEMPLATE.format(statement)],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout.split()
+    return float(output[0]), float(output[1]), output[2]
+
+
+def main(repeats=5):
+    print(f'{"import":<28} {"seconds":>10} {"RSS (MB)":>10}  heavy modules loaded')
+    for name, statement in MODULES:
+        results = [run(statement) for _ in range(repeats)]
+        elapsed = min(r[0] for r in results)
+        rss = min(r[1] for r in results)
+        print(f'{name:<28} {elapsed:>10.2f} {rss:>10.1f}  {results[0][2]}')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,57 @@
+'''
+Benchmark the rasterisation used by `polygon_reducer_contours`.
+
+A cluster of jittered circles is rasterised at increasing `num_grid_points`,
+once by testing every grid point against every polygon with
+`shapely.contains_xy` (the old approach) and once with
+`_add_polygon_to_grid`.  The two grids of intersection counts must match.
+
+Usage: python benchmarks/polygon_rasterisation.py [polygons] [vertices]
+'''
+import sys
+import time
+import numpy as np
+import shapely
+from panoptes_aggregation.reducers.polygon_reducer_utils import _add_polygon_to_grid
+
+
+def make_polygons(number_of_polygons, number_of_vertices, seed=0):
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(0, 2 * np.pi, number_of_vertices, endpoint=False)
+    polygons = []
+    for _ in range(number_of_polygons):
+        center = rng.normal(0, 0.3, 2)
+        radius = 3 + rng.normal(0, 0.2, number_of_vertices)
+        polygons.append(shapely.Polygon(np.array([
+            center[0] + radius * np.cos(angles),
+            center[1] + radius * np.sin(angles)
+        ]).T))
+    return polygons
+
+
+def main(number_of_polygons=30, number_of_vertices=60):
+    polygons = make_polygons(number_of_polygons, number_of_vertices)
+    bounds = shapely.bounds(polygons)
+    for num_grid_points in [100, 300, 1000]:
+        x_values = np.linspace(bounds[:, 0].min(), bounds[:, 2].max(), num_grid_points)
+        y_values = np.linspace(bounds[:, 1].min(), bounds[:, 3].max(), num_grid_points)
+        x_grid, y_grid = np.meshgrid(x_values, y_values)
+
+        start = time.perf_counter()
+        z_full = np.zeros(np.shape(x_grid))
+        for polygon in polygons:
+            z_full += shapely.contains_xy(polygon, x_grid, y_grid)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        z_scanline = np.zeros(np.shape(x_grid))
+        for polygon in polygons:
+            _add_polygon_to_grid(polygon, x_values, y_values, z_scanline)
+        scanline_time = time.perf_counter() - start
+
+        assert np.array_equal(z_full, z_scanline)
+        print(f'{num_grid_points:>5} grid points: contains_xy {full_time:8.3f} s, scanline {scanline_time:8.3f} s')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,83 @@
+'''
+Benchmark the IoU distances found by `polygon_reducer` for a dense subject.
+
+Each volunteer outlines the same grid of objects with some jitter, so every
+object makes one cluster with one polygon per volunteer.  The time to find
+all the IoU distances once (`IoU_distance_graph_polygon`) is compared with
+the time `IoU_distance_matrix_of_cluster` takes to find each cluster's
+distance matrix again from the polygons, followed by the full reducer run.
+
+Usage: python benchmarks/polygon_reducer_distances.py [volunteers] [objects]
+'''
+import sys
+import time
+import numpy as np
+from panoptes_aggregation.reducers.polygon_reducer import polygon_reducer, process_data
+from panoptes_aggregation.reducers.polygon_reducer_utils import (
+    IoU_distance_graph_polygon,
+    IoU_distance_matrix_of_cluster,
+    IoU_precomputed_distances_polygon
+)
+from sklearn.cluster import DBSCAN
+
+
+def make_extracts(number_of_volunteers, number_of_objects, seed=0):
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(number_of_objects)))
+    angles = np.linspace(0, 2 * np.pi, 40, endpoint=False)
+    extracts = []
+    for _ in range(number_of_volunteers):
+        path_x = []
+        path_y = []
+        for index in range(number_of_objects):
+            center = 10 * np.array([index % side, index // side]) + rng.normal(0, 0.3, 2)
+            radius = 3 + rng.normal(0, 0.2, len(angles))
+            path_x.append((center[0] + radius * np.cos(angles)).tolist())
+            path_y.append((center[1] + radius * np.sin(angles)).tolist())
+        extracts.append({'frame0': {'T0_toolIndex0_pathX': path_x, 'T0_toolIndex0_pathY': path_y}})
+    return extracts
+
+
+def main(number_of_volunteers=20, number_of_objects=100):
+    extracts = make_extracts(number_of_volunteers, number_of_objects)
+    value = process_data(extracts)['frame0']['T0_toolIndex0']
+    X = np.array(value['X'])
+    data = np.array(value['data'])
+    print(f'{len(X)} polygons')
+
+    start = time.perf_counter()
+    distance_graph = IoU_distance_graph_polygon(X, data)
+    graph_time = time.perf_counter() - start
+    labels = DBSCAN(eps=0.5, min_samples=2, metric='precomputed').fit(
+        IoU_precomputed_distances_polygon(X, data, 0.5, distance_graph=distance_graph)
+    ).labels_
+    cluster_masks = [labels == label for label in set(labels) if label > -1]
+
+    start = time.perf_counter()
+    for cdx in cluster_masks:
+        IoU_distance_matrix_of_cluster(cdx, X, data)
+    recompute_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for cdx in cluster_masks:
+        IoU_distance_matrix_of_cluster(cdx, X, data, distance_graph=distance_graph)
+    slice_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    polygon_reducer._original(
+        {'frame0': {'T0_toolIndex0': value}},
+        eps=0.5,
+        min_samples=2,
+        created_at=list(range(number_of_volunteers))
+    )
+    reducer_time = time.perf_counter() - start
+
+    print(f'{len(cluster_masks)} clusters')
+    print(f'{"all pairwise distances once":<40} {graph_time:8.3f} s')
+    print(f'{"cluster matrices found again":<40} {recompute_time:8.3f} s')
+    print(f'{"cluster matrices sliced from distances":<40} {slice_time:8.3f} s')
+    print(f'{"polygon_reducer":<40} {reducer_time:8.3f} s')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,61 @@
+'''
+Benchmark the word alignment backends used by the text reducers.
+
+Each line of text is transcribed by a number of volunteers who each drop,
+swap, and add a few words.  Every line is aligned with both the `collatex`
+and `numpy` backends of `align_texts`, the time per line is reported for
+each, and the alignments are checked to be the same.
+
+Usage: python benchmarks/text_alignment.py [lines] [volunteers] [words]
+'''
+import sys
+import time
+import numpy as np
+from panoptes_aggregation.reducers.text_alignment import align_texts
+
+
+def make_lines(number_of_lines, number_of_volunteers, number_of_words, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = [
+        'the', 'of', 'and', 'a', 'to', 'in', 'is', 'was', 'teh', 'that', 'for', 'it',
+        'with', 'as', 'his', 'on', 'be', 'at', 'by', 'had', '<sw>an</sw>', '<del>it</del>'
+    ]
+    lines = []
+    for _ in range(number_of_lines):
+        base = rng.choice(vocabulary, size=number_of_words)
+        texts = []
+        for _ in range(number_of_volunteers):
+            words = []
+            for word in base:
+                draw = rng.random()
+                if draw < 0.05:
+                    continue
+                if draw < 0.1:
+                    words.append(rng.choice(vocabulary))
+                elif draw < 0.12:
+                    words += [word, rng.choice(vocabulary)]
+                else:
+                    words.append(word)
+            texts.append(' '.join(words))
+        lines.append(texts)
+    return lines
+
+
+def main(number_of_lines=50, number_of_volunteers=10, number_of_words=12):
+    lines = make_lines(number_of_lines, number_of_volunteers, number_of_words)
+    timings = {}
+    alignments = {}
+    for backend in ['collatex', 'numpy']:
+        start = time.perf_counter()
+        alignments[backend] = [align_texts(texts, backend) for texts in lines]
+        timings[backend] = (time.perf_counter() - start) / number_of_lines
+    same = sum(a == b for a, b in zip(alignments['collatex'], alignments['numpy']))
+    print(f'{number_of_lines} lines, {number_of_volunteers} volunteers, {number_of_words} words')
+    for backend, timing in timings.items():
+        print(f'{backend:<10} {1000 * timing:8.2f} ms per line')
+    print(f'speedup    {timings["collatex"] / timings["numpy"]:8.1f} x')
+    print(f'same alignment for {same} of {number_of_lines} lines')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
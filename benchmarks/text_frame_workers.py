@@ -0,0 +1,87 @@
+'''
+Benchmark reducing the frames of a multi-page transcription subject in parallel.
+
+Each volunteer transcribes every line on every page of the subject, with a
+little jitter in the line positions and a few changed words.  The subject is
+reduced by `poly_line_text_reducer` and `optics_line_text_reducer` with the
+frames reduced one at a time and with `frame_workers` processes, and the
+reductions are checked to be the same.
+
+Usage: python benchmarks/text_frame_workers.py [frames] [lines_per_frame] [volunteers]
+'''
+import os
+import sys
+import time
+import numpy as np
+from panoptes_aggregation.reducers.poly_line_text_reducer import poly_line_text_reducer
+from panoptes_aggregation.reducers.optics_line_text_reducer import optics_line_text_reducer
+
+
+def make_extracts(number_of_frames, lines_per_frame, number_of_volunteers, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = ['the', 'of', 'and', 'a', 'to', 'in', 'is', 'was', 'that', 'for', 'received', 'paid', 'by', 'cash']
+    pages = [
+        [' '.join(rng.choice(vocabulary, size=rng.integers(4, 10))) for _ in range(lines_per_frame)]
+        for _ in range(number_of_frames)
+    ]
+    extracts = []
+    for _ in range(number_of_volunteers):
+        extract = {}
+        for frame, page in enumerate(pages):
+            x = []
+            y = []
+            text = []
+            for line_number, line in enumerate(page):
+                words = [
+                    rng.choice(vocabulary) if rng.random() < 0.05 else word
+                    for word in line.split()
+                ]
+                x_start, x_end = 100 + rng.normal(0, 5), 1500 + rng.normal(0, 5)
+                y_line = 100 + 60 * line_number
+                x.append([x_start, x_end])
+                y.append([y_line + rng.normal(0, 3), y_line + rng.normal(0, 3)])
+                text.append([' '.join(words)])
+            extract[f'frame{frame}'] = {
+                'points': {'x': x, 'y': y},
+                'text': text,
+                'slope': np.rad2deg(np.arctan2(
+                    [y_line[1] - y_line[0] for y_line in y],
+                    [x_line[1] - x_line[0] for x_line in x]
+                )).tolist(),
+                'gold_standard': False
+            }
+        extracts.append(extract)
+    return extracts
+
+
+def time_reducer(reducer, extracts, **kwargs):
+    start = time.perf_counter()
+    reduction = reducer(extracts, user_id=list(range(len(extracts))), **kwargs)
+    return reduction, time.perf_counter() - start
+
+
+def main(number_of_frames=20, lines_per_frame=15, number_of_volunteers=5):
+    extracts = make_extracts(number_of_frames, lines_per_frame, number_of_volunteers)
+    print(f'{number_of_frames} frames, {lines_per_frame} lines per frame, {number_of_volunteers} volunteers')
+    print(f'{os.cpu_count()} CPUs')
+    worker_counts = sorted({2, 4, os.cpu_count() or 1} - {1})
+    reducers = [
+        ('poly_line_text_reducer', poly_line_text_reducer, {'process_by_line': True, 'dot_freq': 'line', 'min_samples': 2}),
+        ('optics_line_text_reducer', optics_line_text_reducer, {})
+    ]
+    for name, reducer, kwargs in reducers:
+        serial, serial_time = time_reducer(reducer, extracts, **kwargs)
+        serial.pop('parameters', None)
+        print(name)
+        print(f'  {"frame_workers=1":<18} {serial_time:8.3f} s')
+        for frame_workers in worker_counts:
+            parallel, parallel_time = time_reducer(reducer, extracts, frame_workers=frame_workers, **kwargs)
+            parallel.pop('parameters', None)
+            print(
+                f'  {f"frame_workers={frame_workers}":<18} {parallel_time:8.3f} s '
+                f'({serial_time / parallel_time:.1f}x, same reduction: {parallel == serial})'
+            )
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
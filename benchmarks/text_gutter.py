@@ -0,0 +1,54 @@
+'''
+Benchmark `text_utils.gutter` on a dense newspaper page.
+
+The page has a number of columns of text, each with many transcribed lines
+that start and end a little inside the column edges.  The time taken by
+`gutter` is compared with merging the line extents one at a time
+(`_gutter_in_order`, the method `gutter` used before), and the labels from
+both are checked to be the same.
+
+Usage: python benchmarks/text_gutter.py [columns] [lines_per_column]
+'''
+import sys
+import time
+import numpy as np
+from panoptes_aggregation.reducers.text_utils import gutter, _gutter_in_order
+
+
+def make_lines(number_of_columns, lines_per_column, seed=0):
+    rng = np.random.default_rng(seed)
+    column_width = 400
+    column_gap = 40
+    lines = []
+    for column in range(number_of_columns):
+        left = column * (column_width + column_gap)
+        for _ in range(lines_per_column):
+            start = left + rng.uniform(0, 30)
+            end = left + column_width - rng.uniform(0, 150)
+            words = np.sort(rng.uniform(start, end, rng.integers(0, 8)))
+            lines.append([start] + words.tolist() + [end])
+    order = rng.permutation(len(lines))
+    return [lines[i] for i in order]
+
+
+def main(number_of_columns=6, lines_per_column=200):
+    lines = make_lines(number_of_columns, lines_per_column)
+    print(f'{len(lines)} lines in {number_of_columns} columns')
+    for tol in [0.0, -10.0]:
+        start = time.perf_counter()
+        labels_in_order = _gutter_in_order(np.array([[min(l), max(l)] for l in lines]), tol=tol)
+        in_order_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        labels = gutter(lines, tol=tol)
+        sweep_time = time.perf_counter() - start
+
+        same = np.array_equal(labels, labels_in_order)
+        print(f'tol={tol}')
+        print(f'  {"merge lines in order":<22} {in_order_time:8.4f} s')
+        print(f'  {"sort and sweep":<22} {sweep_time:8.4f} s')
+        print(f'  {len(np.unique(labels))} gutters, same labels: {same}')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
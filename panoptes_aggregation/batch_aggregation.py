@@ -1,4 +1,6 @@
 from celery import Celery
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
 import json
 import pandas as pd
 import os
@@ -15,6 +17,7 @@ from panoptes_client.panoptes import PanoptesAPIException
 from panoptes_aggregation.workflow_config import workflow_extractor_config
 from panoptes_aggregation.scripts import batch_utils
 from panoptes_aggregation.csv_utils import flatten_data
+from panoptes_aggregation.cpu_count import available_cpu_count
 
 celery = Celery(__name__)
 celery.conf.broker_url = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379")
@@ -39,35 +42,59 @@ def run_aggregation(project_id, workflow_id, jwt_token):
     ba.process_wf_export(ba.wf_csv)
     cls_df = ba.process_cls_export(ba.cls_csv)
 
-    print(f'[Batch Aggregation] Extracting workflow {workflow_id}')
-    extractor_config = workflow_extractor_config(ba.tasks)
-    extracted_data = batch_utils.batch_extract(cls_df, extractor_config, hide_progressbar=True)
-
-    batch_standard_reducers = {
-        'question_extractor': ['question_reducer', 'question_consensus_reducer'],
-        'survey_extractor': ['survey_reducer']
-    }
-
-    print(f'[Batch Aggregation] Reducing workflow {workflow_id}')
-    reduced_data = {}
-    for extractor_type, extract_df in extracted_data.items():
-        extract_filepath = os.path.join(ba.output_path, f'{ba.workflow_id}_{extractor_type}.csv')
-        extract_df.to_csv(extract_filepath, index=False)
-        reducer_list = batch_standard_reducers[extractor_type]
-
-        for reducer in reducer_list:
-            # This is an override. The workflow_reducer_config method returns a config object
-            # that is incompatible with the batch_utils batch_reduce method
-            reducer_config = {'reducer_config': {reducer: {}}}
-            reduced_data[reducer] = batch_utils.batch_reduce(extract_df, reducer_config, hide_progressbar=True)
-
-            # Cast the data column to a dict to prevent an incorrectly serialized OrderedDict
-            # This is necessary for the survey_reducer, but is fine for the others
-            reduced_data[reducer]['data'] = reduced_data[reducer]['data'].apply(dict)
+    cpu_count = available_cpu_count()
+    print(f'[Batch Aggregation] Using {cpu_count} worker processes for workflow {workflow_id}')
+    # One pool is shared by the extraction and every reducer
+    with Pool(cpu_count) as pool:
+        print(f'[Batch Aggregation] Extracting workflow {workflow_id}')
+        extractor_config = workflow_extractor_config(ba.tasks)
+        extracted_data = batch_utils.batch_extract(
+            cls_df,
+            extractor_config,
+            cpu_count=cpu_count,
+            hide_progressbar=True,
+            pool=pool,
+            flatten=False
+        )
 
-            # Output full pre-reducer output files
-            reduction_filepath = os.path.join(ba.output_path, f'{ba.workflow_id}_{reducer}_reductions.csv')
-            reduced_data[reducer].to_csv(reduction_filepath, index=False)
+        batch_standard_reducers = {
+            'question_extractor': ['question_reducer', 'question_consensus_reducer'],
+            'survey_extractor': ['survey_reducer']
+        }
+
+        print(f'[Batch Aggregation] Reducing workflow {workflow_id}')
+        reducer_jobs = []
+        for extractor_type, extract_rows in extracted_data.items():
+            for reducer in batch_standard_reducers[extractor_type]:
+                reducer_jobs.append((reducer, extract_rows))
+
+        # The reducers are independent, so they are all run at once with their
+        # subjects sent to the shared pool.  The reducers use the extracts as they
+        # are, so they are only flattened for the extraction csv files, which are
+        # written while the reducers run.
+        with ThreadPoolExecutor(max_workers=max(len(reducer_jobs) + len(extracted_data), 1)) as executor:
+            extract_files = [
+                executor.submit(
+                    save_extracts,
+                    extract_rows,
+                    os.path.join(ba.output_path, f'{ba.workflow_id}_{extractor_type}.csv')
+                )
+                for extractor_type, extract_rows in extracted_data.items()
+            ]
+            futures = {
+                reducer: executor.submit(run_reducer, extract_rows, reducer, cpu_count, pool)
+                for reducer, extract_rows in reducer_jobs
+            }
+            reduced_data = {reducer: future.result() for reducer, future in futures.items()}
+            for extract_file in extract_files:
+                extract_file.result()
+        pool.close()
+        pool.join()
+
+    for reducer, reduced_df in reduced_data.items():
+        # Output full pre-reducer output files
+        reduction_filepath = os.path.join(ba.output_path, f'{ba.workflow_id}_{reducer}_reductions.csv')
+        reduced_df.to_csv(reduction_filepath, index=False)
 
     # Merge and save combined reductions file
     reduction_dfs = [
@@ -95,6 +122,29 @@ def run_aggregation(project_id, workflow_id, jwt_token):
     print(f'[Batch Aggregation] Run successful for workflow {workflow_id} by user {ba.user_id}')
 
 
+def save_extracts(extract_rows, filepath):
+    # The extraction csv files have the flattened extracts
+    batch_utils.flatten_extracts(extract_rows).to_csv(filepath, index=False)
+
+
+def run_reducer(extract_rows, reducer, cpu_count, pool):
+    # This is an override. The workflow_reducer_config method returns a config object
+    # that is incompatible with the batch_utils batch_reduce_extracts method
+    reducer_config = {'reducer_config': {reducer: {}}}
+    reduced_df = batch_utils.batch_reduce_extracts(
+        extract_rows,
+        reducer_config,
+        cpu_count=cpu_count,
+        hide_progressbar=True,
+        pool=pool
+    )
+
+    # Cast the data column to a dict to prevent an incorrectly serialized OrderedDict
+    # This is necessary for the survey_reducer, but is fine for the others
+    reduced_df['data'] = reduced_df['data'].apply(dict)
+    return reduced_df
+
+
 class BatchAggregator:
     """
     Bunch of stuff to manage a batch aggregation run
@@ -0,0 +1,48 @@
+'''
+CPU Count
+---------
+This module finds how many CPUs the aggregation code can use.  It has no
+dependencies outside the standard library so it can be used by both the
+batch aggregation service and the reducers.
+'''
+import math
+import os
+
+
+def available_cpu_count():
+    '''The number of CPUs this process can use.  The `AGGREGATION_CPU_COUNT`
+    environment variable is used if it is set, otherwise the container's CPU quota
+    (from cgroups) is used, falling back to the CPUs available to the process.'''
+    env_count = os.getenv('AGGREGATION_CPU_COUNT')
+    if env_count:
+        return max(int(env_count), 1)
+    if hasattr(os, 'sched_getaffinity'):
+        cpu_count = len(os.sched_getaffinity(0))
+    else:
+        cpu_count = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpu_count = min(cpu_count, max(math.ceil(quota), 1))
+    return cpu_count
+
+
+def _cgroup_cpu_quota():
+    '''The CPU quota of the container (cgroup v2 or v1) or `None` if there is no quota'''
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota == 'max':
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as quota_file:
+            quota = int(quota_file.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as period_file:
+            period = int(period_file.read())
+        if quota <= 0:
+            return None
+        return quota / period
+    except (OSError, ValueError):
+        return None
@@ -1,4 +1,6 @@
 import ast
+import json
+from functools import lru_cache
 import pandas
 from pandas import json_normalize
 
@@ -13,20 +15,78 @@ def flatten_data(data, json_column='data'):
     return pandas.concat([other_data, flat_data], axis=1)
 
 
+LITERAL_NAMES = {
+    'nan': None,
+    'null': None,
+    'true': True,
+    'false': False
+}
+
+
+def _reject_constant(value):
+    raise ValueError('Non-literal constant {0}'.format(value))
+
+
+def _literal_from_node(node):
+    if isinstance(node, ast.Constant):
+        return node.value
+    elif isinstance(node, ast.List):
+        return [_literal_from_node(n) for n in node.elts]
+    elif isinstance(node, ast.Tuple):
+        return tuple(_literal_from_node(n) for n in node.elts)
+    elif isinstance(node, ast.Set):
+        return {_literal_from_node(n) for n in node.elts}
+    elif isinstance(node, ast.Dict) and (None not in node.keys):
+        return {
+            _literal_from_node(key): _literal_from_node(value)
+            for key, value in zip(node.keys, node.values)
+        }
+    elif isinstance(node, ast.Name) and (node.id in LITERAL_NAMES):
+        return LITERAL_NAMES[node.id]
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _literal_from_node(node.operand)
+        if isinstance(operand, (int, float, complex)) and not isinstance(operand, bool):
+            return -operand if isinstance(node.op, ast.USub) else operand
+    raise ValueError('Malformed literal: {0}'.format(ast.dump(node)))
+
+
+def parse_literal(value):
+    '''Safely decode a string holding a (possibly nested) python or JSON literal.
+
+    JSON is tried first as it is the fastest to parse, then python literals
+    where the names `nan`, `null`, `true`, and `false` are also accepted.
+    Nothing in the string is ever evaluated.  If the string is not a literal it
+    is returned unchanged.
+    '''
+    try:
+        return json.loads(value, parse_constant=_reject_constant)
+    except ValueError:
+        pass
+    try:
+        return _literal_from_node(ast.parse(value.strip(), mode='eval').body)
+    except (SyntaxError, ValueError, TypeError, RecursionError):
+        return value
+
+
+def _is_literal_string(value):
+    return isinstance(value, str) and (('{' in value) or ('[' in value))
+
+
+@lru_cache(maxsize=1024)
+def _flat_key(name, json_column):
+    prefix = '{0}.'.format(json_column)
+    if prefix in name:
+        return name.split(prefix)[1]
+    return None
+
+
 def unflatten_data(data, json_column='data', renest=True):
     data_dict = {}
     for name, value in data.items():
-        if ('{0}.'.format(json_column) in name) and (pandas.notnull(value)):
-            key = name.split('{0}.'.format(json_column))[1]
-            if isinstance(value, str) and (('{' in value) or ('[' in value)):
-                try:
-                    nan = None  # noqa
-                    false = False  # noqa
-                    true = True  # noqa
-                    null = None  # noqa
-                    data_dict[key] = eval(value)
-                except:
-                    data_dict[key] = value
+        key = _flat_key(name, json_column)
+        if (key is not None) and (pandas.notnull(value)):
+            if _is_literal_string(value):
+                data_dict[key] = parse_literal(value)
             else:
                 data_dict[key] = value
     if renest:
@@ -35,6 +95,52 @@ def unflatten_data(data, json_column='data', renest=True):
         return data_dict
 
 
+def unflatten_dataframe(data, json_column='data', renest=True):
+    '''Unflatten every row of a DataFrame in one pass.
+
+    This gives the same result as calling `unflatten_data` on each row, but
+    works column by column.  Numeric columns are used as they are and only
+    string columns are checked for literals to parse.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The flattened data
+    json_column : str
+        The prefix used for the flattened columns
+    renest : bool
+        If `True` the dotted column names are turned back into nested dictionaries
+
+    Returns
+    -------
+    data_list : list
+        One dictionary for each row of `data`
+    '''
+    columns = []
+    for name in data.columns:
+        key = _flat_key(name, json_column)
+        if key is None:
+            continue
+        column = data[name]
+        values = column.tolist()
+        not_null = column.notnull().tolist()
+        if not pandas.api.types.is_numeric_dtype(column):
+            values = [parse_literal(value) if _is_literal_string(value) else value for value in values]
+        if renest:
+            key_path = key.split('.')
+        else:
+            key_path = [key]
+        columns.append((key_path, values, not_null))
+    data_list = []
+    for row in range(len(data)):
+        data_dict = {}
+        for key_path, values, not_null in columns:
+            if not_null[row]:
+                nested_set(data_dict, key_path, values[row])
+        data_list.append(data_dict)
+    return data_list
+
+
 def nested_set(dic, keys, value):
     for key in keys[:-1]:
         dic = dic.setdefault(key, {})
@@ -7,7 +7,7 @@ from .extractor_wrapper import extractor_wrapper
 import numpy as np
 
 
-@extractor_wrapper()
+@extractor_wrapper(mutates_input=False)
 def all_tasks_empty_extractor(classification, **kwargs):
     """Determine whether all task values in a classification are empty.
 
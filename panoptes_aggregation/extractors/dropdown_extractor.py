@@ -8,7 +8,7 @@ from .question_extractor import slugify_or_null
 from packaging import version
 
 
-@extractor_wrapper()
+@extractor_wrapper(mutates_input=False)
 def dropdown_extractor(classification, **kwargs):
     '''Extract annotations from a dropdown task into a Counter object
 
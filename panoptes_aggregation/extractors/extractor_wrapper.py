@@ -14,29 +14,28 @@ def unpack_annotations(annotations, task):
     return annotations_list
 
 
-def extractor_wrapper(gold_standard=False):
+def request_kwargs(request):
+    '''Read the extractor keywords from the query string of a flask request'''
+    kwargs = request.args.copy().to_dict()
+    for key in ['details', 'tools', 'pluck']:
+        if key in kwargs:
+            kwargs[key] = ast.literal_eval(kwargs[key])
+    return kwargs
+
+
+def extractor_wrapper(gold_standard=False, mutates_input=True):
     def decorator(func):
         @wraps(func)
         def wrapper(argument, **kwargs):
             #: check if argument is a flask request
-
-            # create a default value so that
-            # we can process entries without the `pluck` parameter
-            pluck_key_dict = None
-
             if hasattr(argument, 'get_json'):
-                kwargs = argument.args.copy().to_dict()
-                if 'details' in kwargs:
-                    kwargs['details'] = ast.literal_eval(kwargs['details'])
-                if 'tools' in kwargs:
-                    kwargs['tools'] = ast.literal_eval(kwargs['tools'])
-                if 'pluck' in kwargs:
-                    pluck_key_dict = ast.literal_eval(kwargs['pluck'])
-
+                kwargs = request_kwargs(argument)
                 data = argument.get_json()
             else:
                 data = argument
-                pluck_key_dict = kwargs.pop('pluck', None)
+
+            # entries without the `pluck` parameter default to `None`
+            pluck_key_dict = kwargs.pop('pluck', None)
 
             # the task key to extract
             task = kwargs.pop('task', 'all')
@@ -80,5 +79,8 @@ def extractor_wrapper(gold_standard=False):
 
             return extraction
         wrapper._original = func
+        #: `False` if `func` never modifies the annotations passed in,
+        #: batch extraction can then skip deep copying them
+        wrapper._mutates_input = mutates_input
         return wrapper
     return decorator
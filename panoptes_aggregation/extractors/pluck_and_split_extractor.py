@@ -10,7 +10,7 @@ import jsonpath
 from .extractor_wrapper import extractor_wrapper
 
 
-@extractor_wrapper()
+@extractor_wrapper(mutates_input=False)
 def pluck_and_split_extractor(classification, **kwargs):
     """Pluck fields and split their values by a string.
 
@@ -10,7 +10,7 @@ from .question_extractor import question_extractor
 from .extractor_wrapper import extractor_wrapper
 
 
-@extractor_wrapper()
+@extractor_wrapper(mutates_input=False)
 def survey_extractor(classification, **kwargs):
     '''Extract annotations from a survye task into a list
 
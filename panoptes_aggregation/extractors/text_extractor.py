@@ -6,7 +6,7 @@ This module provides a function to extract text tasks from panoptes annotations
 from .extractor_wrapper import extractor_wrapper
 
 
-@extractor_wrapper(gold_standard=True)
+@extractor_wrapper(gold_standard=True, mutates_input=False)
 def text_extractor(classification, gold_standard=False, **kwargs):
     '''
     Extract annotations from a text task as a string.
@@ -0,0 +1,160 @@
+'''
+Lazy Registry
+-------------
+The extractors and reducers depend on some large libraries (e.g. sklearn,
+scipy, shapely, and collatex) that take a long time to import.  This module
+provides a registry that knows the name of every function up front, but only
+imports the module a function lives in the first time it is used.
+'''
+from collections.abc import MutableMapping
+import importlib
+import sys
+import types
+from .copy_function import copy_function
+
+
+class LazyRegistry(MutableMapping):
+    '''A dictionary of functions that imports each function the first time it is looked up.
+
+    Parameters
+    ----------
+    package : str
+        The name of the package the modules are relative to
+    paths : dict
+        A dictionary mapping each function name to the module it is defined in.
+        The module can be given as `module` if the function has the same name
+        as the key, or as `module:function` otherwise.
+    aliases : dict
+        A dictionary mapping a function name to the name of another function
+        in the registry.  The alias is a copy of that function with a new name.
+    '''
+    def __init__(self, package, paths, aliases={}):
+        self._package = package
+        self._paths = dict(paths)
+        self._aliases = dict(aliases)
+        self._names = list(self._paths) + [name for name in self._aliases if name not in self._paths]
+        self._loaded = {}
+
+    def _load(self, name):
+        if name in self._aliases:
+            return copy_function(self[self._aliases[name]], name)
+        module_name, _, function_name = self._paths[name].partition(':')
+        module = importlib.import_module('.{0}'.format(module_name), self._package)
+        return getattr(module, function_name or name)
+
+    def __getitem__(self, name):
+        if name not in self._loaded:
+            if name not in self:
+                raise KeyError(name)
+            self._loaded[name] = self._load(name)
+        return self._loaded[name]
+
+    def __setitem__(self, name, value):
+        if name not in self:
+            self._names.append(name)
+        self._loaded[name] = value
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self._names.remove(name)
+        self._paths.pop(name, None)
+        self._aliases.pop(name, None)
+        self._loaded.pop(name, None)
+
+    def __contains__(self, name):
+        # checking a name does not import anything
+        return name in self._names
+
+    def __iter__(self):
+        return iter(list(self._names))
+
+    def __len__(self):
+        return len(self._names)
+
+    def clear(self):
+        self._names = []
+        self._paths = {}
+        self._aliases = {}
+        self._loaded = {}
+
+    def copy(self):
+        '''A copy of the registry that shares the functions imported so far'''
+        registry = type(self)(self._package, {})
+        registry.update(self)
+        return registry
+
+    def update(self, *args, **kwargs):
+        # merge another registry without importing its functions
+        if (len(args) == 1) and isinstance(args[0], LazyRegistry) and (not kwargs):
+            other = args[0]
+            for name in other._names:
+                if name not in self:
+                    self._names.append(name)
+                self._loaded.pop(name, None)
+            self._paths.update(other._paths)
+            self._aliases.update(other._aliases)
+            self._loaded.update(other._loaded)
+        else:
+            super().update(*args, **kwargs)
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, self._names)
+
+    def attributes(self):
+        '''The names of the functions that are defined in a module of the same
+        name (or are an alias), these are also set as attributes of the package'''
+        return [
+            name for name in self._names
+            if (name in self._aliases) or (':' not in self._paths.get(name, ''))
+        ]
+
+    def loaded(self):
+        '''The names of the functions that have been imported'''
+        return [name for name in self._names if name in self._loaded]
+
+
+class LazyPackage(types.ModuleType):
+    '''A package that looks up any attribute missing from its namespace in
+    its `_lazy_registry`, so `package.function_name` imports the function on
+    first use.'''
+    def _lazy_attributes(self):
+        registry = self.__dict__.get('_lazy_registry')
+        if registry is None:
+            return []
+        return registry.attributes()
+
+    def __getattr__(self, name):
+        if name in self._lazy_attributes():
+            return self._lazy_registry[name]
+        if name in self.__dict__.get('_lazy_registry', {}):
+            # the function has a different name from its module, so the
+            # attribute is the module (as it is for any imported submodule)
+            return importlib.import_module('.{0}'.format(name), self.__name__)
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(self.__name__, name))
+
+    def __setattr__(self, name, value):
+        # Importing a submodule sets it as an attribute of the package.  Skip this
+        # for submodules named after a registered function so the attribute is
+        # always the function (as it was when the functions were imported eagerly).
+        if isinstance(value, types.ModuleType) and (name in self._lazy_attributes()):
+            return
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self._lazy_attributes()))
+
+
+def lazy_package(package, registry):
+    '''Make the attributes of `package` fall back to `registry`
+
+    Parameters
+    ----------
+    package : str
+        The name of the package (usually `__name__` in the package's `__init__.py`)
+    registry : LazyRegistry
+        The registry used to look up attributes
+    '''
+    module = sys.modules[package]
+    module.__class__ = LazyPackage
+    module._lazy_registry = registry
@@ -0,0 +1,122 @@
+'''
+Parquet Utilities
+-----------------
+Read and write flattened extracts and reductions as compressed Parquet files.
+Columns of numbers and strings are stored as they are, and columns of lists
+(e.g. the `x` positions of every point a volunteer made) are stored as
+Parquet list columns, so nothing needs to be parsed when the file is read.
+Any column Parquet can not store directly (e.g. lists of dictionaries or
+mixed types) is stored as JSON strings and decoded on read.
+'''
+import json
+import pandas
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+JSON_COLUMNS_KEY = b'panoptes_aggregation.json_columns'
+
+
+def _require_pyarrow():
+    if pyarrow is None:  # pragma: no cover
+        raise ImportError('You must install `pyarrow` to use the parquet format')
+
+
+def is_parquet(file):
+    '''Check if a file (or path) has the `.parquet` extension'''
+    name = getattr(file, 'name', file)
+    return isinstance(name, str) and name.lower().endswith('.parquet')
+
+
+def _has_struct(data_type):
+    if pyarrow.types.is_struct(data_type) or pyarrow.types.is_map(data_type):
+        return True
+    if pyarrow.types.is_list(data_type) or pyarrow.types.is_large_list(data_type):
+        return _has_struct(data_type.value_type)
+    return False
+
+
+def _json_default(value):
+    if hasattr(value, 'tolist'):
+        # numpy scalars and arrays
+        return value.tolist()
+    raise TypeError('Object of type {0} is not JSON serializable'.format(type(value).__name__))
+
+
+def _to_json(value):
+    if (not isinstance(value, (list, dict))) and pandas.isnull(value):
+        return None
+    return json.dumps(value, default=_json_default)
+
+
+def _column_to_arrow(column):
+    '''Convert a pandas column to an arrow array, returning `None` if it has to be stored as JSON.
+    Dictionaries are not stored natively as arrow fills in the missing keys of each one.'''
+    try:
+        array = pyarrow.array(column, from_pandas=True)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, pyarrow.ArrowNotImplementedError):
+        return None
+    if _has_struct(array.type):
+        return None
+    return array
+
+
+def write_parquet(data_frame, path, compression='zstd'):
+    '''Write a flattened DataFrame to a compressed Parquet file
+
+    Parameters
+    ----------
+    data_frame : pandas.DataFrame
+        The data to write (the index is not saved)
+    path : str
+        The path to the output file
+    compression : str
+        The compression codec used
+    '''
+    _require_pyarrow()
+    arrays = []
+    json_columns = []
+    for name in data_frame.columns:
+        column = data_frame[name]
+        array = _column_to_arrow(column)
+        if array is None:
+            array = pyarrow.array([_to_json(value) for value in column], type=pyarrow.string())
+            json_columns.append(name)
+        arrays.append(array)
+    table = pyarrow.Table.from_arrays(arrays, names=[str(name) for name in data_frame.columns])
+    table = table.replace_schema_metadata({JSON_COLUMNS_KEY: json.dumps(json_columns)})
+    pyarrow.parquet.write_table(table, path, compression=compression)
+
+
+def read_parquet(path):
+    '''Read a Parquet file made with :meth:`write_parquet`
+
+    Parameters
+    ----------
+    path : str
+        The path to the file
+
+    Returns
+    -------
+    data_frame : pandas.DataFrame
+        The data with list columns as python lists (the same as
+        :meth:`panoptes_aggregation.csv_utils.unflatten_data` makes from a csv file)
+    '''
+    _require_pyarrow()
+    table = pyarrow.parquet.read_table(path)
+    metadata = table.schema.metadata or {}
+    json_columns = set(json.loads(metadata.get(JSON_COLUMNS_KEY, b'[]')))
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if name in json_columns:
+            values = [None if value is None else json.loads(value) for value in column.to_pylist()]
+            columns[name] = pandas.Series(values, dtype=object)
+        elif pyarrow.types.is_nested(column.type):
+            columns[name] = pandas.Series(column.to_pylist(), dtype=object)
+        else:
+            columns[name] = column.to_pandas()
+    return pandas.DataFrame(columns)
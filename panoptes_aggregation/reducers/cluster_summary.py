@@ -0,0 +1,56 @@
+'''
+Cluster Summary
+---------------
+This module provides a function to summarize every cluster found by a
+clustering algorithm at once, rather than looping over each cluster label.
+'''
+import numpy as np
+
+
+def cluster_summary(loc, labels):
+    '''Find the size, mean, and covariance of each cluster
+
+    The points are sorted by cluster label (keeping their original order within each
+    cluster) and the sums for all clusters are found at once with `numpy.add.reduceat`.
+
+    Parameters
+    ----------
+    loc : numpy.ndarray
+        A 2D array with one row for each point that was clustered
+    labels : numpy.ndarray
+        The cluster label for each point, points not in a cluster have a label of `-1`
+
+    Returns
+    -------
+    counts : numpy.ndarray
+        The number of points in each cluster, ordered by cluster label
+    means : numpy.ndarray
+        The mean of each cluster, one row for each cluster
+    covariances : numpy.ndarray
+        The covariance matrix of each cluster, this is `nan` for clusters with
+        only one point
+    members : list
+        A list with the indices (into `loc`) of the points in each cluster
+    '''
+    loc = np.asarray(loc)
+    labels = np.asarray(labels)
+    in_cluster = np.flatnonzero(labels > -1)
+    number_of_dimensions = loc.shape[1]
+    if in_cluster.size == 0:
+        return (
+            np.zeros(0, dtype=int),
+            np.zeros((0, number_of_dimensions)),
+            np.zeros((0, number_of_dimensions, number_of_dimensions)),
+            []
+        )
+    order = in_cluster[np.argsort(labels[in_cluster], kind='stable')]
+    _, starts, counts = np.unique(labels[order], return_index=True, return_counts=True)
+    sorted_loc = loc[order]
+    means = np.add.reduceat(sorted_loc, starts, axis=0) / counts[:, np.newaxis]
+    residuals = sorted_loc - np.repeat(means, counts, axis=0)
+    products = residuals[:, :, np.newaxis] * residuals[:, np.newaxis, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariances = np.add.reduceat(products, starts, axis=0) / (counts - 1)[:, np.newaxis, np.newaxis]
+    covariances[counts == 1] = np.nan
+    members = np.split(order, starts[1:])
+    return counts, means, covariances, members
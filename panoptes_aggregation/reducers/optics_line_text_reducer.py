@@ -9,17 +9,11 @@ extracts are full lines of text in the document.
 from sklearn.cluster import OPTICS
 import numpy as np
 from collections import defaultdict
-from .optics_text_utils import get_min_samples, metric, remove_user_duplication, cluster_of_one, order_lines
-from .text_utils import consensus_score, tokenize, extractor_index
+from .optics_text_utils import get_min_samples, metric, metric_matrix, finite_metric_matrix, remove_user_duplication, cluster_of_one, order_lines
+from .text_utils import consensus_score, align_texts, extractor_index, map_frames
 from .reducer_wrapper import reducer_wrapper
 import warnings
 
-with warnings.catch_warnings():
-    # collatex is a bit old, we can safely ignore this message as the display
-    # functions are optional and never used in this code
-    warnings.filterwarnings('ignore', category=DeprecationWarning, message='Importing display')
-    import collatex as col
-
 DEFAULTS = {
     'min_samples': {'default': 'auto', 'type': int},
     'max_eps': {'default': None, 'type': float},
@@ -27,16 +21,16 @@ DEFAULTS = {
     'angle_eps': {'default': 30.0, 'type': float},
     'gutter_eps': {'default': 300.0, 'type': float},
     'low_consensus_threshold': {'default': 3.0, 'type': float},
-    'minimum_views': {'default': 5, 'type': int}
+    'minimum_views': {'default': 5, 'type': int},
+    'precompute_distances': {'default': False, 'type': bool},
+    'alignment': {'default': 'collatex', 'type': str},
+    'frame_workers': {'default': 1, 'type': int}
 }
 
 DEFAULTS_PROCESS = {
     'min_line_length': {'default': 0.0, 'type': float}
 }
 
-# override the built-in tokenize
-col.core_classes.WordPunctuationTokenizer.tokenize = tokenize
-
 
 def process_data(data_list, min_line_length=0.0):
     '''Process a list of extractions into a dictionary organized by `frame`
@@ -79,6 +73,130 @@ def process_data(data_list, min_line_length=0.0):
     return data_by_frame
 
 
+def _reduce_frame(
+    value,
+    user_ids_input,
+    min_samples_orig,
+    precompute_distances,
+    alignment,
+    low_consensus_threshold,
+    angle_eps,
+    gutter_eps,
+    kwargs_optics
+):
+    '''Internal function to reduce the lines of text on one frame of a subject
+
+    Returns
+    -------
+    frame_lines : list
+        The reduction for each line on the frame in reading order
+    low_consensus_lines : int
+        The number of lines with low consensus
+    number_of_lines : int
+        The number of lines transcribed on the frame
+    '''
+    low_consensus_lines = 0
+    number_of_lines = 0
+    frame_unordered = []
+    X = np.array(value['X'])
+    data = np.array(value['data'])
+    if X.size > 0:
+        num_users = len(np.unique(X[:, 1]))
+        ext_index = np.array(extractor_index(X[:, 1]))
+    else:
+        num_users = 0
+        ext_index = np.array([])
+    if min_samples_orig == 'auto':
+        min_samples = get_min_samples(num_users)
+    else:
+        min_samples = max(2, min_samples_orig)
+    if num_users >= min_samples:
+        if precompute_distances:
+            distances, finite_max_eps = finite_metric_matrix(metric_matrix(X, data_in=data))
+            db = OPTICS(
+                metric='precomputed',
+                max_eps=finite_max_eps,
+                min_samples=min_samples,
+                **kwargs_optics
+            )
+            fit_data = distances
+        else:
+            db = OPTICS(
+                metric=metric,
+                metric_params={'data_in': data},
+                min_samples=min_samples,
+                **kwargs_optics
+            )
+            fit_data = X
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', category=RuntimeWarning)
+            db.fit(fit_data)
+        clean_labels = remove_user_duplication(
+            db.labels_,
+            db.core_distances_,
+            X[:, 1]
+        )
+        for label in np.unique(clean_labels):
+            cdx = clean_labels == label
+            if label == -1:
+                # noise values are assigned to clusters of one
+                frame_unordered += cluster_of_one(X[cdx], data, user_ids_input, ext_index[cdx].tolist())
+            else:
+                xs = [data[int(i)]['x'] for i in X[cdx, 0]]
+                ys = [data[int(i)]['y'] for i in X[cdx, 0]]
+                xm = np.median(xs, axis=0)
+                ym = np.median(ys, axis=0)
+                slope = np.rad2deg(np.arctan2(ym[-1] - ym[0], xm[-1] - xm[0]))
+                texts = []
+                clusters_text = []
+                user_ids = []
+                gold_standard = []
+                for row in X[cdx]:
+                    index = int(row[0])
+                    user_index = int(row[1])
+                    text = data[index]['text'][0]
+                    gs = data[index]['gold_standard']
+                    if text.strip() != '':
+                        texts.append(text)
+                        user_ids.append(user_ids_input[user_index])
+                        gold_standard.append(gs)
+                for column in align_texts(texts, alignment):
+                    clusters_text.append([column.get(tdx, '') for tdx in range(len(texts))])
+                consensus_score_value, consensus_text = consensus_score(clusters_text)
+                low_consensus = consensus_score_value < low_consensus_threshold
+                if low_consensus:
+                    low_consensus_lines += 1
+                line = {
+                    'clusters_x': xm.tolist(),
+                    'clusters_y': ym.tolist(),
+                    'clusters_text': clusters_text,
+                    'number_views': cdx.sum().item(),
+                    'line_slope': slope.item(),
+                    'consensus_score': consensus_score_value,
+                    'consensus_text': consensus_text,
+                    'user_ids': user_ids,
+                    'extract_index': ext_index[cdx].tolist(),
+                    'gold_standard': gold_standard,
+                    'low_consensus': low_consensus,
+                    'flagged': low_consensus
+                }
+                number_of_lines += 1
+                frame_unordered.append(line)
+    else:
+        # not enough data to cluster so assign each extract
+        # to its own cluster
+        frame_unordered += cluster_of_one(X, data, user_ids_input, ext_index.tolist())
+        if len(frame_unordered) > 0:
+            low_consensus_lines += 1
+            number_of_lines += 1
+    frame_lines = order_lines(
+        frame_unordered,
+        angle_eps=angle_eps,
+        gutter_eps=gutter_eps
+    )
+    return frame_lines, low_consensus_lines, number_of_lines
+
+
 @reducer_wrapper(
     process_data=process_data,
     defaults_data=DEFAULTS,
@@ -105,6 +223,12 @@ def optics_line_text_reducer(data_by_frame, **kwargs_optics):
         * `min_line_length` : The minimum length a transcribed line of text needs to be in order to be used in the reduction.
         * `low_consensus_threshold` : The minimum consensus score allowed to be considered "done".
         * `minimum_views` : A value that is passed along to the font-end to set when lines should turn grey (has no effect on aggregation)
+        * `precompute_distances` : If `True` the full distance matrix for each frame is calculated up front and passed
+          to OPTICS as a precomputed metric.  This gives the same result but is faster for frames with many lines.
+        * `alignment` : The backend used to align the words of each line, either `collatex` (default) or `numpy`.
+          See :mod:`panoptes_aggregation.reducers.text_alignment`.
+        * `frame_workers` : The number of processes used to reduce the frames of a subject in parallel (default 1).
+          See :meth:`panoptes_aggregation.reducers.text_utils.map_frames`.
 
     Returns
     -------
@@ -147,104 +271,28 @@ def optics_line_text_reducer(data_by_frame, **kwargs_optics):
     max_eps = kwargs_optics.pop('max_eps', np.inf)
     if max_eps is None:
         max_eps = np.inf
+    precompute_distances = kwargs_optics.pop('precompute_distances', False)
+    alignment = kwargs_optics.pop('alignment', 'collatex')
+    frame_workers = kwargs_optics.pop('frame_workers', 1)
+    frame_reductions = map_frames(
+        _reduce_frame,
+        data_by_frame.values(),
+        frame_workers=frame_workers,
+        user_ids_input=user_ids_input,
+        min_samples_orig=min_samples_orig,
+        precompute_distances=precompute_distances,
+        alignment=alignment,
+        low_consensus_threshold=low_consensus_threshold,
+        angle_eps=angle_eps,
+        gutter_eps=gutter_eps,
+        kwargs_optics=kwargs_optics
+    )
     low_consensus_lines = 0
     number_of_lines = 0
-    for frame, value in data_by_frame.items():
-        frame_unordered = []
-        X = np.array(value['X'])
-        data = np.array(value['data'])
-        if X.size > 0:
-            num_users = len(np.unique(X[:, 1]))
-            ext_index = np.array(extractor_index(X[:, 1]))
-        else:
-            num_users = 0
-            ext_index = np.array([])
-        if min_samples_orig == 'auto':
-            min_samples = get_min_samples(num_users)
-        else:
-            min_samples = max(2, min_samples_orig)
-        if num_users >= min_samples:
-            db = OPTICS(
-                metric=metric,
-                metric_params={'data_in': data},
-                min_samples=min_samples,
-                **kwargs_optics
-            )
-            with warnings.catch_warnings():
-                warnings.filterwarnings('ignore', category=RuntimeWarning)
-                db.fit(X)
-            clean_labels = remove_user_duplication(
-                db.labels_,
-                db.core_distances_,
-                X[:, 1]
-            )
-            for label in np.unique(clean_labels):
-                cdx = clean_labels == label
-                if label == -1:
-                    # noise values are assigned to clusters of one
-                    frame_unordered += cluster_of_one(X[cdx], data, user_ids_input, ext_index[cdx].tolist())
-                else:
-                    xs = [data[int(i)]['x'] for i in X[cdx, 0]]
-                    ys = [data[int(i)]['y'] for i in X[cdx, 0]]
-                    xm = np.median(xs, axis=0)
-                    ym = np.median(ys, axis=0)
-                    slope = np.rad2deg(np.arctan2(ym[-1] - ym[0], xm[-1] - xm[0]))
-                    collation = col.Collation()
-                    witness_keys = []
-                    clusters_text = []
-                    user_ids = []
-                    gold_standard = []
-                    for row in X[cdx]:
-                        index = int(row[0])
-                        user_index = int(row[1])
-                        text = data[index]['text'][0]
-                        gs = data[index]['gold_standard']
-                        if text.strip() != '':
-                            key = str(index)
-                            witness_keys.append(key)
-                            user_ids.append(user_ids_input[user_index])
-                            gold_standard.append(gs)
-                            collation.add_plain_witness(key, text)
-                    if len(collation.witnesses) > 0:
-                        alignment_table = col.collate(collation, near_match=True, segmentation=False)
-                        for cols in alignment_table.columns:
-                            word_dict = cols.tokens_per_witness
-                            word_list = []
-                            for key in witness_keys:
-                                word_list.append(str(word_dict.get(key, [''])[0]))
-                            clusters_text.append(word_list)
-                    consensus_score_value, consensus_text = consensus_score(clusters_text)
-                    low_consensus = consensus_score_value < low_consensus_threshold
-                    if low_consensus:
-                        low_consensus_lines += 1
-                    value = {
-                        'clusters_x': xm.tolist(),
-                        'clusters_y': ym.tolist(),
-                        'clusters_text': clusters_text,
-                        'number_views': cdx.sum().item(),
-                        'line_slope': slope.item(),
-                        'consensus_score': consensus_score_value,
-                        'consensus_text': consensus_text,
-                        'user_ids': user_ids,
-                        'extract_index': ext_index[cdx].tolist(),
-                        'gold_standard': gold_standard,
-                        'low_consensus': low_consensus,
-                        'flagged': low_consensus
-                    }
-                    number_of_lines += 1
-                    frame_unordered.append(value)
-        else:
-            # not enough data to cluster so assign each extract
-            # to its own cluster
-            frame_unordered += cluster_of_one(X, data, user_ids_input, ext_index.tolist())
-            if len(frame_unordered) > 0:
-                low_consensus_lines += 1
-                number_of_lines += 1
-        output[frame] = order_lines(
-            frame_unordered,
-            angle_eps=angle_eps,
-            gutter_eps=gutter_eps
-        )
+    for frame, (frame_lines, frame_low_consensus_lines, frame_number_of_lines) in zip(data_by_frame.keys(), frame_reductions):
+        low_consensus_lines += frame_low_consensus_lines
+        number_of_lines += frame_number_of_lines
+        output[frame] = frame_lines
         output['low_consensus_lines'] = low_consensus_lines
         output['transcribed_lines'] = number_of_lines
         output['reducer'] = 'optics_line_text_reducer'
@@ -78,6 +78,76 @@ def metric(a, b, data_in=[]):
     return (np.sqrt(dx + dy).sum() + dt).item()
 
 
+def metric_matrix(X, data_in=[]):
+    '''Calculate the full distance matrix between all the drawn lines in `X`.
+    The values are the same as :meth:`metric` would give for each pair of rows,
+    but the tags are only stripped once per line and the start and end point
+    distances are calculated for all pairs at once.
+
+    Parameters
+    ----------
+    X : numpy.array
+        A nx2 array with each row containing [index mapping to data, index mapping to user]
+    data_in : list
+        A list of dicts that take the form
+        {`x`: [start_x, end_x], `y`: [start_y, end_y], 'text': ['text for line'], 'gold_standard', bool}
+        There is one element in this list for each classification made.
+
+    Returns
+    -------
+    distances : numpy.array
+        A nxn symmetric array with the distance between each pair of rows in `X`.
+        Lines drawn by the same user have a distance of `inf`.
+    '''
+    index = X[:, 0].astype(int)
+    users = X[:, 1]
+    x = np.array([data_in[i]['x'] for i in index], dtype=float).reshape(-1, 2)
+    y = np.array([data_in[i]['y'] for i in index], dtype=float).reshape(-1, 2)
+    text = [strip_tags(data_in[i]['text'][0]) for i in index]
+    dx = (x[:, np.newaxis, :] - x[np.newaxis, :, :])**2
+    dy = (y[:, np.newaxis, :] - y[np.newaxis, :, :])**2
+    distances = np.sqrt(dx + dy).sum(axis=2)
+    for i in range(len(index)):
+        for j in range(i + 1, len(index)):
+            dt = Levenshtein.distance(text[i], text[j])
+            distances[i, j] += dt
+            distances[j, i] += dt
+    distances[users[:, np.newaxis] == users[np.newaxis, :]] = np.inf
+    distances[index[:, np.newaxis] == index[np.newaxis, :]] = 0
+    return distances
+
+
+def finite_metric_matrix(distances, max_eps=np.inf):
+    '''OPTICS only accepts finite precomputed distances. Replace the `inf`
+    values with a finite value larger than `max_eps` and return a finite
+    `max_eps` that still includes every other pair.  As OPTICS ignores
+    pairs further apart than `max_eps` this gives the same clustering as
+    using :meth:`metric` directly.
+
+    Parameters
+    ----------
+    distances : numpy.array
+        A square distance matrix created by :meth:`metric_matrix`
+    max_eps : float
+        The maximum distance between two lines to be considered neighbors
+
+    Returns
+    -------
+    finite_distances : numpy.array
+        A copy of `distances` with the `inf` values replaced
+    finite_max_eps : float
+        The value to pass to OPTICS as `max_eps`
+    '''
+    finite = np.isfinite(distances)
+    if np.isfinite(max_eps):
+        finite_max_eps = max_eps
+    else:
+        finite_max_eps = distances[finite].max(initial=0) + 1
+    finite_distances = distances.copy()
+    finite_distances[~finite] = 2 * finite_max_eps
+    return finite_distances, finite_max_eps
+
+
 def get_min_samples(N):
     '''Get the `min_samples` attribute based on the number of
     users who have transcribed the subject.  These values were
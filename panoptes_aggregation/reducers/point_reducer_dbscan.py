@@ -10,6 +10,7 @@ from collections import OrderedDict
 from .reducer_wrapper import reducer_wrapper
 from .subtask_reducer_wrapper import subtask_wrapper
 from .point_process_data import process_data_by_frame
+from .cluster_summary import cluster_summary
 
 
 DEFAULTS = {
@@ -22,6 +23,48 @@ DEFAULTS = {
 }
 
 
+def summarize_clusters(tool, loc, labels):
+    '''Make the reduction for one tool from the points and their cluster labels
+
+    Parameters
+    ----------
+    tool : str
+        The name of the tool
+    loc : numpy.ndarray
+        An array of shape (N, 2) with the `x` and `y` position of each point
+    labels : numpy.ndarray
+        The cluster label of each point (-1 for points in no cluster)
+
+    Returns
+    -------
+    reduction : OrderedDict
+        The `tool*_points_*`, `tool*_cluster_labels`, and `tool*_clusters_*`
+        keys described in :meth:`point_reducer_dbscan`
+    '''
+    reduction = OrderedDict()
+    # original data points in order used by cluster code
+    reduction['{0}_points_x'.format(tool)] = loc[:, 0].tolist()
+    reduction['{0}_points_y'.format(tool)] = loc[:, 1].tolist()
+    # what cluster each point belongs to
+    reduction['{0}_cluster_labels'.format(tool)] = labels.tolist()
+    counts, means, covariances, _ = cluster_summary(loc, labels)
+    if len(counts) > 0:
+        # number of points in each cluster
+        reduction['{0}_clusters_count'.format(tool)] = counts.tolist()
+        # mean of each cluster
+        reduction['{0}_clusters_x'.format(tool)] = means[:, 0].tolist()
+        reduction['{0}_clusters_y'.format(tool)] = means[:, 1].tolist()
+        # cov matrix of each cluster (None for clusters of one point)
+        single = counts == 1
+        var_x = np.where(single, None, covariances[:, 0, 0])
+        var_y = np.where(single, None, covariances[:, 1, 1])
+        var_x_y = np.where(single, None, covariances[:, 0, 1])
+        reduction['{0}_clusters_var_x'.format(tool)] = var_x.tolist()
+        reduction['{0}_clusters_var_y'.format(tool)] = var_y.tolist()
+        reduction['{0}_clusters_var_x_y'.format(tool)] = var_x_y.tolist()
+    return reduction
+
+
 @reducer_wrapper(process_data=process_data_by_frame, defaults_data=DEFAULTS, user_id=True)
 @subtask_wrapper
 def point_reducer_dbscan(data_by_tool, **kwargs):
@@ -57,32 +100,10 @@ def point_reducer_dbscan(data_by_tool, **kwargs):
             # clean `None` values for the list
             loc_list_clean = [xy for xy in loc_list if None not in xy]
             loc = np.array(loc_list_clean)
-            # original data points in order used by cluster code
-            clusters[frame]['{0}_points_x'.format(tool)] = loc[:, 0].tolist()
-            clusters[frame]['{0}_points_y'.format(tool)] = loc[:, 1].tolist()
-            # default each point in no cluster
-            clusters[frame]['{0}_cluster_labels'.format(tool)] = [-1] * loc.shape[0]
             if loc.shape[0] >= kwargs['min_samples']:
-                db = DBSCAN(**kwargs).fit(loc)
-                # what cluster each point belongs to
-                clusters[frame]['{0}_cluster_labels'.format(tool)] = db.labels_.tolist()
-                for k in set(db.labels_):
-                    if k > -1:
-                        idx = db.labels_ == k
-                        # number of points in the cluster
-                        clusters[frame].setdefault('{0}_clusters_count'.format(tool), []).append(int(idx.sum()))
-                        # mean of the cluster
-                        k_loc = loc[idx].mean(axis=0)
-                        clusters[frame].setdefault('{0}_clusters_x'.format(tool), []).append(float(k_loc[0]))
-                        clusters[frame].setdefault('{0}_clusters_y'.format(tool), []).append(float(k_loc[1]))
-                        # cov matrix of the cluster
-                        if idx.sum() > 1:
-                            k_cov = np.cov(loc[idx].T)
-                            clusters[frame].setdefault('{0}_clusters_var_x'.format(tool), []).append(float(k_cov[0, 0]))
-                            clusters[frame].setdefault('{0}_clusters_var_y'.format(tool), []).append(float(k_cov[1, 1]))
-                            clusters[frame].setdefault('{0}_clusters_var_x_y'.format(tool), []).append(float(k_cov[0, 1]))
-                        else:
-                            clusters[frame].setdefault('{0}_clusters_var_x'.format(tool), []).append(None)
-                            clusters[frame].setdefault('{0}_clusters_var_y'.format(tool), []).append(None)
-                            clusters[frame].setdefault('{0}_clusters_var_x_y'.format(tool), []).append(None)
+                labels = DBSCAN(**kwargs).fit(loc).labels_
+            else:
+                # default each point in no cluster
+                labels = np.full(loc.shape[0], -1)
+            clusters[frame].update(summarize_clusters(tool, loc, labels))
     return clusters
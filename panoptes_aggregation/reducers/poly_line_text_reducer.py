@@ -16,7 +16,9 @@ DEFAULTS = {
     'dot_freq': {'default': 'line', 'type': str},
     'min_samples': {'default': 1, 'type': int},
     'low_consensus_threshold': {'default': 3, 'type': float},
-    'minimum_views': {'default': 5, 'type': int}
+    'minimum_views': {'default': 5, 'type': int},
+    'alignment': {'default': 'collatex', 'type': str},
+    'frame_workers': {'default': 1, 'type': int}
 }
 
 DEFAULTS_PROCESS = {
@@ -97,6 +99,10 @@ def poly_line_text_reducer(data_by_frame, **kwargs_dbscan):
         * `min_word_count` : The minimum number of times a word must be identified for it to be kept in the consensus text.
         * `low_consensus_threshold` : The minimum consensus score allowed to be considered "done"
         * `minimum_views` : A value that is passed along to the font-end to set when lines should turn grey (has no effect on aggregation)
+        * `alignment` : The backend used to align the words of each line, either `collatex` (default) or `numpy`.
+          See :mod:`panoptes_aggregation.reducers.text_alignment`.
+        * `frame_workers` : The number of processes used to reduce the frames of a subject in parallel (default 1).
+          See :meth:`panoptes_aggregation.reducers.text_utils.map_frames`.
 
     Returns
     -------
@@ -132,5 +138,14 @@ def poly_line_text_reducer(data_by_frame, **kwargs_dbscan):
     kwargs_cluster['gutter_tol'] = kwargs_dbscan.pop('gutter_tol')
     kwargs_cluster['dot_freq'] = kwargs_dbscan.pop('dot_freq')
     kwargs_cluster['min_word_count'] = kwargs_dbscan.pop('min_word_count')
+    kwargs_cluster['alignment'] = kwargs_dbscan.pop('alignment', 'collatex')
     _ = kwargs_dbscan.pop('minimum_views')
-    return cluster_by_frame(data_by_frame, kwargs_cluster, kwargs_dbscan, user_ids_input, low_consensus_threshold)
+    frame_workers = kwargs_dbscan.pop('frame_workers', 1)
+    return cluster_by_frame(
+        data_by_frame,
+        kwargs_cluster,
+        kwargs_dbscan,
+        user_ids_input,
+        low_consensus_threshold,
+        frame_workers=frame_workers
+    )
@@ -12,10 +12,11 @@ from sklearn.cluster import DBSCAN
 import numpy as np
 from collections import OrderedDict
 from .reducer_wrapper import reducer_wrapper
-from .polygon_reducer_utils import IoU_metric_polygon, cluster_average_last, \
+from .polygon_reducer_utils import cluster_average_last, \
     cluster_average_intersection, cluster_average_union, \
     cluster_average_median, IoU_distance_matrix_of_cluster, \
-    IoU_cluster_mean_distance
+    IoU_cluster_mean_distance, IoU_distance_graph_polygon, \
+    IoU_precomputed_distances_polygon
 import shapely
 
 DEFAULTS = {
@@ -213,13 +214,14 @@ def polygon_reducer(data_by_tool, **kwargs_dbscan):
             # default each polygon in no cluster
             clusters[frame]['{0}_cluster_labels'.format(tool)] = [-1] * num_polygons
             if num_polygons >= min_samples:  # If clustering can be done
+                # The IoU distances are found once and used for both the clustering and the consensus
+                distance_graph = IoU_distance_graph_polygon(X, data)
                 db = DBSCAN(
-                    metric=IoU_metric_polygon,
-                    metric_params={'data_in': data},
+                    metric='precomputed',
                     min_samples=min_samples,
                     **kwargs_dbscan
                 )
-                db.fit(X)
+                db.fit(IoU_precomputed_distances_polygon(X, data, kwargs_dbscan.get('eps', 0.5), distance_graph=distance_graph))
                 labels_array = db.labels_
                 # Update the cluster labels of polygons
                 clusters[frame]['{0}_cluster_labels'.format(tool)] = labels_array.tolist()
@@ -237,7 +239,7 @@ def polygon_reducer(data_by_tool, **kwargs_dbscan):
                         kwargs_cluster = {}
                         kwargs_cluster['created_at'] = created_at_full_array[cdx]
                         # The distance matrix is used to find the consensus and is sometimes used in the average
-                        distance_matrix = IoU_distance_matrix_of_cluster(cdx, X, data)
+                        distance_matrix = IoU_distance_matrix_of_cluster(cdx, X, data, distance_graph=distance_graph)
                         kwargs_cluster['distance_matrix'] = distance_matrix
                         # Find the consensus of this cluster and add it as float
                         consensus = float(1 - IoU_cluster_mean_distance(distance_matrix))
@@ -13,8 +13,9 @@ from sklearn.cluster import DBSCAN
 import numpy as np
 from collections import OrderedDict
 from .reducer_wrapper import reducer_wrapper
-from .polygon_reducer_utils import IoU_metric_polygon, \
-    IoU_distance_matrix_of_cluster, IoU_cluster_mean_distance, \
+from .polygon_reducer_utils import IoU_distance_graph_polygon, \
+    IoU_precomputed_distances_polygon, IoU_distance_matrix_of_cluster, \
+    IoU_cluster_mean_distance, \
     cluster_average_intersection_contours, \
     cluster_average_intersection_contours_rasterisation
 from .polygon_reducer import process_data
@@ -104,13 +105,14 @@ def polygon_reducer_contours(data_by_tool, **kwargs_dbscan):
             num_polygons = len(data)
 
             if num_polygons >= min_samples:  # If clustering can be done
+                # The IoU distances are found once and used for both the clustering and the consensus
+                distance_graph = IoU_distance_graph_polygon(X, data)
                 db = DBSCAN(
-                    metric=IoU_metric_polygon,
-                    metric_params={'data_in': data},
+                    metric='precomputed',
                     min_samples=min_samples,
                     **kwargs_dbscan
                 )
-                db.fit(X)
+                db.fit(IoU_precomputed_distances_polygon(X, data, kwargs_dbscan.get('eps', 0.5), distance_graph=distance_graph))
                 labels_array = db.labels_
                 unique_labels = set(labels_array)
                 # If there are no clusters, again return just the cluster labels
@@ -127,7 +129,7 @@ def polygon_reducer_contours(data_by_tool, **kwargs_dbscan):
                             cluster = OrderedDict()
                             cluster[frame] = OrderedDict()
                             # The distance matrix is used to find the consensus and is sometimes used in the average
-                            distance_matrix = IoU_distance_matrix_of_cluster(cdx, X, data)
+                            distance_matrix = IoU_distance_matrix_of_cluster(cdx, X, data, distance_graph=distance_graph)
                             # Find the consensus of this cluster and add it as float
                             consensus = float(1 - IoU_cluster_mean_distance(distance_matrix))
                             # Now find the "average" of this cluster, using the provided average choice
@@ -8,6 +8,8 @@ import numpy as np
 import shapely
 import datetime
 from scipy.linalg import issymmetric
+from scipy.sparse import csr_matrix
+from sklearn.neighbors import sort_graph_by_row_values
 from pandas._libs.tslibs.timestamps import Timestamp as pdtimestamp
 from contourpy import contour_generator
 from shapelysmooth import taubin_smooth
@@ -97,7 +99,175 @@ def IoU_metric_polygon(a, b, data_in=[]):
     return 1 - intersection / union
 
 
-def IoU_distance_matrix_of_cluster(cdx, X, data):
+def IoU_distance_graph_polygon(X, data):
+    '''Find the `IoU_metric_polygon` distance between every pair of
+    overlapping polygons.  This is done once for all the polygons of a tool,
+    so the same distances can be used to cluster the polygons (see
+    `IoU_precomputed_distances_polygon`) and to find the distance matrix of
+    each cluster (see `IoU_distance_matrix_of_cluster`).
+
+    The pairs of polygons that overlap are found with a `shapely.STRtree` and
+    the IoU distance is only calculated for them.  Any pair not stored has a
+    distance of 1 (the polygons don't overlap) or `inf` (the polygons were
+    made by the same user).
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array with each row mapping to the data held in `data`. The first
+        column contains row indices and the second column is an index assigned
+        to each user.
+    data : list
+        A list of dicts that take the form
+        {`polygon`: shapely.geometry.polygon.Polygon, 'gold_standard', bool}
+        There is one element in this list for each polygon.
+
+    Returns
+    -------
+    graph : scipy.sparse.csr_matrix
+        A sparse square array containing the `IoU_metric_polygon` distance
+        between each pair of overlapping polygons made by different users
+        (including each polygon and itself).  Distances of zero are stored
+        explicitly.
+    '''
+    X = np.asarray(X)
+    num_polygons = len(X)
+    polygons = np.array([data[int(row)]['polygon'] for row in X[:, 0]])
+    tree = shapely.STRtree(polygons)
+    i, j = tree.query(polygons, predicate='intersects')
+    # each pair is found twice, keep one of them and drop the same user pairs
+    keep = (i < j) & (X[i, 1] != X[j, 1])
+    i, j = i[keep], j[keep]
+    simple = shapely.is_simple(polygons)
+    keep = simple[i] & simple[j]
+    i, j = i[keep], j[keep]
+    intersection = shapely.area(shapely.intersection(polygons[i], polygons[j]))
+    union = shapely.area(shapely.union(polygons[i], polygons[j]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distances = 1 - intersection / union
+    # polygons with no area can not overlap
+    distances[np.isnan(distances)] = 1
+    diagonal = np.arange(num_polygons)
+    rows = np.concatenate([i, j, diagonal])
+    cols = np.concatenate([j, i, diagonal])
+    values = np.concatenate([distances, distances, np.zeros(num_polygons)])
+    return csr_matrix((values, (rows, cols)), shape=(num_polygons, num_polygons))
+
+
+def IoU_distance_matrix_from_graph(X, distance_graph):
+    '''Fill in the full `IoU_metric_polygon` distance matrix from the
+    distances of the overlapping polygons.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array with each row mapping to a polygon. The first column
+        contains row indices and the second column is an index assigned
+        to each user.
+    distance_graph : scipy.sparse.csr_matrix
+        The distances between the overlapping polygons in `X`, found with
+        `IoU_distance_graph_polygon`.
+
+    Returns
+    -------
+    distances_matrix : numpy.ndarray
+        A symmetric-square array, with the off-diagonal elements containing the
+        IoU distance between the polygons. The diagonal elements are all zero.
+    '''
+    X = np.asarray(X)
+    users = X[:, 1]
+    distances_matrix = np.ones((len(X), len(X)))
+    distances_matrix[users[:, None] == users[None, :]] = np.inf
+    stored = distance_graph.tocoo()
+    distances_matrix[stored.row, stored.col] = stored.data
+    np.fill_diagonal(distances_matrix, 0)
+    return distances_matrix
+
+
+def IoU_radius_graph_polygon(X, data, eps, distance_graph=None):
+    '''Find the sparse radius neighborhood graph of the polygons using
+    `IoU_metric_polygon`.  Only pairs of polygons with a distance less than or
+    equal to `eps` are stored, so it can be passed into DBSCAN with
+    `metric='precomputed'`.
+
+    Polygons that don't overlap have a distance of 1, so for `eps < 1`
+    only overlapping pairs can be neighbors (see `IoU_distance_graph_polygon`).
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array with each row mapping to the data held in `data`. The first
+        column contains row indices and the second column is an index assigned
+        to each user.
+    data : list
+        A list of dicts that take the form
+        {`polygon`: shapely.geometry.polygon.Polygon, 'gold_standard', bool}
+        There is one element in this list for each polygon.
+    eps : float
+        The maximum distance between two polygons for them to be neighbors,
+        must be less than 1.
+    distance_graph : scipy.sparse.csr_matrix
+        The distances found with `IoU_distance_graph_polygon`, these are found
+        from `X` and `data` if not given.
+
+    Returns
+    -------
+    graph : scipy.sparse.csr_matrix
+        A sparse square array containing the `IoU_metric_polygon` distance
+        between each pair of neighbors (including each polygon and itself).
+    '''
+    if eps >= 1:
+        raise ValueError('`eps` must be less than 1 to build a sparse radius graph')
+    if distance_graph is None:
+        distance_graph = IoU_distance_graph_polygon(X, data)
+    graph = distance_graph.tocoo()
+    keep = graph.data <= eps
+    radius_graph = csr_matrix(
+        (graph.data[keep], (graph.row[keep], graph.col[keep])),
+        shape=graph.shape
+    )
+    # DBSCAN expects the neighbors of each polygon sorted by distance
+    return sort_graph_by_row_values(radius_graph, warn_when_not_sorted=False)
+
+
+def IoU_precomputed_distances_polygon(X, data, eps, distance_graph=None):
+    '''Find the distances DBSCAN is fit to with `metric='precomputed'`.  This
+    is the sparse radius graph (see `IoU_radius_graph_polygon`) if `eps < 1`,
+    otherwise it is the full distance matrix with the distance between the
+    polygons of the same user set to more than `eps` (DBSCAN does not accept
+    `inf`).
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        A 2D array with each row mapping to the data held in `data`. The first
+        column contains row indices and the second column is an index assigned
+        to each user.
+    data : list
+        A list of dicts that take the form
+        {`polygon`: shapely.geometry.polygon.Polygon, 'gold_standard', bool}
+        There is one element in this list for each polygon.
+    eps : float
+        The maximum distance between two polygons for them to be neighbors
+    distance_graph : scipy.sparse.csr_matrix
+        The distances found with `IoU_distance_graph_polygon`, these are found
+        from `X` and `data` if not given.
+
+    Returns
+    -------
+    distances : scipy.sparse.csr_matrix or numpy.ndarray
+        The distances between the polygons
+    '''
+    if distance_graph is None:
+        distance_graph = IoU_distance_graph_polygon(X, data)
+    if eps < 1:
+        return IoU_radius_graph_polygon(X, data, eps, distance_graph=distance_graph)
+    distances_matrix = IoU_distance_matrix_from_graph(X, distance_graph)
+    distances_matrix[distances_matrix == np.inf] = eps + 1
+    return distances_matrix
+
+
+def IoU_distance_matrix_of_cluster(cdx, X, data, distance_graph=None):
     '''Find distance matrix using `IoU_metric_polygon` for a cluster.
 
     The `cdx` argument is used to define the cluster out of the full `X` and
@@ -116,6 +286,10 @@ def IoU_distance_matrix_of_cluster(cdx, X, data):
         A list of dicts that take the form
         {`polygon`: shapely.geometry.polygon.Polygon, 'time': float, 'gold_standard', bool}
         There is one element in this list for each member of the cluster.
+    distance_graph : scipy.sparse.csr_matrix
+        The distances between all the polygons in `X` found with
+        `IoU_distance_graph_polygon`.  If given the cluster's distances are
+        taken from it rather than found again.
 
     Returns
     -------
@@ -124,6 +298,8 @@ def IoU_distance_matrix_of_cluster(cdx, X, data):
         IoU distance between the cluster members. The diagonal elements are all
         zero.
     '''
+    if distance_graph is not None:
+        return IoU_distance_matrix_from_graph(X[cdx], distance_graph[cdx][:, cdx])
     cluster_X = X[cdx]
     num_in_cluster = np.shape(cluster_X)[0]
     # If a cluster of 1 is provided, this will correctly default to a distance of 0
@@ -437,6 +613,67 @@ def cluster_average_intersection_contours(data, **kwargs):
     return intersection_contours
 
 
+def _add_polygon_to_grid(polygon, x_values, y_values, z_grid):
+    '''Internal function to add one to each point of `z_grid` that is inside
+    `polygon`, giving the same counts as `shapely.contains_xy`. Only the grid
+    points inside the bounding box of the polygon are looked at. For simple
+    polygons the points between each pair of edge crossings along a grid row
+    are filled in, and `shapely.contains_xy` is only used for the points next
+    to an edge crossing and for rows that pass through a vertex.'''
+    x_min, y_min, x_max, y_max = shapely.bounds(polygon)
+    i0 = np.searchsorted(x_values, x_min, 'left')
+    i1 = np.searchsorted(x_values, x_max, 'right')
+    j0 = np.searchsorted(y_values, y_min, 'left')
+    j1 = np.searchsorted(y_values, y_max, 'right')
+    if (i0 >= i1) or (j0 >= j1):
+        return
+    x_box = x_values[i0:i1]
+    y_box = y_values[j0:j1]
+    if not shapely.is_simple(polygon):
+        x_grid, y_grid = np.meshgrid(x_box, y_box)
+        z_grid[j0:j1, i0:i1] += shapely.contains_xy(polygon, x_grid, y_grid)
+        return
+    edges = [shapely.get_coordinates(ring) for ring in shapely.get_rings(polygon)]
+    start = np.concatenate([coords[:-1] for coords in edges])
+    end = np.concatenate([coords[1:] for coords in edges])
+    # Each edge crosses the rows with `y_low <= y < y_high`, so every row
+    # crosses the boundary an even number of times
+    y_low = np.minimum(start[:, 1], end[:, 1])
+    y_high = np.maximum(start[:, 1], end[:, 1])
+    row_start = np.searchsorted(y_box, y_low, 'left')
+    number_of_rows = np.searchsorted(y_box, y_high, 'left') - row_start
+    edge = np.repeat(np.arange(len(start)), number_of_rows)
+    row = np.arange(number_of_rows.sum()) \
+        - np.repeat(np.cumsum(number_of_rows) - number_of_rows, number_of_rows) \
+        + np.repeat(row_start, number_of_rows)
+    t = (y_box[row] - start[edge, 1]) / (end[edge, 1] - start[edge, 1])
+    x_cross = start[edge, 0] + t * (end[edge, 0] - start[edge, 0])
+    order = np.lexsort((x_cross, row))
+    row = row[order][::2]
+    x_cross = x_cross[order]
+    # The points strictly between two crossings are inside, apart from the
+    # point on either side of each crossing as the crossing has rounding errors
+    column_in = np.searchsorted(x_box, x_cross[::2], 'right')
+    column_out = np.searchsorted(x_box, x_cross[1::2], 'left')
+    fill = (column_in + 1) < (column_out - 1)
+    mask = np.zeros((len(y_box), len(x_box) + 1), dtype=int)
+    np.add.at(mask, (row[fill], column_in[fill] + 1), 1)
+    np.add.at(mask, (row[fill], column_out[fill] - 1), -1)
+    mask = np.cumsum(mask[:, :-1], axis=1).astype(bool)
+    check = np.zeros(mask.shape, dtype=bool)
+    for column in [column_in - 1, column_in, column_out - 1, column_out]:
+        in_box = (column >= 0) & (column < len(x_box))
+        check[row[in_box], column[in_box]] = True
+    check[np.isin(y_box, start[:, 1])] = True
+    check_row, check_column = np.nonzero(check)
+    mask[check_row, check_column] = shapely.contains_xy(
+        polygon,
+        x=x_box[check_column],
+        y=y_box[check_row]
+    )
+    z_grid[j0:j1, i0:i1] += mask
+
+
 def cluster_average_intersection_contours_rasterisation(data, **kwargs):
     '''Find contours of intersection as a list. Each item of the list will
     be the largest contour of `i` intersections, with the next item being the
@@ -492,15 +729,8 @@ def cluster_average_intersection_contours_rasterisation(data, **kwargs):
     x_grid, y_grid = np.meshgrid(x_values, y_values)
     z_grid = np.zeros(np.shape(x_grid))
 
-    x_grid_flat, y_grid_flat = x_grid.flatten(), y_grid.flatten()
     for polygon in polygons:
-        # Find flattened grid of bools for if point inside polygon
-        count_grid = shapely.contains_xy(polygon, x=x_grid_flat, y=y_grid_flat)
-        # Convert to 0 or 1
-        count_grid = count_grid.astype('int')
-        # make grid again
-        count_grid = np.reshape(count_grid, np.shape(z_grid))
-        z_grid += count_grid
+        _add_polygon_to_grid(polygon, x_values, y_values, z_grid)
 
     # Find the contour lines
     cont_gen = contour_generator(x=x_grid, y=y_grid, z=z_grid)
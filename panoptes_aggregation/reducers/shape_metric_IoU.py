@@ -133,6 +133,88 @@ def IoU_metric(params1, params2, shape, eps_t=None):
     return 1 - intersection / union
 
 
+def IoU_distance_matrix(params_list, shape, eps_t=None):
+    '''Find the Intersection of Union distance between every pair of shapes.
+    Each shape is converted to a geometry once, an STRtree is used to find
+    the pairs that overlap, and the intersections and unions are only
+    calculated for those pairs.  The values are the same as :meth:`IoU_metric`
+    gives for each pair.
+
+    Parameters
+    ----------
+    params_list : list
+        A list of shape parameters (as defined by PFE)
+    shape : string
+        The shape these parameters belong to (see :meth:`panoptes_to_geometry` for
+        supported shapes)
+    eps_t : float
+        For temporal tools, this defines the temporal width of the rectangle.
+
+    Returns
+    -------
+    distances : numpy.array
+        A square array with the IoU distance between each pair of shapes
+    '''
+    geometries = numpy.array([panoptes_to_geometry(params, shape) for params in params_list])
+    areas = shapely.area(geometries)
+    # pairs that don't overlap have a distance of 1 (or inf if neither has an area)
+    union_no_overlap = areas[:, numpy.newaxis] + areas[numpy.newaxis, :]
+    if 'temporal' in shape:
+        union_no_overlap = union_no_overlap * eps_t
+    distances = numpy.where(union_no_overlap == 0, numpy.inf, 1.0)
+    tree = shapely.STRtree(geometries)
+    i, j = tree.query(geometries, predicate='intersects')
+    intersection = shapely.area(shapely.intersection(geometries[i], geometries[j]))
+    if 'temporal' in shape:
+        time_x = numpy.array([params[-1] for params in params_list]) - eps_t
+        time_geometries = shapely.box(time_x, 0, time_x + eps_t, 1)
+        time_intersection = shapely.area(shapely.intersection(time_geometries[i], time_geometries[j]))
+        intersection = intersection * time_intersection
+        union = (areas[i] + areas[j]) * eps_t - intersection
+    else:
+        union = shapely.area(shapely.union(geometries[i], geometries[j]))
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        distances[i, j] = numpy.where(union == 0, numpy.inf, 1 - intersection / union)
+    return distances
+
+
+def precomputed_IoU_kwargs(params_list, shape, eps_t, kwargs):
+    '''Swap the IoU metric used by a clustering algorithm for a precomputed
+    distance matrix.  The clustering algorithms only accept finite and non-negative
+    precomputed distances, if any pair of shapes has no area (or a temporal pair has a
+    negative distance) the inputs are returned unchanged.  The tree based neighbor
+    searches (`algorithm` of `ball_tree` or `kd_tree`) do not accept precomputed
+    distances, so the inputs are also returned unchanged for these.
+
+    Parameters
+    ----------
+    params_list : list
+        A list of shape parameters (as defined by PFE)
+    shape : string
+        The shape these parameters belong to (see :meth:`panoptes_to_geometry` for
+        supported shapes)
+    eps_t : float
+        For temporal tools, this defines the temporal width of the rectangle.
+    kwargs : dict
+        The keywords for the clustering algorithm using :meth:`IoU_metric`
+
+    Returns
+    -------
+    X : numpy.array
+        The data to pass into the clustering algorithm's `fit` method
+    kwargs : dict
+        The keywords for the clustering algorithm
+    '''
+    if kwargs.get('algorithm', 'auto') not in ['auto', 'brute']:
+        return params_list, kwargs
+    distances = IoU_distance_matrix(params_list, shape, eps_t=eps_t)
+    if not (numpy.isfinite(distances).all() and (distances >= 0).all()):
+        return params_list, kwargs
+    kwargs_precomputed = {key: value for key, value in kwargs.items() if key != 'metric_params'}
+    kwargs_precomputed['metric'] = 'precomputed'
+    return distances, kwargs_precomputed
+
+
 def average_bounds(params_list, shape):
     '''Find the bounding box for the average shape for each of the shapes
     parameters.
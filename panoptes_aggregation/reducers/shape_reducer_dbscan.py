@@ -12,7 +12,8 @@ from .subtask_reducer_wrapper import subtask_wrapper
 from ..shape_tools import SHAPE_LUT
 from .shape_process_data import process_data, DEFAULTS_PROCESS
 from .shape_metric import get_shape_metric_and_avg
-from .shape_metric_IoU import IoU_metric, average_shape_IoU
+from .shape_metric_IoU import IoU_metric, average_shape_IoU, precomputed_IoU_kwargs
+from .cluster_summary import cluster_summary
 
 DEFAULTS = {
     'eps': {'default': 5.0, 'type': float},
@@ -99,20 +100,27 @@ def shape_reducer_dbscan(data_by_tool, **kwargs):
             # default each point in no cluster
             clusters[frame]['{0}_cluster_labels'.format(tool)] = [-1] * loc.shape[0]
             if loc.shape[0] >= kwargs['min_samples']:
-                db = DBSCAN(**kwargs).fit(loc)
+                fit_data, fit_kwargs = loc, kwargs
+                if metric_type == 'iou':
+                    fit_data, fit_kwargs = precomputed_IoU_kwargs(loc, shape, eps_t, kwargs)
+                db = DBSCAN(**fit_kwargs).fit(fit_data)
                 # what cluster each point belongs to
                 clusters[frame]['{0}_cluster_labels'.format(tool)] = db.labels_.tolist()
-                for k in set(db.labels_):
-                    if k > -1:
-                        idx = db.labels_ == k
-                        # number of points in the cluster
-                        clusters[frame].setdefault('{0}_clusters_count'.format(tool), []).append(int(idx.sum()))
-                        # mean of the cluster
-                        if metric_type == 'euclidean':
-                            k_loc = avg(loc[idx])
-                        elif metric_type == 'iou':
-                            k_loc, sigma = avg(loc[idx], shape, eps_t, estimate=estimate_average)
-                            clusters[frame].setdefault('{0}_clusters_sigma'.format(tool), []).append(float(sigma))
-                        for pdx, param in enumerate(shape_params):
-                            clusters[frame].setdefault('{0}_clusters_{1}'.format(tool, param), []).append(float(k_loc[pdx]))
+                counts, means, _, members = cluster_summary(loc, db.labels_)
+                if len(counts) == 0:
+                    continue
+                # number of points in each cluster
+                clusters[frame]['{0}_clusters_count'.format(tool)] = counts.tolist()
+                # mean of each cluster
+                if metric_type == 'euclidean':
+                    if kwargs['metric'] == 'euclidean':
+                        k_locs = means
+                    else:
+                        k_locs = np.array([avg(loc[idx]) for idx in members])
+                elif metric_type == 'iou':
+                    k_locs, sigmas = zip(*[avg(loc[idx], shape, eps_t, estimate=estimate_average) for idx in members])
+                    k_locs = np.array(k_locs)
+                    clusters[frame]['{0}_clusters_sigma'.format(tool)] = np.array(sigmas, dtype=float).tolist()
+                for pdx, param in enumerate(shape_params):
+                    clusters[frame]['{0}_clusters_{1}'.format(tool, param)] = k_locs[:, pdx].astype(float).tolist()
     return clusters
@@ -13,7 +13,7 @@ from .subtask_reducer_wrapper import subtask_wrapper
 from ..shape_tools import SHAPE_LUT
 from .shape_process_data import process_data, DEFAULTS_PROCESS
 from .shape_metric import get_shape_metric_and_avg
-from .shape_metric_IoU import IoU_metric, average_shape_IoU
+from .shape_metric_IoU import IoU_metric, average_shape_IoU, precomputed_IoU_kwargs
 
 
 DEFAULTS = {
@@ -104,7 +104,10 @@ def shape_reducer_hdbscan(data_by_tool, **kwargs):
             clusters[frame]['{0}_cluster_labels'.format(tool)] = [-1] * loc.shape[0]
             clusters[frame]['{0}_cluster_probabilities'.format(tool)] = [0] * loc.shape[0]
             if loc.shape[0] >= kwargs['min_cluster_size']:
-                db = HDBSCAN(**kwargs).fit(loc)
+                fit_data, fit_kwargs = loc, kwargs
+                if metric_type == 'iou':
+                    fit_data, fit_kwargs = precomputed_IoU_kwargs(loc, shape, eps_t, kwargs)
+                db = HDBSCAN(**fit_kwargs).fit(fit_data)
                 # what cluster each point belongs to
                 clusters[frame]['{0}_cluster_labels'.format(tool)] = db.labels_.tolist()
                 clusters[frame]['{0}_cluster_probabilities'.format(tool)] = db.probabilities_.tolist()
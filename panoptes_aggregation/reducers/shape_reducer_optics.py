@@ -14,7 +14,7 @@ from .subtask_reducer_wrapper import subtask_wrapper
 from ..shape_tools import SHAPE_LUT
 from .shape_process_data import process_data, DEFAULTS_PROCESS
 from .shape_metric import get_shape_metric_and_avg
-from .shape_metric_IoU import IoU_metric, average_shape_IoU
+from .shape_metric_IoU import IoU_metric, average_shape_IoU, precomputed_IoU_kwargs
 
 
 warnings.filterwarnings("ignore", category=RuntimeWarning, module='sklearn.cluster')
@@ -105,9 +105,12 @@ def shape_reducer_optics(data_by_tool, **kwargs):
             # default each point in no cluster
             clusters[frame]['{0}_cluster_labels'.format(tool)] = [-1] * loc.shape[0]
             if loc.shape[0] >= kwargs['min_samples']:
+                fit_data, fit_kwargs = loc, kwargs
+                if metric_type == 'iou':
+                    fit_data, fit_kwargs = precomputed_IoU_kwargs(loc, shape, eps_t, kwargs)
                 with warnings.catch_warnings():
                     warnings.filterwarnings('ignore', category=RuntimeWarning)
-                    db = OPTICS(**kwargs).fit(loc)
+                    db = OPTICS(**fit_kwargs).fit(fit_data)
                 # what cluster each point belongs to
                 clusters[frame]['{0}_cluster_labels'.format(tool)] = db.labels_.tolist()
                 for k in set(db.labels_):
@@ -0,0 +1,433 @@
+'''
+Text alignment
+--------------
+This module provides the functions used by the text reducers to align the
+words transcribed by each volunteer for one line of text.  Two backends are
+available:
+
+* `collatex`: The `collatex <https://pypi.org/project/collatex/>`_ variant graph
+  with near matching (the default).
+* `numpy`: The same progressive alignment done with NumPy.  Repeated blocks of
+  words are found from a suffix array, each transcription is aligned to the ranks
+  of the words already aligned with a Needleman-Wunsch table filled one row at a
+  time, and words that are not aligned are moved to the column with the closest
+  Levenshtein match.  This follows the steps `collatex` takes so it gives the same
+  alignment, but it works on plain arrays and lists rather than token, graph, and
+  table objects so it is much faster.
+'''
+import re
+import warnings
+import Levenshtein
+import numpy as np
+
+with warnings.catch_warnings():
+    # collatex is a bit old, we can safely ignore this message as the display
+    # functions are optional and never used in this code
+    warnings.filterwarnings('ignore', category=DeprecationWarning, message='Importing display')
+    import collatex as col
+
+
+def tokenize(self, contents):
+    '''Tokenize only on space so angle bracket tags are not split'''
+    return re.findall(r'[^\s$]+|[$]', contents)
+
+
+# override the built-in tokenize
+col.core_classes.WordPunctuationTokenizer.tokenize = tokenize
+
+ALIGNMENT_BACKENDS = ['collatex', 'numpy']
+
+# the directions a cell of the alignment table can be reached from
+_DIAGONAL = 0
+_LEFT = 1
+_UP = 2
+
+
+def align_texts(texts, backend='collatex'):
+    '''Align the words of a list of transcriptions of the same line of text
+
+    Parameters
+    ----------
+    texts : list
+        A list of strings, one for each volunteer.  The strings are split into
+        words on white space.
+    backend : str
+        The alignment backend to use, either `collatex` or `numpy`
+
+    Returns
+    -------
+    columns : list
+        A list with one dictionary for each aligned word (column of the alignment
+        table).  The keys are the index in `texts` of each transcription that has a
+        word in the column, and the values are the words.
+    '''
+    if backend == 'collatex':
+        return _align_texts_collatex(texts)
+    if backend == 'numpy':
+        return _align_texts_numpy(texts)
+    raise ValueError('The alignment backend must be one of {0}, not {1}'.format(ALIGNMENT_BACKENDS, backend))
+
+
+def _align_texts_collatex(texts):
+    if len(texts) == 0:
+        return []
+    collation = col.Collation()
+    for index, text in enumerate(texts):
+        collation.add_plain_witness(str(index), text)
+    alignment_table = col.collate(collation, near_match=True, segmentation=False)
+    columns = [
+        {int(key): str(tokens[0]) for key, tokens in column.tokens_per_witness.items()}
+        for column in alignment_table.columns
+    ]
+    # fix memory leak by deleting this
+    del alignment_table
+    return columns
+
+
+class _VariantGraph(object):
+    '''Internal class holding the words aligned so far as a graph with one
+    vertex for each column of words, in the same order `collatex` uses'''
+    def __init__(self):
+        # vertex 0 is the start and vertex 1 is the end
+        self.labels = ['start', 'end']
+        self.tokens = [{}, {}]
+        self.successors = [[], []]
+        self.predecessors = [[], []]
+        self.near_predecessors = [[], []]
+
+    def add_vertex(self, label, witness, token):
+        self.labels.append(label)
+        self.tokens.append({witness: token})
+        self.successors.append([])
+        self.predecessors.append([])
+        self.near_predecessors.append([])
+        return len(self.labels) - 1
+
+    def connect(self, source, target):
+        if target not in self.successors[source]:
+            self.successors[source].append(target)
+            self.predecessors[target].append(source)
+
+    def topological_order(self):
+        in_degree = [len(predecessors) for predecessors in self.predecessors]
+        generation = [vertex for vertex, degree in enumerate(in_degree) if degree == 0]
+        order = []
+        while generation:
+            order += generation
+            next_generation = []
+            for vertex in generation:
+                for successor in self.successors[vertex]:
+                    in_degree[successor] -= 1
+                    if in_degree[successor] == 0:
+                        next_generation.append(successor)
+            generation = next_generation
+        return order
+
+    def ranking(self):
+        '''The rank (column) of each vertex and the vertices at each rank'''
+        order = self.topological_order()
+        rank = [0] * len(self.labels)
+        by_rank = {}
+        for vertex in order:
+            rank[vertex] = max((rank[source] for source in self.predecessors[vertex]), default=-1) + 1
+            by_rank.setdefault(rank[vertex], []).append(vertex)
+        # near matched vertices are moved to the rank of their match
+        for vertex in reversed(order):
+            for source in self.near_predecessors[vertex]:
+                by_rank[rank[vertex]].remove(vertex)
+                rank[vertex] = rank[source]
+                by_rank[rank[vertex]].append(vertex)
+        return rank, by_rank
+
+    def merge(self, witness, words, aligned={}):
+        '''Add the words of a transcription, using the vertex in `aligned` for matched words'''
+        word_vertices = []
+        last = 0
+        for index, word in enumerate(words):
+            vertex = aligned.get(index)
+            if vertex is None:
+                vertex = self.add_vertex(word, witness, word)
+            else:
+                self.tokens[vertex][witness] = word
+            self.connect(last, vertex)
+            word_vertices.append(vertex)
+            last = vertex
+        self.connect(last, 1)
+        return word_vertices
+
+    def near_match(self):
+        '''Move each vertex that is followed by a gap to the rank of the vertex
+        in the gap it is the closest Levenshtein match to'''
+        rank, by_rank = self.ranking()
+        for vertex in reversed(self.topological_order()):
+            for source in self.predecessors[vertex]:
+                if rank[vertex] - rank[source] <= 1:
+                    continue
+                if any(rank[target] - rank[source] == 1 for target in self.successors[source]):
+                    continue
+                candidates = [
+                    candidate
+                    for candidate_rank in range(rank[source], rank[vertex])
+                    for candidate in by_rank[candidate_rank]
+                    if candidate != source
+                ]
+                if len(candidates) == 0:
+                    continue
+                ratios = [Levenshtein.ratio(self.labels[source], self.labels[candidate]) for candidate in candidates]
+                winner = candidates[int(np.argmax(ratios))]
+                if winner not in self.near_predecessors[source]:
+                    self.near_predecessors[source].append(winner)
+                rank, by_rank = self.ranking()
+        return rank, by_rank
+
+
+def _align_to_graph(words, match_vertex, number_of_ranks):
+    '''Internal function to find the vertex each word is aligned to
+
+    Parameters
+    ----------
+    words : list
+        The words of the transcription being added
+    match_vertex : dict
+        The vertex with the same word at each (word index, rank - 1) pair
+    number_of_ranks : int
+        The number of ranks in the graph (not counting the start and end vertices)
+
+    Returns
+    -------
+    aligned : dict
+        The vertex each aligned word index is matched to
+    '''
+    rows = len(words) + 1
+    is_match = np.zeros((rows + 1, number_of_ranks), dtype=bool)
+    for index, rank in match_vertex:
+        # is_match[y + 1, x] is True if word `y` matches the vertex at rank `x + 1`
+        is_match[index + 1, rank] = True
+    x = np.arange(number_of_ranks + 1)
+    scores = -x
+    direction = np.full((rows, number_of_ranks + 1), _LEFT, dtype=np.int8)
+    is_match_step = np.zeros((rows, number_of_ranks + 1), dtype=bool)
+    for y in range(1, rows):
+        step = np.where(is_match[y], 1, -1)
+        diagonal = scores[:-1] + step
+        # moving down only scores a match if the word above matched the same rank
+        up_is_match = is_match[y - 1] & is_match[y]
+        up = scores[1:] + np.where(is_match[y - 1], step, -1)
+        # a move left always costs one, so the row is a running maximum
+        best = np.concatenate([[-y], np.maximum(diagonal, up) + x[1:]])
+        new_scores = np.maximum.accumulate(best) - x
+        # ties go to the diagonal, then the left, then the up move
+        from_diagonal = new_scores[1:] == diagonal
+        from_left = (~from_diagonal) & (new_scores[1:] == new_scores[:-1] - 1)
+        direction[y, 0] = _UP
+        direction[y, 1:] = np.where(from_diagonal, _DIAGONAL, np.where(from_left, _LEFT, _UP))
+        is_match_step[y, 1:] = np.where(from_diagonal, is_match[y], (~from_left) & up_is_match)
+        scores = new_scores
+    aligned = {}
+    matched_vertices = set()
+    y = rows - 1
+    x_position = number_of_ranks
+    while (y > 0) or (x_position > 0):
+        if is_match_step[y, x_position]:
+            vertex = match_vertex[(y - 1, x_position - 1)]
+            if vertex not in matched_vertices:
+                aligned[y - 1] = vertex
+                matched_vertices.add(vertex)
+        step_direction = direction[y, x_position]
+        if step_direction != _UP:
+            x_position -= 1
+        if step_direction != _LEFT:
+            y -= 1
+    return aligned
+
+
+def _suffix_array(token_ids):
+    '''Internal function to sort the suffixes of an array of token ids by prefix doubling'''
+    length = len(token_ids)
+    position = np.arange(length)
+    rank = token_ids
+    step = 1
+    while True:
+        # suffixes that run off the end sort first
+        following = np.where(position + step < length, rank[np.minimum(position + step, length - 1)] + 1, 0)
+        suffix_array = np.lexsort((following, rank))
+        keys = np.stack([rank[suffix_array], following[suffix_array]])
+        new_group = np.concatenate([[0], np.any(keys[:, 1:] != keys[:, :-1], axis=0).cumsum()])
+        rank = np.empty(length, dtype=int)
+        rank[suffix_array] = new_group
+        if (new_group[-1] == length - 1) or (step >= length):
+            return suffix_array
+        step *= 2
+
+
+def _lcp_array(token_ids, suffix_array):
+    '''Internal function to find the longest common prefix of each suffix and the one before it (Kasai's method)'''
+    length = len(token_ids)
+    inverse = np.empty(length, dtype=int)
+    inverse[suffix_array] = np.arange(length)
+    lcp = [0] * length
+    common = 0
+    for position in range(length):
+        if inverse[position] == 0:
+            common = 0
+            continue
+        previous = suffix_array[inverse[position] - 1]
+        while (position + common < length) and (previous + common < length) \
+                and (token_ids[position + common] == token_ids[previous + common]):
+            common += 1
+        lcp[inverse[position]] = common
+        common = max(common - 1, 0)
+    return lcp
+
+
+def _repeated_blocks(lcp):
+    '''Internal function to split the LCP array into the (start, end, length) intervals
+    of repeated blocks of words, in the order `collatex` finds them'''
+    closed = []
+    open_intervals = []
+    previous_lcp = 0
+    for index, lcp_value in enumerate(lcp):
+        if lcp_value > previous_lcp:
+            open_intervals.append((index - 1, lcp_value))
+            previous_lcp = lcp_value
+        elif lcp_value < previous_lcp:
+            while open_intervals and (open_intervals[-1][1] > lcp_value):
+                start, length = open_intervals.pop()
+                closed.append((start, index - 1, length))
+            if lcp_value > 0:
+                open_intervals.append((closed[-1][0], lcp_value))
+            previous_lcp = lcp_value
+    for start, length in open_intervals:
+        closed.append((start, len(lcp) - 1, length))
+    return closed
+
+
+def _block_instances(witnesses):
+    '''Internal function to find the repeated blocks of words in all the transcriptions
+
+    Returns
+    -------
+    witness_start : list
+        The position of the first word of each transcription in the array of all the words
+    suffix_array : np.array
+        The suffix array of all the words
+    instances : list
+        For each transcription a list of (position, start, end, length) tuples for each
+        block it has, with `start` and `end` giving the range of the suffix array holding
+        every instance of the block
+    '''
+    token_array = []
+    witness_start = []
+    witness_of_position = []
+    for witness, words in enumerate(witnesses):
+        witness_start.append(len(token_array))
+        token_array += words
+        witness_of_position += [witness] * len(words)
+        # a unique marker between each transcription stops blocks running across them
+        token_array.append('${0}'.format(witness))
+        witness_of_position.append(witness)
+    token_array.pop()
+    vocabulary = {token: index for index, token in enumerate(sorted(set(token_array)))}
+    token_ids = np.array([vocabulary[token] for token in token_array], dtype=int)
+    suffix_array = _suffix_array(token_ids)
+    instances = [[] for _ in witnesses]
+    for start, end, length in _repeated_blocks(_lcp_array(token_ids, suffix_array)):
+        for position in suffix_array[start:end + 1]:
+            instances[witness_of_position[position]].append((position, start, end, length))
+    return witness_start, suffix_array, instances
+
+
+def _offsets(counts):
+    '''Internal function to count up from zero `counts[i]` times for each `i`'''
+    ends = np.cumsum(counts)
+    return np.arange(ends[-1] if len(ends) > 0 else 0) - np.repeat(ends - counts, counts)
+
+
+def _match_cube(instances, suffix_array, start, position_vertex, rank):
+    '''Internal function to find the vertex each word of a transcription matches at each rank
+
+    A word matches the vertex of each instance of a block it is in that comes from
+    an earlier transcription.  When more than one vertex with the same word has the
+    same rank the last one found is used, as `collatex` does.
+
+    Parameters
+    ----------
+    instances : list
+        The (position, start, end, length) tuples of the blocks in the transcription
+        from :meth:`_block_instances`
+    suffix_array : np.array
+        The suffix array of all the words
+    start : int
+        The position of the first word of the transcription in the array of all the words
+    position_vertex : np.array
+        The vertex of each word already in the graph
+    rank : np.array
+        The rank of each vertex
+
+    Returns
+    -------
+    match_vertex : dict
+        The vertex with the same word at each (word index, rank - 1) pair
+    '''
+    if len(instances) == 0:
+        return {}
+    positions, block_starts, block_ends, lengths = np.array(instances).T
+    # every instance of each block in the suffix array, in order
+    counts = block_ends - block_starts + 1
+    graph_positions = suffix_array[np.repeat(block_starts, counts) + _offsets(counts)]
+    positions = np.repeat(positions, counts)
+    lengths = np.repeat(lengths, counts)
+    earlier = graph_positions < start
+    # every word of each of those instances, in order
+    lengths = lengths[earlier]
+    offsets = _offsets(lengths)
+    indices = np.repeat(positions[earlier] - start, lengths) + offsets
+    vertices = position_vertex[np.repeat(graph_positions[earlier], lengths) + offsets]
+    if len(indices) == 0:
+        return {}
+    ranks = rank[vertices] - 1
+    # keep the last vertex written to each (index, rank) pair
+    keys = indices * (rank.max() + 1) + ranks
+    _, last = np.unique(keys[::-1], return_index=True)
+    last = len(keys) - 1 - last
+    return dict(zip(zip(indices[last].tolist(), ranks[last].tolist()), vertices[last].tolist()))
+
+
+def _align_texts_numpy(texts):
+    if len(texts) == 0:
+        return []
+    witnesses = [tokenize(None, text) for text in texts]
+    if sum(len(words) for words in witnesses) == 0:
+        return []
+    witness_start, suffix_array, instances = _block_instances(witnesses)
+    graph = _VariantGraph()
+    # the vertex of each word in the array of all the words
+    position_vertex = np.full(witness_start[-1] + len(witnesses[-1]), -1)
+    for witness, words in enumerate(witnesses):
+        aligned = {}
+        if witness > 0:
+            rank, by_rank = graph.ranking()
+            # the end vertex is not aligned to
+            number_of_ranks = rank[1] - 1
+            match_vertex = _match_cube(
+                instances[witness],
+                suffix_array,
+                witness_start[witness],
+                position_vertex,
+                np.array(rank)
+            )
+            if len(match_vertex) > 0:
+                aligned = _align_to_graph(words, match_vertex, number_of_ranks)
+        vertices = graph.merge(witness, words, aligned)
+        position_vertex[witness_start[witness]:witness_start[witness] + len(words)] = vertices
+    rank, by_rank = graph.near_match()
+    columns = []
+    for vertices in by_rank.values():
+        vertices = [vertex for vertex in vertices if vertex > 1]
+        if len(vertices) == 0:
+            continue
+        column = {}
+        for vertex in vertices:
+            column.update(graph.tokens[vertex])
+        columns.append(column)
+    return columns
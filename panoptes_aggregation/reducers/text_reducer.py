@@ -4,20 +4,14 @@ Text Tool Reducer
 This module provides functions to reducer the panoptes text tool into an
 alignment table.
 '''
-from .text_utils import consensus_score, tokenize
+from .text_utils import consensus_score, align_texts
 from .reducer_wrapper import reducer_wrapper
-import warnings
 
 import pandas as pd
 
-with warnings.catch_warnings():
-    # collatex is a bit old, we can safely ignore this message as the display
-    # functions are optional and never used in this code
-    warnings.filterwarnings('ignore', category=DeprecationWarning, message='Importing display')
-    import collatex as col
-
-# override the built-in tokenize
-col.core_classes.WordPunctuationTokenizer.tokenize = tokenize
+DEFAULTS = {
+    'alignment': {'default': 'collatex', 'type': str}
+}
 
 
 def process_data(data_list):
@@ -30,13 +24,16 @@ def process_data(data_list):
     ]
 
 
-@reducer_wrapper(process_data=process_data, user_id=True)
+@reducer_wrapper(process_data=process_data, defaults_data=DEFAULTS, user_id=True)
 def text_reducer(data_in, **kwargs):
     '''Reduce a list of text into an alignment table
     Parameters
     ----------
     data : list
         A list of strings to be aligned
+    kwargs :
+        * `alignment` : The backend used to align the words, either `collatex` (default)
+          or `numpy`.  See :mod:`panoptes_aggregation.reducers.text_alignment`.
 
     Returns
     -------
@@ -56,20 +53,9 @@ def text_reducer(data_in, **kwargs):
         user_ids_input = kwargs.pop('user_id')
         idx, data, gold_standard = zip(*data_in)
         user_ids = [int(user_ids_input[i]) if user_ids_input[i] is not None and not pd.isna(user_ids_input[i]) else user_ids_input[i] for i in idx]
-        witness_keys = []
         aligned_text = []
-        collation = col.Collation()
-        for index, text in enumerate(data):
-            key = str(index)
-            witness_keys.append(key)
-            collation.add_plain_witness(key, text)
-        alignment_table = col.collate(collation, near_match=True, segmentation=False)
-        for cols in alignment_table.columns:
-            word_dict = cols.tokens_per_witness
-            word_list = []
-            for key in witness_keys:
-                word_list.append(str(word_dict.get(key, [''])[0]))
-            aligned_text.append(word_list)
+        for column in align_texts(data, kwargs.get('alignment', 'collatex')):
+            aligned_text.append([column.get(index, '') for index in range(len(data))])
         consensus_score_value, consensus_text = consensus_score(aligned_text)
         reduction = {
             'aligned_text': aligned_text,
@@ -6,25 +6,12 @@ This module provides utility functions used in the polyton-as-line-text-reducer
 '''
 from collections import OrderedDict, Counter
 import copy
+import functools
+import multiprocessing
 import numpy as np
 from sklearn.cluster import DBSCAN
-import re
-import warnings
-
-with warnings.catch_warnings():
-    # collatex is a bit old, we can safely ignore this message as the display
-    # functions are optional and never used in this code
-    warnings.filterwarnings('ignore', category=DeprecationWarning, message='Importing display')
-    import collatex as col
-
-
-def tokenize(self, contents):
-    '''Tokenize only on space so angle bracket tags are not split'''
-    return re.findall(r'[^\s$]+|[$]', contents)
-
-
-# override the built-in tokenize
-col.core_classes.WordPunctuationTokenizer.tokenize = tokenize
+from .text_alignment import align_texts, tokenize  # noqa: F401
+from ..cpu_count import available_cpu_count
 
 
 def extractor_index(x):
@@ -65,6 +52,30 @@ def overlap(x, y, tol=0):
     return (x[1] - tol) >= (y[0] + tol) and (y[1] - tol) >= (x[0] + tol)
 
 
+def _gutter_in_order(lines, tol=0):
+    '''Internal function to merge the line extents one at a time in the order given.
+    Only used by :meth:`gutter` when a line is shorter than `2 * tol`, as the order the
+    lines are merged in can change the gutters found for these lines.'''
+    overlap_lines = []
+    for ldx, l in enumerate(lines):
+        if ldx == 0:
+            overlap_lines = np.array([l])
+        else:
+            o_lines = np.array([overlap(o, l, tol=tol) for o in overlap_lines])
+            if o_lines.any():
+                comp = np.vstack([overlap_lines[o_lines], l])
+                overlap_lines[o_lines] = [comp.min(), comp.max()]
+                overlap_lines = np.vstack(list({tuple(row) for row in overlap_lines}))
+            else:
+                overlap_lines = np.vstack([overlap_lines, l])
+    overlap_lines.sort(axis=0)
+    gutter_label = -np.ones(len(lines), dtype=int)
+    for odx, o in enumerate(overlap_lines):
+        gdx = np.array([overlap(o, l, tol=tol) for l in lines])
+        gutter_label[gdx] = odx
+    return gutter_label
+
+
 def gutter(lines_in, tol=0):
     '''Cluster list of input line segments by what side of
     the page gutter they are on.
@@ -74,6 +85,9 @@ def gutter(lines_in, tol=0):
     lines_in : list
         A list-of-lists containing one line segment per item. Each line
         segment should contain only the x-coordinate of each point on the line.
+    tol : float
+        The tolerance passed to :meth:`overlap` when deciding if two line segments
+        are in the same gutter.
 
     Returns
     -------
@@ -83,24 +97,18 @@ def gutter(lines_in, tol=0):
     '''
     if len(lines_in) > 0:
         lines = np.array([[min(l), max(l)] for l in lines_in])
-        overlap_lines = []
-        for ldx, l in enumerate(lines):
-            if ldx == 0:
-                overlap_lines = np.array([l])
-            else:
-                o_lines = np.array([overlap(o, l, tol=tol) for o in overlap_lines])
-                if o_lines.any():
-                    comp = np.vstack([overlap_lines[o_lines], l])
-                    overlap_lines[o_lines] = [comp.min(), comp.max()]
-                    overlap_lines = np.vstack(list({tuple(row) for row in overlap_lines}))
-                else:
-                    overlap_lines = np.vstack([overlap_lines, l])
-        overlap_lines.sort(axis=0)
-        gutter_label = -np.ones(len(lines), dtype=int)
-        for odx, o in enumerate(overlap_lines):
-            gdx = np.array([overlap(o, l, tol=tol) for l in lines])
-            gutter_label[gdx] = odx
-        # gutter_label[mask_out] = -1
+        # two segments overlap if they still overlap after `tol` is cut from both ends
+        starts = lines[:, 0] + tol
+        ends = lines[:, 1] - tol
+        if (starts > ends).any():
+            return _gutter_in_order(lines, tol=tol)
+        # sweep the segments from left to right, a new gutter starts when a
+        # segment starts after every segment before it has ended
+        order = np.argsort(starts, kind='stable')
+        reach = np.maximum.accumulate(ends[order])
+        new_gutter = np.concatenate([[True], starts[order][1:] > reach[:-1]])
+        gutter_label = np.empty(len(lines), dtype=int)
+        gutter_label[order] = np.cumsum(new_gutter) - 1
         return gutter_label
     else:
         return np.array([])
@@ -281,7 +289,7 @@ def align_words(
     gs_line : np.array
         An array of bools indicating if the annotation was made in gold standard mode
     kwargs_cluster : dict
-        A dictionary containing the `eps_*` and `dot_freq` keywords
+        A dictionary containing the `eps_*`, `dot_freq`, `min_word_count`, and `alignment` keywords
     kwargs_dbscan : dict
         A dictionary containing all the other DBSCAN keywords
 
@@ -312,26 +320,15 @@ def align_words(
             word_x, word_y = xy_line[wdx].mean(axis=0)
             clusters_x.append(float(word_x))
             clusters_y.append(float(word_y))
-        collation = col.Collation()
-        witness_key = []
-        for tdx, t in enumerate(text_line):
-            if t.strip() != '':
-                key = str(tdx)
-                collation.add_plain_witness(key, t)
-                witness_key.append(key)
-        if len(collation.witnesses) > 0:
-            alignment_table = col.collate(collation, near_match=True, segmentation=False)
-            for cols in alignment_table.columns:
-                word_dict = cols.tokens_per_witness
-                word_list = []
-                for key in witness_key:
-                    if len(word_dict) >= kwargs_cluster['min_word_count']:
-                        word_list.append(str(word_dict.get(key, [''])[0]))
-                    else:
-                        word_list.append('')
-                clusters_text.append(word_list)
-            # fix memory leak by deleting this
-            del alignment_table
+        texts = [t for t in text_line if t.strip() != '']
+        for column in align_texts(texts, kwargs_cluster.get('alignment', 'collatex')):
+            word_list = []
+            for tdx in range(len(texts)):
+                if len(column) >= kwargs_cluster['min_word_count']:
+                    word_list.append(column.get(tdx, ''))
+                else:
+                    word_list.append('')
+            clusters_text.append(word_list)
     return clusters_x, clusters_y, clusters_text
 
 
@@ -570,40 +567,90 @@ def cluster_by_slope(
     return frame_slope
 
 
+def map_frames(function, values, frame_workers=1, **kwargs):
+    '''Call `function(value, **kwargs)` for the data on each frame of a subject.
+
+    The frames of a subject are reduced independently, so when `frame_workers` is
+    more than one they are shared out over a pool of that many processes (no more
+    than one process per frame, and no more than
+    :meth:`panoptes_aggregation.cpu_count.available_cpu_count`).  Threads are not used as the clustering and
+    alignment of a frame hold the GIL for most of their run time.  The results are
+    returned in the same order as `values`, so the reduction does not depend on
+    the number of workers.  If this is called from inside a worker process (e.g. in
+    :meth:`panoptes_aggregation.scripts.batch_utils.batch_reduce`) that is not
+    allowed to start processes of its own, the frames are reduced one at a time.
+
+    Parameters
+    ----------
+    function : function
+        A module level function that reduces the data for one frame
+    values : iterable
+        The data for each frame
+    frame_workers : int
+        The number of processes to use
+    kwargs :
+        The keywords passed to `function`
+
+    Returns
+    -------
+    results : list
+        The output of `function` for each frame
+    '''
+    values = list(values)
+    frame_function = functools.partial(function, **kwargs)
+    workers = min(frame_workers, len(values), available_cpu_count())
+    if (workers > 1) and (not multiprocessing.current_process().daemon):
+        with multiprocessing.Pool(workers) as pool:
+            return pool.map(frame_function, values, chunksize=1)
+    return [frame_function(value) for value in values]
+
+
+def _reduce_frame(value, kwargs_cluster, kwargs_dbscan):
+    '''Internal function to find the lines of text on one frame of a subject'''
+    gs_frame = np.array(copy.deepcopy(value['gold_standard']))
+    data_index_frame = np.array(copy.deepcopy(value['data_index']))
+    slope_frame = np.array(copy.deepcopy(value['slope'])).reshape(-1, 1)
+    x_frame = np.array(copy.deepcopy(value['x']), dtype=object)
+    y_frame = np.array(copy.deepcopy(value['y']), dtype=object)
+    text_frame = copy.deepcopy(value['text'])
+    ext_index_frame = np.array(extractor_index(value['data_index']))
+    # pad with empty strings to keep array sizes the same
+    for t in text_frame:
+        t.append('')
+    text_frame = np.array(text_frame, dtype=object)
+    return cluster_by_slope(
+        x_frame,
+        y_frame,
+        text_frame,
+        slope_frame,
+        gs_frame,
+        data_index_frame,
+        ext_index_frame,
+        kwargs_cluster,
+        kwargs_dbscan
+    )
+
+
 def cluster_by_frame(
     data_by_frame,
     kwargs_cluster,
     kwargs_dbscan,
     user_ids_input,
-    low_consensus_threshold
+    low_consensus_threshold,
+    frame_workers=1
 ):
     reduced_data = OrderedDict()
     low_consensus_lines = 0
     number_of_lines = 0
-    for frame, value in data_by_frame.items():
+    frame_reductions = map_frames(
+        _reduce_frame,
+        data_by_frame.values(),
+        frame_workers=frame_workers,
+        kwargs_cluster=kwargs_cluster,
+        kwargs_dbscan=kwargs_dbscan
+    )
+    for frame, frame_slope in zip(data_by_frame.keys(), frame_reductions):
         reduced_data[frame] = []
-        gs_frame = np.array(copy.deepcopy(value['gold_standard']))
-        data_index_frame = np.array(copy.deepcopy(value['data_index']))
-        slope_frame = np.array(copy.deepcopy(value['slope'])).reshape(-1, 1)
-        x_frame = np.array(copy.deepcopy(value['x']), dtype=object)
-        y_frame = np.array(copy.deepcopy(value['y']), dtype=object)
-        text_frame = copy.deepcopy(value['text'])
-        ext_index_frame = np.array(extractor_index(value['data_index']))
-        # pad with empty strings to keep array sizes the same
-        for t in text_frame:
-            t.append('')
-        text_frame = np.array(text_frame, dtype=object)
-        frame_slope = cluster_by_slope(
-            x_frame,
-            y_frame,
-            text_frame,
-            slope_frame,
-            gs_frame,
-            data_index_frame,
-            ext_index_frame,
-            kwargs_cluster,
-            kwargs_dbscan
-        )
         number_of_lines += len(frame_slope)
         for line in frame_slope:
             data_index = line.pop('data_index')
@@ -0,0 +1,209 @@
+'''
+Reduction Cache
+---------------
+Caesar sends the full list of extracts for a subject each time a new
+classification comes in, and retries or duplicate webhooks can send the
+same payload more than once.  The caches in this module store the JSON
+reduction for a payload so a repeat request is answered without running
+the reducer again.
+
+The cache key is a hash of the reducer name, the url keywords, and the
+extracts (see `reduction_key`).  The values are JSON strings so any
+backend can store them.
+'''
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import threading
+import time
+from .version import __version__
+
+logger = logging.getLogger(__name__)
+
+
+def reduction_key(reducer_name, kwargs, extracts):
+    '''Make the cache key for a reducer request
+
+    Parameters
+    ----------
+    reducer_name : str
+        The name of the reducer
+    kwargs : dict
+        The url keywords of the request.  Each value can be a single string
+        or a list of strings (e.g. from `request.args.to_dict(flat=False)`).
+    extracts : list
+        The JSON body of the request
+
+    Returns
+    -------
+    key : str
+        A sha256 hex digest that is the same for any request with the same
+        reducer, keywords (in any order), extracts, and package version
+    '''
+    normalized_kwargs = {
+        key: value if isinstance(value, list) else [value]
+        for key, value in kwargs.items()
+    }
+    payload = json.dumps(
+        [__version__, reducer_name, normalized_kwargs, extracts],
+        sort_keys=True,
+        separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReductionCache(ABC):
+    '''Base class for the reduction caches.  A backend defines `_get` and
+    `_set`, this class counts the hits and misses.
+    '''
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+
+    def get(self, key):
+        '''Look up `key`, returning the stored JSON string or `None`'''
+        value = self._get(key)
+        with self._counter_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        '''Store the JSON string `value` under `key`'''
+        self._set(key, value)
+
+    def stats(self):
+        '''The number of cache hits and misses'''
+        return {'hits': self.hits, 'misses': self.misses}
+
+    @abstractmethod
+    def _get(self, key):
+        '''Return the value stored under `key`, or `None` if there is no value'''
+
+    @abstractmethod
+    def _set(self, key, value):
+        '''Store `value` under `key`'''
+
+
+class MemoryCache(ReductionCache):
+    '''An in-process least recently used cache
+
+    Parameters
+    ----------
+    max_size : int
+        The largest number of reductions stored, once full the least
+        recently used reduction is removed
+    ttl : float
+        The number of seconds a reduction is kept for, `None` keeps them until
+        they are removed for space
+    '''
+    def __init__(self, max_size=1024, ttl=None):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            if key not in self._store:
+                return None
+            value, expires = self._store[key]
+            if (expires is not None) and (time.monotonic() > expires):
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._store[key] = (value, expires)
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_size:
+                self._store.popitem(last=False)
+
+    def __len__(self):
+        return len(self._store)
+
+    def stats(self):
+        return {**super().stats(), 'size': len(self), 'max_size': self.max_size}
+
+
+class RedisCache(ReductionCache):
+    '''A cache shared between processes (and machines) using a Redis server.
+    If the server can't be reached (or returns an error) the error is logged
+    and the request is treated as a cache miss, so the reducer is still run.
+
+    Parameters
+    ----------
+    client : redis.Redis
+        The client for the server, any object with the `get` and `set(..., px=...)`
+        methods of `redis.Redis` can be used
+    ttl : float
+        The number of seconds a reduction is kept for (stored to the nearest
+        millisecond), `None` keeps them until the server removes them.  The
+        size of the cache is set on the server (e.g. with `maxmemory` and the
+        `allkeys-lru` policy).
+    prefix : str
+        Added to the start of every key
+    '''
+    def __init__(self, client, ttl=None, prefix='panoptes_aggregation:reduction:'):
+        import redis
+        super().__init__()
+        if (ttl is not None) and (ttl <= 0):
+            raise ValueError('The reduction cache ttl must be positive, not {0}'.format(ttl))
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self._redis_error = redis.RedisError
+
+    def _get(self, key):
+        try:
+            value = self.client.get(self.prefix + key)
+        except self._redis_error as error:
+            logger.warning('Reduction cache get failed: %s', error)
+            return None
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value
+
+    def _set(self, key, value):
+        px = None if self.ttl is None else max(int(self.ttl * 1000), 1)
+        try:
+            self.client.set(self.prefix + key, value, px=px)
+        except self._redis_error as error:
+            logger.warning('Reduction cache set failed: %s', error)
+
+
+def make_reduction_cache(url=None, max_size=1024, ttl=None):
+    '''Make the reduction cache described by `url`
+
+    Parameters
+    ----------
+    url : str
+        `None` or an empty string for no cache, `memory` for a `MemoryCache`,
+        or a `redis://` url for a `RedisCache`
+    max_size : int
+        The size of a `MemoryCache`
+    ttl : float
+        The number of seconds a reduction is kept for
+
+    Returns
+    -------
+    cache : ReductionCache or None
+        The cache, or `None` if caching is off
+    '''
+    if not url:
+        return None
+    if url == 'memory':
+        return MemoryCache(max_size=max_size, ttl=ttl)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        import redis
+        return RedisCache(redis.Redis.from_url(url), ttl=ttl)
+    raise ValueError('The reduction cache must be "memory" or a redis url, not {0}'.format(url))
@@ -1,5 +1,5 @@
 try:
-    from flask import jsonify, request, Flask
+    from flask import jsonify, request, Flask, Response
     from flask.json.provider import JSONProvider
     from flask_cors import CORS
     from json import JSONEncoder
@@ -10,12 +10,15 @@ try:
 except ImportError:  # pragma: no cover
     print('You must install `flask` to use panoptes_aggregation.routes')  # pragma: no cover
     raise  # pragma: no cover
-from functools import wraps
+from functools import partial, wraps
+from multiprocessing import Pool
 from os import getenv
 from panoptes_aggregation import reducers
 from panoptes_aggregation import extractors
+from panoptes_aggregation.extractors.extractor_wrapper import request_kwargs
 from panoptes_aggregation import running_reducers
 from panoptes_aggregation import batch_aggregation
+from panoptes_aggregation.reduction_cache import make_reduction_cache, reduction_key
 from panoptes_aggregation import __version__
 import numpy as np
 from celery.result import AsyncResult
@@ -69,7 +72,142 @@ def request_wrapper(name):
     return decorator
 
 
-def make_application():
+def registered_function(registry, name):
+    '''
+    Make a function that looks up `name` in `registry` each time it is called,
+    so the module it is defined in is only imported when its route is first used.
+    '''
+    def func(*args, **kwargs):
+        return registry[name](*args, **kwargs)
+    func.__name__ = name
+    return func
+
+
+def cached_reducer(reducer_name, reducer, cache):
+    '''
+    Make a function that looks up the reduction of a request in `cache` before
+    running `reducer`.  The reduction is stored as JSON, so a cached reduction
+    is the same as the response to the first request.
+    '''
+    def func(request):
+        key = reduction_key(reducer_name, request.args.to_dict(flat=False), request.get_json())
+        cached = cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+        reduction = json.dumps(reducer(request), cls=MyEncoder)
+        cache.set(key, reduction)
+        return json.loads(reduction)
+    func.__name__ = reducer_name
+    return func
+
+
+def batch_extractor(extractor_name, extractor):
+    '''
+    Make a view that runs `extractor` over a list of classifications
+    posted in one request.  The query string keywords are shared by every
+    classification.  The results are returned in the same order as the
+    classifications, each is either `{'extraction': ...}` or `{'error': ...}`
+    if that classification could not be extracted.  A 400 error is returned
+    if the body is not a JSON list.
+    '''
+    def func():
+        if request.method == 'GET':
+            return jsonify('{0}/batch'.format(extractor_name))
+        classifications = request.get_json(silent=True)
+        if not isinstance(classifications, list):
+            return jsonify({"error": "The request body must be a JSON list of classifications"}), 400
+        kwargs = request_kwargs(request)
+        results = []
+        for classification in classifications:
+            try:
+                results.append({'extraction': extractor(classification, **kwargs)})
+            except Exception as error:
+                sentry_sdk.capture_exception(error)
+                results.append({'error': '{0}: {1}'.format(type(error).__name__, error)})
+        return jsonify(results)
+    return func
+
+
+class SubjectRequest:
+    '''
+    Hold the query string and extracts for one subject of a batch reducer
+    request.  This has the same `args` and `get_json` interface as a flask
+    request, so `reducer_wrapper` reads the keywords and extracts the same
+    way as it does for a single subject.
+    '''
+    def __init__(self, args, extracts):
+        self.args = args
+        self.extracts = extracts
+
+    def get_json(self):
+        return self.extracts
+
+
+def reduce_batch_subject(reducer_name, args, subject):
+    '''
+    Reduce one subject of a batch reducer request and return it as a line of NDJSON
+    '''
+    subject_id, extracts = subject
+    try:
+        reduction = reducers.reducers[reducer_name](SubjectRequest(args, extracts))
+        line = {'subject_id': subject_id, 'reduction': reduction}
+    except Exception as error:
+        sentry_sdk.capture_exception(error)
+        line = {'subject_id': subject_id, 'error': '{0}: {1}'.format(type(error).__name__, error)}
+    return json.dumps(line, cls=MyEncoder) + '\n'
+
+
+def batch_reducer(reducer_name):
+    '''
+    Make a view that reduces many subjects in one request.  The JSON body maps
+    each subject id to the list of extracts that would be posted to the single
+    subject route (with any `user_id`, `created_at`, or `relevant_reduction`
+    values), and the query string keywords are used for every subject.  The
+    `processes` keyword sets how many worker processes the subjects are
+    spread over (1 by default, and no more than the available CPUs).  A 400
+    error is returned if `processes` is not a positive integer or the body is
+    not a JSON object.  The reductions are streamed back as NDJSON,
+    one line per subject in the order of the request, each being either
+    `{"subject_id": ..., "reduction": ...}` or `{"subject_id": ..., "error": ...}`.
+    '''
+    def func():
+        if request.method == 'GET':
+            return jsonify('{0}/batch'.format(reducer_name))
+        args = request.args.copy()
+        try:
+            processes = int(args.pop('processes', 1))
+        except ValueError:
+            return jsonify({"error": "processes must be an integer"}), 400
+        if processes < 1:
+            return jsonify({"error": "processes must be at least 1"}), 400
+        processes = min(processes, batch_aggregation.available_cpu_count())
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return jsonify({"error": "The request body must be a JSON object mapping each subject id to its extracts"}), 400
+        subjects = list(body.items())
+        reduce_subject = partial(reduce_batch_subject, reducer_name, args)
+
+        def generate():
+            if processes > 1:
+                with Pool(processes) as pool:
+                    chunksize = max(len(subjects) // (4 * processes), 1)
+                    yield from pool.imap(reduce_subject, subjects, chunksize=chunksize)
+            else:
+                for subject in subjects:
+                    yield reduce_subject(subject)
+        return Response(generate(), mimetype='application/x-ndjson')
+    return func
+
+
+def make_application(reduction_cache=None):
+    '''
+    Make the flask app.  The reducer routes use `reduction_cache` (a
+    `panoptes_aggregation.reduction_cache.ReductionCache`) if it is given,
+    otherwise one is made from the `REDUCTION_CACHE` environment variable
+    (`memory` or a redis url) with the size and time to live (in seconds) set
+    by `REDUCTION_CACHE_SIZE` and `REDUCTION_CACHE_TTL`.  No cache is used
+    if neither is set.
+    '''
     # setup sentry error reporting with flask integration
     # and the DSN being set via the SENTRY_DSN env var
     # https://docs.sentry.io/error-reporting/configuration/?platform=python#dsn
@@ -95,6 +233,14 @@ def make_application():
         ]
     )
 
+    if reduction_cache is None:
+        ttl = getenv('REDUCTION_CACHE_TTL')
+        reduction_cache = make_reduction_cache(
+            getenv('REDUCTION_CACHE'),
+            max_size=int(getenv('REDUCTION_CACHE_SIZE', 1024)),
+            ttl=None if ttl is None else float(ttl)
+        )
+
     home_screen_message = {
         'status': 'ok',
         'version': __version__,
@@ -105,18 +251,42 @@ def make_application():
     def index():
         return jsonify(home_screen_message)
 
-    for route, route_function in reducers.reducers.items():
+    for route in reducers.reducers:
+        route_function = registered_function(reducers.reducers, route)
+        if reduction_cache is not None:
+            route_function = cached_reducer(route, route_function, reduction_cache)
         application.route('/reducers/{0}'.format(route), methods=['POST', 'GET'])(request_wrapper(route)(route_function))
+        application.route(
+            '/reducers/{0}/batch'.format(route),
+            methods=['POST', 'GET'],
+            endpoint='{0}_batch'.format(route)
+        )(batch_reducer(route))
 
-    for route, route_function in extractors.extractors.items():
+    for route in extractors.extractors:
+        route_function = registered_function(extractors.extractors, route)
         application.route('/extractors/{0}'.format(route), methods=['POST', 'GET'])(request_wrapper(route)(route_function))
+        application.route(
+            '/extractors/{0}/batch'.format(route),
+            methods=['POST', 'GET'],
+            endpoint='{0}_batch'.format(route)
+        )(batch_extractor(route, route_function))
 
-    for route, route_function in running_reducers.running_reducers.items():
-        application.route('/running_reducers/{0}'.format(route), methods=['POST', 'GET'])(request_wrapper(route)(route_function))
+    for route in running_reducers.running_reducers:
+        route_function = registered_function(running_reducers.running_reducers, route)
+        application.route(
+            '/running_reducers/{0}'.format(route),
+            methods=['POST', 'GET'],
+            endpoint='running_{0}'.format(route)
+        )(request_wrapper(route)(route_function))
 
     for route, route_function in panoptes.panoptes.items():
         application.route('/panoptes/{0}'.format(route), methods=['POST', 'PUT'])(lambda: route_function(request.args.to_dict(), request.get_json()))
 
+    if reduction_cache is not None:
+        @application.route('/reduction_cache')
+        def reduction_cache_stats():
+            return jsonify(reduction_cache.stats())
+
     @application.route('/run_aggregation', methods=['POST'])
     def run_aggregation():
         content = request.json
@@ -1,10 +1,16 @@
-from .tess_user_reducer import tess_user_reducer
-from .tess_reducer_column import tess_reducer_column_rr
-from .tess_gold_standard_reducer import tess_gold_standard_reducer_rr
+from ..lazy_registry import LazyRegistry, lazy_package
 
+running_reducers = LazyRegistry(
+    __name__,
+    {
+        'tess_user_reducer': 'tess_user_reducer',
+        'tess_reducer_column': 'tess_reducer_column:tess_reducer_column_rr',
+        'tess_gold_standard_reducer': 'tess_gold_standard_reducer:tess_gold_standard_reducer_rr',
+        'question_reducer': 'question_reducer:question_reducer_rr',
+        'survey_reducer': 'survey_reducer:survey_reducer_rr',
+        'dropdown_reducer': 'dropdown_reducer:dropdown_reducer_rr',
+        'point_reducer_dbscan': 'point_reducer_dbscan:point_reducer_dbscan_rr'
+    }
+)
 
-running_reducers = {
-    'tess_user_reducer': tess_user_reducer,
-    'tess_reducer_column': tess_reducer_column_rr,
-    'tess_gold_standard_reducer': tess_gold_standard_reducer_rr
-}
+lazy_package(__name__, running_reducers)
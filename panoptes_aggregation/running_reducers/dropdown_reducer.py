@@ -0,0 +1,50 @@
+'''
+Dropdown Running Reducer
+------------------------
+This module provides functions to reduce the dropdown task extracts from
+:mod:`panoptes_aggregation.extractors.dropdown_extractor` in running mode.
+Only the new extracts are counted, the votes from all previous extracts are
+kept in the store.
+'''
+import copy
+from .running_reducer_wrapper import running_reducer_wrapper
+from .utilities import add_counts
+from ..reducers.dropdown_reducer import process_data
+
+
+@running_reducer_wrapper(process_data=process_data)
+def dropdown_reducer_rr(votes_list, **kwargs):
+    '''
+    See :meth:`panoptes_aggregation.reducers.dropdown_reducer.dropdown_reducer`
+
+    Parameters
+    ----------
+    votes_list : list
+        A list-of-lists of `Counter` objects from
+        :meth:`panoptes_aggregation.reducers.dropdown_reducer.process_data`
+    store : keyword, dict
+        A dictionary with the key `value` holding the vote counts for each
+        dropdown from all previous extracts
+
+    Returns
+    -------
+    reduction : dict
+        The same reduction as `dropdown_reducer` run on all the extracts, with
+        the updated store in the `_store` key
+    '''
+    store = kwargs.pop('store')
+    value = copy.deepcopy(store.get('value', []))
+    for votes in votes_list:
+        for idx, counts in enumerate(votes):
+            if idx == len(value):
+                value.append({})
+            add_counts(value[idx], counts)
+    output = {}
+    if len(value) > 0:
+        output = {
+            'value': copy.deepcopy(value)
+        }
+    output['_store'] = {
+        'value': value
+    }
+    return output
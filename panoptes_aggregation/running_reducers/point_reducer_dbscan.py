@@ -0,0 +1,162 @@
+'''
+Point Running Reducer DBSCAN
+----------------------------
+This module provides functions to cluster points extracted with
+:mod:`panoptes_aggregation.extractors.point_extractor` in running mode.
+The points and the `eps` neighbourhood of each point are kept in the store,
+so only the distances to the new points are calculated on each call.
+'''
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial.distance import cdist
+from .running_reducer_wrapper import running_reducer_wrapper
+from ..reducers.point_process_data import process_data_by_frame
+from ..reducers.point_reducer_dbscan import DEFAULTS, summarize_clusters
+
+
+def neighbor_parameters(eps=5.0, metric='euclidean', p=None, **kwargs):
+    '''The keywords that change the neighbourhood of a point'''
+    return {'eps': eps, 'metric': metric, 'p': p}
+
+
+def add_points(state, new_points, eps=5.0, metric='euclidean', p=None):
+    '''Add points to the stored state of one tool and update the neighbourhoods.
+    The lists in `state` are replaced rather than changed, so a `state` copied
+    from the store with `dict(state)` does not change the store.
+
+    Parameters
+    ----------
+    state : dict
+        A dictionary with the keys `points` (a list of (`x`, `y`) lists) and
+        `neighbors` (a list with the index of every point within `eps` of each point)
+    new_points : list
+        A list of (`x`, `y`) tuples to add
+    eps : float
+        The radius of a point's neighbourhood
+    metric : str
+        The distance metric (see `scipy.spatial.distance.cdist`)
+    p : float
+        The power of the `minkowski` metric (2 if `None`)
+    '''
+    number_old = len(state['points'])
+    state['points'] = state['points'] + [list(xy) for xy in new_points]
+    if len(new_points) == 0:
+        return state
+    loc = np.array(state['points'], dtype=float)
+    metric_kwargs = {}
+    if metric == 'minkowski':
+        metric_kwargs['p'] = 2 if p is None else p
+    # each new point's neighbourhood includes itself (as it does in DBSCAN)
+    close = cdist(loc[number_old:], loc, metric=metric, **metric_kwargs) <= eps
+    neighbors = state['neighbors'] + [np.flatnonzero(row).tolist() for row in close]
+    new_index, old_index = np.nonzero(close[:, :number_old])
+    for i, j in zip(new_index, old_index):
+        neighbors[j] = neighbors[j] + [int(number_old + i)]
+    state['neighbors'] = neighbors
+    return state
+
+
+def dbscan_labels(neighbors, min_samples):
+    '''Find the DBSCAN cluster labels from the neighbourhood of each point
+
+    The clusters are numbered in the order of their first core point, and a
+    border point is put in the first cluster it borders, so the labels are
+    the same as `sklearn.cluster.DBSCAN` finds.
+
+    Parameters
+    ----------
+    neighbors : list
+        A list with the index of every point within `eps` of each point
+    min_samples : int
+        The number of points in the neighbourhood of a core point (including itself)
+
+    Returns
+    -------
+    labels : numpy.ndarray
+        The cluster label of each point (-1 for points in no cluster)
+    '''
+    number_of_points = len(neighbors)
+    labels = np.full(number_of_points, -1)
+    counts = np.array([len(neighbor) for neighbor in neighbors], dtype=int)
+    is_core = counts >= min_samples
+    if not is_core.any():
+        return labels
+    rows = np.repeat(np.arange(number_of_points), counts)
+    columns = np.concatenate(neighbors).astype(int)
+    # clusters are the connected groups of core points
+    core_edge = is_core[rows] & is_core[columns]
+    graph = csr_matrix(
+        (np.ones(core_edge.sum()), (rows[core_edge], columns[core_edge])),
+        shape=(number_of_points, number_of_points)
+    )
+    _, component = connected_components(graph, directed=False)
+    core_index = np.flatnonzero(is_core)
+    core_component = component[core_index]
+    unique_component, first_core = np.unique(core_component, return_index=True)
+    cluster_label = np.empty(component.max() + 1, dtype=int)
+    cluster_label[unique_component[np.argsort(first_core)]] = np.arange(len(unique_component))
+    labels[core_index] = cluster_label[core_component]
+    # border points go to the lowest numbered cluster they border
+    border_edge = ~is_core[rows] & is_core[columns]
+    border_label = np.full(number_of_points, number_of_points)
+    np.minimum.at(border_label, rows[border_edge], labels[columns[border_edge]])
+    is_border = border_label < number_of_points
+    labels[is_border] = border_label[is_border]
+    return labels
+
+
+@running_reducer_wrapper(process_data=process_data_by_frame, defaults_data=DEFAULTS)
+def point_reducer_dbscan_rr(data_by_tool, **kwargs):
+    '''Cluster the points by tool with DBSCAN, adding only the new points to the stored neighbourhoods
+
+    Parameters
+    ----------
+    data_by_tool : dict
+        A dictionary returned by :meth:`panoptes_aggregation.reducers.point_process_data.process_data_by_frame`
+        for the new extracts
+    store : keyword, dict
+        A dictionary with two keys:
+
+        * `parameters`: The `eps`, `metric`, and `p` used for the stored neighbourhoods
+        * `frames`: A dictionary with the `points` and `neighbors` of each tool for each frame
+    kwargs :
+        `See DBSCAN <http://scikit-learn.org/stable/modules/generated/sklearn.cluster.DBSCAN.html>`_
+        (`algorithm` and `leaf_size` are not used)
+
+    Returns
+    -------
+    reduction : dict
+        The same reduction as :meth:`panoptes_aggregation.reducers.point_reducer_dbscan.point_reducer_dbscan`
+        for all the extracts, with the updated store in the `_store` key
+    '''
+    store = kwargs.pop('store')
+    parameters = neighbor_parameters(**kwargs)
+    # only the lists that change are copied (see `add_points`)
+    frames = {
+        frame: {tool: dict(state) for tool, state in frame_store.items()}
+        for frame, frame_store in store.get('frames', {}).items()
+    }
+    if store.get('parameters', parameters) != parameters:
+        # the neighbourhoods changed so find them again for all the points
+        for frame_store in frames.values():
+            for tool, state in frame_store.items():
+                frame_store[tool] = add_points({'points': [], 'neighbors': []}, state['points'], **parameters)
+    for frame, frame_data in data_by_tool.items():
+        frame_store = frames.setdefault(frame, {})
+        for tool, loc_list in frame_data.items():
+            state = frame_store.setdefault(tool, {'points': [], 'neighbors': []})
+            # clean `None` values for the list
+            add_points(state, [xy for xy in loc_list if None not in xy], **parameters)
+    clusters = {}
+    for frame, frame_store in frames.items():
+        clusters[frame] = {}
+        for tool, state in frame_store.items():
+            loc = np.array(state['points'], dtype=float).reshape(-1, 2)
+            labels = dbscan_labels(state['neighbors'], kwargs['min_samples'])
+            clusters[frame].update(summarize_clusters(tool, loc, labels))
+    clusters['_store'] = {
+        'parameters': parameters,
+        'frames': frames
+    }
+    return clusters
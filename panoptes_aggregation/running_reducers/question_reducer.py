@@ -0,0 +1,49 @@
+'''
+Question Running Reducer
+------------------------
+This module provides functions to reduce the question task extracts from
+:mod:`panoptes_aggregation.extractors.question_extractor` in running mode.
+Only the new extracts are counted, the votes from all previous extracts are
+kept in the store.
+'''
+import copy
+from .running_reducer_wrapper import running_reducer_wrapper
+from .utilities import add_counts
+from ..reducers.question_reducer import DEFAULTS, question_reducer
+
+
+@running_reducer_wrapper(defaults_data=DEFAULTS, user_id=True)
+def question_reducer_rr(data_list, pairs=False, track_user_ids=False, **kwargs):
+    '''
+    See :meth:`panoptes_aggregation.reducers.question_reducer.question_reducer`
+
+    Parameters
+    ----------
+    store : keyword, dict
+        A dictionary with the key `reduction` holding the reduction of all previous extracts
+
+    Returns
+    -------
+    reduction : dict
+        The same reduction as `question_reducer` run on all the extracts, with
+        the updated store in the `_store` key
+    '''
+    store = kwargs.pop('store')
+    reduction = copy.deepcopy(store.get('reduction', {}))
+    current = question_reducer._original(
+        data_list,
+        pairs=pairs,
+        track_user_ids=track_user_ids,
+        user_id=kwargs.pop('user_id')
+    )
+    for key, value in current.items():
+        if isinstance(value, list):
+            reduction.setdefault(key, []).extend(value)
+        else:
+            add_counts(reduction, {key: value})
+    return {
+        **reduction,
+        '_store': {
+            'reduction': reduction
+        }
+    }
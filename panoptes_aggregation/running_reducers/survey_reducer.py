@@ -0,0 +1,63 @@
+'''
+Survey Running Reducer
+----------------------
+This module provides functions to reduce survey task extracts from
+:mod:`panoptes_aggregation.extractors.survey_extractor` in running mode.
+Only the new extracts are counted, the votes from all previous extracts are
+kept in the store.
+'''
+from collections import OrderedDict
+import copy
+from .running_reducer_wrapper import running_reducer_wrapper
+from .utilities import add_counts
+from ..reducers.survey_reducer import process_data
+
+
+@running_reducer_wrapper(process_data=process_data)
+def survey_reducer_rr(data_in, **kwargs):
+    '''
+    See :meth:`panoptes_aggregation.reducers.survey_reducer.survey_reducer`
+
+    Parameters
+    ----------
+    data_in : dict
+        A dictionary created by :meth:`panoptes_aggregation.reducers.survey_reducer.process_data`
+    store : keyword, dict
+        A dictionary with two keys:
+
+        * `vote_count`: The number of previous extracts
+        * `choices`: A dictionary with the `choice_count` and `answers_*` counts for each `choice`
+
+    Returns
+    -------
+    reduction : dict
+        A dictionary with two keys:
+
+        * `choices`: The same list as `survey_reducer` run on all the extracts
+        * `_store`: The updated store
+    '''
+    store = kwargs.pop('store')
+    data = data_in
+    vote_count = store.get('vote_count', 0) + data.pop('vote_count')
+    choices = copy.deepcopy(store.get('choices', {}))
+    for choice, answers in data.items():
+        totals = choices.setdefault(choice, {'choice_count': 0})
+        totals['choice_count'] += len(answers)
+        for answer in answers:
+            for key, value in answer.items():
+                add_counts(totals.setdefault(key, {}), value)
+    reduction_list = []
+    for choice, totals in choices.items():
+        reduction = OrderedDict([
+            ('choice', choice),
+            ('total_vote_count', vote_count)
+        ])
+        reduction.update(copy.deepcopy(totals))
+        reduction_list.append(reduction)
+    return {
+        'choices': reduction_list,
+        '_store': {
+            'vote_count': vote_count,
+            'choices': choices
+        }
+    }
@@ -13,3 +13,10 @@ def extract_in_data(extracted_data, store={}, **kwargs_extra_data):
             output_extract[key] = kwargs_extra_data[key][ddx]
         extracted_request_data['extracts'].append(output_extract)
     return extracted_request_data
+
+
+def add_counts(total, counts):
+    '''Add the vote `counts` into the `total` dictionary (in place)'''
+    for key, count in counts.items():
+        total[key] = total.get(key, 0) + count
+    return total
@@ -187,6 +187,20 @@ def main(args=None):
         type=int,
         default=1
     )
+    extract_save_files.add_argument(
+        "-f",
+        "--format",
+        help="The file format for the extractions (parquet files are compressed and much faster to load)",
+        type=str,
+        choices=['csv', 'parquet'],
+        default='csv'
+    )
+    extract_save_files.add_argument(
+        "-s",
+        "--stream",
+        help="Write the extractions in chunks with a checkpoint after each one (a stopped run will resume from the last checkpoint)",
+        action="store_true"
+    )
     extract_options.add_argument(
         "-vv",
         "--verbose",
@@ -228,7 +242,7 @@ def main(args=None):
     )
     reduce_load_files.add_argument(
         "extracted_csv",
-        help="The extracted csv file",
+        help="The extracted csv (or parquet) file",
         type=argparse.FileType('r', encoding='utf-8'),
         widget='FileChooser'
     )
@@ -281,10 +295,18 @@ def main(args=None):
         type=str,
         default="reductions",
     )
+    reduce_save_files.add_argument(
+        "-f",
+        "--format",
+        help="The file format for the reductions (parquet files are compressed and much faster to load)",
+        type=str,
+        choices=['csv', 'parquet'],
+        default='csv'
+    )
     reduce_save_files.add_argument(
         "-s",
         "--stream",
-        help="Stream output to csv after each reduction (this is slower but is resumable)",
+        help="Stream output to csv in batches as the reductions are made (a stopped run will resume where it left off)",
         action="store_true"
     )
 
@@ -309,7 +331,9 @@ def main(args=None):
             order=args.order,
             verbose=args.verbose,
             cpu_count=args.cpu_count,
-            hide_progressbar=args.hide_bar
+            hide_progressbar=args.hide_bar,
+            output_format=args.format,
+            stream=args.stream
         )
     elif args.subparser == 'reduce':
         panoptes_aggregation.scripts.reduce_csv(
@@ -321,7 +345,8 @@ def main(args=None):
             order=args.order,
             stream=args.stream,
             cpu_count=args.cpu_count,
-            hide_progressbar=args.hide_bar
+            hide_progressbar=args.hide_bar,
+            output_format=args.format
         )
     return 0
 
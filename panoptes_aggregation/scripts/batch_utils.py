@@ -1,16 +1,61 @@
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
 from multiprocessing import Pool
 import copy
-import numpy as np
 import os
 import json
 import progressbar
+import time
 import pandas
 from panoptes_aggregation import extractors
 from panoptes_aggregation import reducers
-from panoptes_aggregation.csv_utils import flatten_data, unflatten_data
+from panoptes_aggregation.csv_utils import flatten_data, unflatten_dataframe
 from panoptes_aggregation.extractors.utilities import annotation_by_task
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+CLASSIFICATION_INFO_COLUMNS = [
+    'classification_id',
+    'user_name',
+    'user_id',
+    'workflow_id',
+    'created_at',
+    'subject_ids'
+]
+
+
+def parse_json_column(column):
+    '''
+        Decode a column of JSON strings in one pass.  `orjson` is used
+        when it is installed, falling back to the standard library for any
+        values it rejects (e.g. `NaN`).
+
+        Inputs
+        ------
+        column: pandas.Series
+            The JSON formatted strings to decode
+
+        Returns
+        -------
+        parsed: list
+            The decoded value for each row
+    '''
+    if orjson is None:
+        return [json.loads(value) for value in column]
+    parsed = []
+    for value in column:
+        try:
+            parsed.append(orjson.loads(value))
+        except orjson.JSONDecodeError:
+            parsed.append(json.loads(value))
+    return parsed
+
 
 def first_filter(data):
     first_time = data.created_at.min()
@@ -35,7 +80,11 @@ def batch_extract(
     extractor_config,
     cpu_count=1,
     verbose=False,
-    hide_progressbar=False
+    hide_progressbar=False,
+    chunk_size=500,
+    max_in_flight=None,
+    pool=None,
+    flatten=True
 ):
     '''
         Extracts the values given a list of classifications and a corresponding
@@ -69,6 +118,18 @@ def batch_extract(
             If True, increase output verbosity.
         hide_progressbar: bool:
             If True, the progress bar is hidden.
+        chunk_size: int
+            The number of extracts sent to a worker process in one task (only used if cpu_count > 1)
+        max_in_flight: int
+            The maximum number of chunks queued on the worker pool at any one time,
+            defaults to 2 * cpu_count (only used if cpu_count > 1)
+        pool: multiprocessing.Pool
+            An existing worker pool to use rather than starting a new one, it is left
+            open so it can be reused (`cpu_count` should be set to the size of the pool)
+        flatten: bool
+            If True a flattened pandas.DataFrame is returned for each extractor (the same as
+            the extraction csv files), otherwise the list of extract rows is returned with
+            each extract as a dictionary in the `data` key (see `batch_reduce_extracts`)
     '''
     extracts_data = defaultdict(list)
     if hide_progressbar:
@@ -101,67 +162,161 @@ def batch_extract(
 
         pbar.start()
 
-    if cpu_count > 1:
-        pool = Pool(cpu_count)
-    for _, classification in classifications.iterrows():
-        classification_by_task = annotation_by_task({
-            'annotations': json.loads(classification.annotations),
-            'metadata': json.loads(classification.metadata)
-        })
-        classification_info = {
-            'classification_id': classification.classification_id,
-            'user_name': classification.user_name,
-            'user_id': classification.user_id,
-            'workflow_id': classification.workflow_id,
-            'created_at': classification.created_at,
-            'subject_ids': classification.subject_ids
-        }
-        for extractor_name, keywords in extractor_config.items():
-            extractor_key = extractor_name
-            if 'shape_extractor' in extractor_name:
-                extractor_key = 'shape_extractor'
-            for keyword in keywords:
-                if extractor_key in extractors.extractors:
-                    if cpu_count > 1:
-                        pool.apply_async(
-                            extract_classification,
-                            args=(
-                                copy.deepcopy(classification_by_task),
-                                classification_info,
-                                extractor_key,
-                                extractor_name,
-                                keyword,
-                                verbose
-                            ),
-                            callback=callback
-                        )
-                    else:
-                        name_with_row = extract_classification(
-                            copy.deepcopy(classification_by_task),
+    annotations = parse_json_column(classifications.annotations)
+    metadata = parse_json_column(classifications.metadata)
+    info_columns = [
+        classifications[column].tolist()
+        for column in CLASSIFICATION_INFO_COLUMNS
+    ]
+    copy_functions = {}
+    for extractor_name in extractor_config.keys():
+        extractor_key = extractor_name
+        if 'shape_extractor' in extractor_name:
+            extractor_key = 'shape_extractor'
+        if extractor_key in extractors.extractors:
+            if getattr(extractors.extractors[extractor_key], '_mutates_input', True):
+                copy_functions[extractor_name] = copy.deepcopy
+            else:
+                # the extractor_wrapper replaces the top level `annotations` key
+                copy_functions[extractor_name] = copy.copy
+
+    def extract_tasks():
+        for classification_annotations, classification_metadata, *info in zip(annotations, metadata, *info_columns):
+            classification_by_task = annotation_by_task({
+                'annotations': classification_annotations,
+                'metadata': classification_metadata
+            })
+            classification_info = dict(zip(CLASSIFICATION_INFO_COLUMNS, info))
+            for extractor_name, keywords in extractor_config.items():
+                extractor_key = extractor_name
+                if 'shape_extractor' in extractor_name:
+                    extractor_key = 'shape_extractor'
+                for keyword in keywords:
+                    if extractor_key in extractors.extractors:
+                        yield (
+                            copy_functions[extractor_name](classification_by_task),
                             classification_info,
                             extractor_key,
                             extractor_name,
                             keyword,
                             verbose
                         )
-                        callback(name_with_row)
-                else:
-                    callback((None, None))
-    if cpu_count > 1:
-        pool.close()
-        pool.join()
+                    else:
+                        yield None
+
+    if (cpu_count > 1) or (pool is not None):
+        with worker_pool(cpu_count, pool=pool) as active_pool:
+            submit_chunked(
+                active_pool,
+                extract_classification_chunk,
+                extract_tasks(),
+                callback,
+                chunk_size=chunk_size,
+                max_in_flight=max_in_flight or 2 * cpu_count
+            )
+    else:
+        for task_args in extract_tasks():
+            if task_args is None:
+                callback((None, None))
+            else:
+                callback(extract_classification(*task_args))
 
     if hide_progressbar is False:
         pbar.finish()
 
+    if not flatten:
+        return dict(extracts_data)
     flat_extracts = defaultdict(list)
     for extractor_name, data in extracts_data.items():
-        non_flat_extract = pandas.DataFrame(data)
-        flat_extract = flatten_data(non_flat_extract)
-        flat_extracts[extractor_name] = flat_extract
+        flat_extracts[extractor_name] = flatten_extracts(data)
     return flat_extracts
 
 
+def flatten_extracts(extract_rows):
+    '''
+        Make the flattened DataFrame saved in an extraction csv file from a list
+        of extract rows (see `batch_extract`)
+    '''
+    return flatten_data(pandas.DataFrame(extract_rows))
+
+
+@contextmanager
+def worker_pool(cpu_count, pool=None):
+    '''
+        Use `pool` if one is given, otherwise start a new pool with `cpu_count`
+        processes that is closed once the work is done
+    '''
+    if pool is not None:
+        yield pool
+        return
+    with Pool(cpu_count) as new_pool:
+        yield new_pool
+        new_pool.close()
+        new_pool.join()
+
+
+def chunks(iterable, chunk_size):
+    '''Lazily split an iterable into lists of at most `chunk_size` items'''
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def submit_chunked(
+    pool,
+    func,
+    tasks,
+    callback,
+    chunk_size=500,
+    max_in_flight=4
+):
+    '''
+        Submit work to a multiprocessing Pool in chunks with a bounded number of chunks
+        queued at once, so the memory used by pending tasks does not grow with the size
+        of the input
+
+        Inputs
+        ------
+        pool: multiprocessing.Pool
+            The pool to submit the work to
+        func: function
+            A function that takes a list of tasks and returns a list of results
+        tasks: iterable
+            The tasks to process, this is consumed lazily
+        callback: function
+            Called once for each result, in the order of the tasks in each chunk
+        chunk_size: int
+            The number of tasks sent to a worker in one call to `func`
+        max_in_flight: int
+            The maximum number of chunks queued on the pool at any one time
+
+        If `func` raises an error for any chunk it is raised again here, so a failed
+        chunk is never silently left out of the results
+    '''
+    def chunk_callback(results):
+        for result in results:
+            callback(result)
+
+    in_flight = deque()
+    for chunk in chunks(tasks, chunk_size):
+        while len(in_flight) >= max_in_flight:
+            # `get` re-raises any error from the worker
+            in_flight.popleft().get()
+        in_flight.append(pool.apply_async(func, args=(chunk,), callback=chunk_callback))
+    for async_result in in_flight:
+        async_result.get()
+
+
+def extract_classification_chunk(chunk):
+    return [
+        (None, None) if task_args is None else extract_classification(*task_args)
+        for task_args in chunk
+    ]
+
+
 def extract_classification(
     classification_by_task,
     classification_info,
@@ -222,13 +377,171 @@ def parse_reducer_config(config):
     return reducer_name, keywords
 
 
+def partition_extracts(extracts, subjects, tasks, completed=()):
+    '''
+        Split the extracts into one slice per (subject, task) pair using a single
+        group-by pass rather than building a boolean mask for every pair
+
+        Inputs
+        ------
+        extracts: pandas.DataFrame
+            The extracts to partition (sorted in the order the slices should keep)
+        subjects: iterable
+            The subject IDs to yield slices for (in order)
+        tasks: iterable
+            The task keys to yield slices for (in order)
+        completed: set
+            (subject, task) pairs to skip (e.g. pairs already reduced by a stopped run)
+
+        Yields
+        ------
+        (subject, task, classifications): tuple
+            The subject ID, task key, and the matching rows of `extracts`.  Pairs with no
+            matching rows yield an empty DataFrame.
+    '''
+    groups = extracts.groupby(['subject_id', 'task'], sort=False).indices
+    empty = extracts.iloc[[]]
+    for subject in subjects:
+        for task in tasks:
+            if (subject, task) in completed:
+                continue
+            rows = groups.get((subject, task))
+            if rows is None:
+                yield subject, task, empty
+            else:
+                yield subject, task, extracts.iloc[rows]
+
+
+def stream_index_path(output_path):
+    '''The path to the index file kept next to a streamed reduction csv'''
+    return '{0}.index'.format(output_path)
+
+
+def _json_subject(subject):
+    # numpy integers from pandas are not JSON serializable
+    return subject.item() if hasattr(subject, 'item') else subject
+
+
+class StreamWriter(object):
+    '''
+        Append streamed reductions to a csv file in batches.  The rows are held in
+        memory and written once `flush_size` (subject, task) pairs are done or
+        `flush_interval` seconds have passed since the last write.
+
+        After each write a line is added to an index file (see `stream_index_path`)
+        with the (subject, task) pairs written and the size of the csv file.  When a
+        stopped reduction is started again the finished pairs are read from the index
+        and any rows written after the last index line are cut from the csv, so the
+        csv is never parsed.  A csv streamed without an index is read once to find
+        the finished pairs, and an index without a csv is removed.
+
+        Inputs
+        ------
+        output_path: str
+            Path to the output csv
+        flush_size: int
+            The number of (subject, task) pairs held before they are written
+        flush_interval: float
+            The number of seconds after which any held rows are written
+    '''
+    def __init__(self, output_path, flush_size=100, flush_interval=30.0):
+        self.output_path = output_path
+        self.index_path = stream_index_path(output_path)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.completed = set()
+        self.resume = False
+        self._rows = []
+        self._subjects = []
+        self._tasks = []
+        self._header = True
+        self._last_flush = time.monotonic()
+        if os.path.isfile(output_path):
+            print('resuming from last run')
+            self.resume = True
+            self._read_index()
+        elif os.path.isfile(self.index_path):
+            # left from a run whose csv was removed, none of its pairs are in the new csv
+            os.remove(self.index_path)
+
+    def _read_index(self):
+        if not os.path.isfile(self.index_path):
+            # streamed before the index was kept, find the pairs from the csv once
+            if os.path.getsize(self.output_path) > 0:
+                reduced_csv = pandas.read_csv(self.output_path, usecols=['subject_id', 'task'], encoding='utf-8')
+                self.completed = set(zip(reduced_csv.subject_id, reduced_csv.task))
+                self._header = False
+            self._write_index(
+                [_json_subject(subject) for subject, _ in self.completed],
+                [task for _, task in self.completed]
+            )
+            return
+        offset = 0
+        index_size = 0
+        with open(self.index_path, 'rb') as index_file:
+            for line in index_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # the last line was not finished
+                    break
+                index_size += len(line)
+                offset = entry['offset']
+                self.completed.update(zip(entry['subject_id'], entry['task']))
+        # remove any unfinished index line and any rows written after the last index line
+        if os.path.getsize(self.index_path) > index_size:
+            with open(self.index_path, 'r+b') as index_file:
+                index_file.truncate(index_size)
+        if os.path.getsize(self.output_path) > offset:
+            with open(self.output_path, 'r+b') as output_file:
+                output_file.truncate(offset)
+        self._header = offset == 0
+
+    def _write_index(self, subjects, tasks):
+        offset = os.path.getsize(self.output_path) if os.path.isfile(self.output_path) else 0
+        with open(self.index_path, 'a', encoding='utf-8') as index_file:
+            index_file.write(json.dumps({'offset': offset, 'subject_id': subjects, 'task': tasks}) + '\n')
+
+    def add(self, subject, task, reduced_data_list):
+        '''Hold the rows reduced for one (subject, task) pair, writing them if it is time'''
+        self._rows += reduced_data_list
+        self._subjects.append(_json_subject(subject))
+        self._tasks.append(task)
+        self.completed.add((subject, task))
+        if (len(self._tasks) >= self.flush_size) or (time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        '''Write the held rows to the csv and record their pairs in the index'''
+        if len(self._rows) > 0:
+            pandas.DataFrame(self._rows).to_csv(
+                self.output_path,
+                mode='a',
+                header=self._header,
+                index=False,
+                encoding='utf-8'
+            )
+            self._header = False
+        if len(self._tasks) > 0:
+            self._write_index(self._subjects, self._tasks)
+        self._rows = []
+        self._subjects = []
+        self._tasks = []
+        self._last_flush = time.monotonic()
+
+
 def batch_reduce(
     extracts,
     config,
     cpu_count=1,
     stream=False,
     output_path=None,
-    hide_progressbar=False
+    hide_progressbar=False,
+    chunk_size=500,
+    max_in_flight=None,
+    pool=None,
+    flush_size=100,
+    flush_interval=30.0
 ):
     '''
         Reduces a list of extracts on a per-subject basis and returns an aggregated
@@ -255,11 +568,26 @@ def batch_reduce(
         cpu_count: int
             Number of CPUs to use (1 disables multithreading)
         stream: boolean
-            Whether to stream to an output CSV (and resume from the CSV in case of a stopped reduction)
+            Whether to stream to an output CSV (and resume from the CSV in case of a stopped reduction),
+            see `StreamWriter`
         output_path: str
             Path to output CSV (used only if stream=True)
         hide_progressbar: bool:
             If True, the progress bar is hidden.
+        chunk_size: int
+            The number of (subject, task) pairs sent to a worker process in one task
+            (only used if cpu_count > 1)
+        max_in_flight: int
+            The maximum number of chunks queued on the worker pool at any one time,
+            defaults to 2 * cpu_count (only used if cpu_count > 1)
+        pool: multiprocessing.Pool
+            An existing worker pool to use rather than starting a new one, it is left
+            open so it can be reused (`cpu_count` should be set to the size of the pool)
+        flush_size: int
+            The number of (subject, task) pairs reduced between writes to the output CSV
+            (only used if stream=True)
+        flush_interval: float
+            The most seconds between writes to the output CSV (only used if stream=True)
     '''
     extracts.sort_values(['subject_id', 'created_at'], inplace=True)
     subjects = extracts.subject_id.unique()
@@ -274,31 +602,10 @@ def batch_reduce(
         'filter': filter,
         'keywords': keywords
     }
-    if hide_progressbar:
-        def callback(reduced_data_list):
-            nonlocal reduced_data  # noqa: F824
-            nonlocal sdx  # noqa: F824
-            nonlocal stream  # noqa: F824
-            reduced_data += reduced_data_list
-            if (stream) and (output_path is not None):
-                if (sdx == 0) and (not resume):
-                    pandas.DataFrame(reduced_data).to_csv(
-                        output_path,
-                        mode='w',
-                        index=False,
-                        encoding='utf-8'
-                    )
-                else:
-                    pandas.DataFrame(reduced_data).to_csv(
-                        output_path,
-                        mode='a',
-                        index=False,
-                        header=False,
-                        encoding='utf-8'
-                    )
-                reduced_data.clear()
-            sdx += 1
-    else:
+    writer = None
+    if (stream) and (output_path is not None):
+        writer = StreamWriter(output_path, flush_size=flush_size, flush_interval=flush_interval)
+    if hide_progressbar is False:
         widgets = [
             'Reducing: ',
             progressbar.Percentage(),
@@ -307,80 +614,82 @@ def batch_reduce(
         ]
         number_of_rows = len(subjects) * len(tasks)
         pbar = progressbar.ProgressBar(widgets=widgets, max_value=number_of_rows)
-
-        def callback(reduced_data_list):
-            nonlocal reduced_data  # noqa: F824
-            nonlocal sdx  # noqa: F824
-            nonlocal pbar  # noqa: F824
-            nonlocal stream  # noqa: F824
-            reduced_data += reduced_data_list
-            if (stream) and (output_path is not None):
-                if (sdx == 0) and (not resume):
-                    pandas.DataFrame(reduced_data).to_csv(
-                        output_path,
-                        mode='w',
-                        index=False,
-                        encoding='utf-8'
-                    )
-                else:
-                    pandas.DataFrame(reduced_data).to_csv(
-                        output_path,
-                        mode='a',
-                        index=False,
-                        header=False,
-                        encoding='utf-8'
-                    )
-                reduced_data.clear()
-            sdx += 1
-            pbar.update(sdx)
         pbar.start()
 
     sdx = 0
-    resume = False
-    if stream:
-        if os.path.isfile(output_path):
-            print('resuming from last run')
-            resume = True
-            with open(output_path, 'r', encoding='utf-8') as reduced_file:
-                reduced_csv = pandas.read_csv(reduced_file, encoding='utf-8')
-                subjects = np.setdiff1d(subjects, reduced_csv.subject_id)
-
     reduced_data = []
 
-    if cpu_count > 1:
-        pool = Pool(cpu_count)
-    for subject in subjects:
-        idx = extracts.subject_id == subject
-        for task in tasks:
-            jdx = extracts.task == task
-            classifications = extracts[idx & jdx]
-            if cpu_count > 1:
-                pool.apply_async(
-                    reduce_subject,
-                    args=(
-                        subject,
-                        classifications,
-                        task
-                    ),
-                    kwds=apply_keywords,
-                    callback=callback
-                )
-            else:
-                reduced_data_list = reduce_subject(
-                    subject,
-                    classifications,
-                    task,
-                    **apply_keywords
-                )
-                callback(reduced_data_list)
-    if cpu_count > 1:
-        pool.close()
-        pool.join()
+    def callback(subject_task_reduction):
+        nonlocal sdx
+        subject, task, reduced_data_list = subject_task_reduction
+        if writer is None:
+            reduced_data.extend(reduced_data_list)
+        else:
+            writer.add(subject, task, reduced_data_list)
+        sdx += 1
+        if hide_progressbar is False:
+            pbar.update(sdx)
+
+    completed = set() if writer is None else writer.completed.copy()
+    partitions = partition_extracts(extracts, subjects, tasks, completed=completed)
+    if (cpu_count > 1) or (pool is not None):
+        with worker_pool(cpu_count, pool=pool) as active_pool:
+            submit_chunked(
+                active_pool,
+                partial(reduce_subject_chunk, **apply_keywords),
+                partitions,
+                callback,
+                chunk_size=chunk_size,
+                max_in_flight=max_in_flight or 2 * cpu_count
+            )
+    else:
+        for subject, task, classifications in partitions:
+            reduced_data_list = reduce_subject(
+                subject,
+                classifications,
+                task,
+                **apply_keywords
+            )
+            callback((subject, task, reduced_data_list))
+    if writer is not None:
+        writer.flush()
     if hide_progressbar is False:
         pbar.finish()
     return pandas.DataFrame(reduced_data)
 
 
+def drop_duplicate_rows(data):
+    '''
+        Drop repeated rows from a DataFrame that can have lists in its cells
+        (e.g. extracts read from a parquet file)
+
+        Inputs
+        ------
+        data: pandas.DataFrame
+            The rows to check
+
+        Returns
+        -------
+        data: pandas.DataFrame
+            The rows that are not a repeat of an earlier row
+    '''
+    try:
+        return data.drop_duplicates()
+    except TypeError:
+        # lists and dicts can not be hashed, compare them as JSON instead
+        hashable = data.apply(lambda column: column.map(
+            lambda value: json.dumps(value, sort_keys=True) if isinstance(value, (list, dict)) else value
+        ))
+        return data[~hashable.duplicated()]
+
+
+def reduce_subject_chunk(chunk, **kwargs):
+    return [
+        (subject, task, reduce_subject(subject, classifications, task, **kwargs))
+        for subject, task, classifications in chunk
+    ]
+
+
 def reduce_subject(
     subject,
     classifications,
@@ -390,15 +699,20 @@ def reduce_subject(
     filter=None,
     keywords={}
 ):
-    reduced_data_list = []
-    classifications = classifications.drop_duplicates()
+    classifications = drop_duplicate_rows(classifications)
     unique_users = classifications['user_name'].unique().shape[0]
     if (filter in FILTER_TYPES) and (unique_users < classifications.shape[0]):
         classifications = classifications.groupby(['user_name'], group_keys=False).apply(FILTER_TYPES[filter])
-    data = [unflatten_data(c) for cdx, c in classifications.iterrows()]
-    user_ids = [c.user_id for cdx, c in classifications.iterrows()]
-    created_at = [c.created_at for cdx, c in classifications.iterrows()]
+    data = unflatten_dataframe(classifications)
+    user_ids = classifications.user_id.tolist()
+    created_at = classifications.created_at.tolist()
     reduction = reducers.reducers[reducer_name](data, user_id=user_ids, created_at=created_at, **keywords)
+    return reduction_rows(subject, task, reducer_name, workflow_id, reduction)
+
+
+def reduction_rows(subject, task, reducer_name, workflow_id, reduction):
+    '''Make the reduction csv rows for the reduction of one (subject, task) pair'''
+    reduced_data_list = []
     if isinstance(reduction, list):
         for r in reduction:
             reduced_data_list.append(OrderedDict([
@@ -417,3 +731,188 @@ def reduce_subject(
             ('data', reduction)
         ]))
     return reduced_data_list
+
+
+def partition_extract_rows(extract_rows):
+    '''
+        Group a list of extract rows (see `batch_extract`) by (subject, task) pair in
+        the same order `batch_reduce` uses, with the rows of each pair sorted by
+        `created_at`
+
+        Inputs
+        ------
+        extract_rows: list
+            The extract rows to partition
+
+        Yields
+        ------
+        (subject, task, rows): tuple
+            The subject ID, task key, and the matching rows.  Pairs with no matching
+            rows yield an empty list.
+    '''
+    extract_rows = sorted(extract_rows, key=lambda row: (row['subject_id'], row['created_at']))
+    groups = defaultdict(list)
+    tasks = {}
+    for row in extract_rows:
+        groups[(row['subject_id'], row['task'])].append(row)
+        tasks.setdefault(row['task'], None)
+    subjects = dict.fromkeys(row['subject_id'] for row in extract_rows)
+    for subject in subjects:
+        for task in tasks:
+            yield subject, task, groups.get((subject, task), [])
+
+
+def drop_duplicate_extracts(extract_rows):
+    '''
+        Drop repeated extract rows (e.g. from a classification that is in an export
+        twice), the same as `drop_duplicate_rows` does for flattened extracts
+    '''
+    unique_rows = []
+    seen = defaultdict(list)
+    for row in extract_rows:
+        # only rows from the same classification can be repeats
+        same_classification = seen[row['classification_id']]
+        if len(same_classification) > 0:
+            # compared as JSON so missing values (e.g. the `user_id` of a user
+            # that is not logged in) match
+            row_json = _json_row(row)
+            if any(row_json == _json_row(other) for other in same_classification):
+                continue
+        same_classification.append(row)
+        unique_rows.append(row)
+    return unique_rows
+
+
+def _json_row(row):
+    return json.dumps(row, sort_keys=True, default=str)
+
+
+def reduce_extracts_chunk(chunk, **kwargs):
+    return [
+        (subject, task, reduce_subject_extracts(subject, extract_rows, task, **kwargs))
+        for subject, task, extract_rows in chunk
+    ]
+
+
+def reduce_subject_extracts(
+    subject,
+    extract_rows,
+    task,
+    reducer_name=None,
+    workflow_id=None,
+    filter=None,
+    keywords={}
+):
+    '''
+        Reduce the extract rows (see `batch_extract`) of one (subject, task) pair,
+        giving the same rows as `reduce_subject` does for the flattened extracts
+    '''
+    extract_rows = drop_duplicate_extracts(extract_rows)
+    unique_users = len(set(row['user_name'] for row in extract_rows))
+    if (filter in FILTER_TYPES) and (unique_users < len(extract_rows)):
+        classifications = pandas.DataFrame(extract_rows)
+        classifications = classifications.groupby(['user_name'], group_keys=False).apply(FILTER_TYPES[filter])
+        extract_rows = classifications.to_dict('records')
+    data = [row['data'] for row in extract_rows]
+    user_ids = [row['user_id'] for row in extract_rows]
+    created_at = [row['created_at'] for row in extract_rows]
+    reduction = reducers.reducers[reducer_name](data, user_id=user_ids, created_at=created_at, **keywords)
+    return reduction_rows(subject, task, reducer_name, workflow_id, reduction)
+
+
+def batch_reduce_extracts(
+    extract_rows,
+    config,
+    cpu_count=1,
+    hide_progressbar=False,
+    chunk_size=500,
+    max_in_flight=None,
+    pool=None
+):
+    '''
+        Reduce the extract rows made by `batch_extract` with `flatten=False` on a
+        per-subject basis.  The extracts are given to the reducer as they are, so
+        they are not flattened into a DataFrame and unflattened again for each
+        subject.  The reductions are the same as `batch_reduce` makes from the
+        flattened extracts.
+
+        Inputs
+        ------
+        extract_rows: list
+            The extract rows, each a dictionary with the keys `classification_id`,
+            `user_name`, `user_id`, `workflow_id`, `task`, `created_at`, `subject_id`,
+            `extractor`, and `data` (the extract)
+        config: dict
+            A dictionary defining the configuration for the reducer
+        cpu_count: int
+            Number of CPUs to use (1 disables multithreading)
+        hide_progressbar: bool:
+            If True, the progress bar is hidden.
+        chunk_size: int
+            The number of (subject, task) pairs sent to a worker process in one task
+            (only used if cpu_count > 1)
+        max_in_flight: int
+            The maximum number of chunks queued on the worker pool at any one time,
+            defaults to 2 * cpu_count (only used if cpu_count > 1)
+        pool: multiprocessing.Pool
+            An existing worker pool to use rather than starting a new one, it is left
+            open so it can be reused (`cpu_count` should be set to the size of the pool)
+
+        Returns
+        -------
+        reductions: pandas.DataFrame
+            The reductions with one row for each reduction (the `data` column is not flattened)
+    '''
+    if len(extract_rows) == 0:
+        return pandas.DataFrame()
+    reducer_name, keywords = parse_reducer_config(config)
+    apply_keywords = {
+        'reducer_name': reducer_name,
+        'workflow_id': extract_rows[0]['workflow_id'],
+        'keywords': keywords
+    }
+    partitions = list(partition_extract_rows(extract_rows))
+    if hide_progressbar is False:
+        widgets = [
+            'Reducing: ',
+            progressbar.Percentage(),
+            ' ', progressbar.Bar(),
+            ' ', progressbar.ETA()
+        ]
+        pbar = progressbar.ProgressBar(widgets=widgets, max_value=len(partitions))
+        pbar.start()
+
+    sdx = 0
+    reduced_data = []
+
+    def callback(subject_task_reduction):
+        nonlocal sdx
+        _, _, reduced_data_list = subject_task_reduction
+        reduced_data.extend(reduced_data_list)
+        sdx += 1
+        if hide_progressbar is False:
+            pbar.update(sdx)
+
+    if (cpu_count > 1) or (pool is not None):
+        with worker_pool(cpu_count, pool=pool) as active_pool:
+            submit_chunked(
+                active_pool,
+                partial(reduce_extracts_chunk, **apply_keywords),
+                partitions,
+                callback,
+                chunk_size=chunk_size,
+                max_in_flight=max_in_flight or 2 * cpu_count
+            )
+    else:
+        for subject, task, subject_extract_rows in partitions:
+            # the workers get a copy of the extracts, so the reducers get one here as well
+            reduced_data_list = reduce_subject_extracts(
+                subject,
+                copy.deepcopy(subject_extract_rows),
+                task,
+                **apply_keywords
+            )
+            callback((subject, task, reduced_data_list))
+    if hide_progressbar is False:
+        pbar.finish()
+    return pandas.DataFrame(reduced_data)
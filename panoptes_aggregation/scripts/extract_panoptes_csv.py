@@ -1,8 +1,12 @@
+from contextlib import nullcontext
 import numpy as np
 import packaging.version
 import io
+import json
+import progressbar
 import yaml
 import os
+import shutil
 import warnings
 
 warnings.filterwarnings("ignore", message="numpy.dtype size changed")
@@ -10,8 +14,9 @@ warnings.filterwarnings("ignore", message="numpy.ufunc size changed")
 warnings.filterwarnings("ignore", message="Polyfit may be poorly conditioned")
 
 import pandas
-from .batch_utils import batch_extract
+from .batch_utils import batch_extract, chunks, worker_pool
 from panoptes_aggregation.csv_utils import order_columns
+from panoptes_aggregation.parquet_utils import read_parquet, write_parquet
 
 
 def get_file_instance(file):
@@ -23,6 +28,64 @@ def get_file_instance(file):
 CURRENT_PATH = os.path.abspath('.')
 
 
+def read_classifications(classification_csv_in, workflow_id, version_range, chunk_size=100000):
+    '''
+        Read a classification export in chunks keeping only the rows that match the
+        workflow ID and version range, so memory use scales with the number of matching
+        rows rather than the size of the export
+
+        Inputs
+        ------
+        classification_csv_in: file
+            The open classification export
+        workflow_id: int
+            The workflow ID to keep
+        version_range: dict
+            A dictionary with optional `min` and `max` keys containing `packaging.version.Version`
+            objects giving the (inclusive) range of workflow versions to keep
+        chunk_size: int
+            The number of rows read from the file at once
+
+        Returns
+        -------
+        classifications: pandas.DataFrame
+            The matching classifications
+        counts: dict
+            The number of rows matching the `workflow` ID, the `version` range, and `both`
+    '''
+    counts = {'workflow': 0, 'version': 0, 'both': 0}
+    parsed_versions = {}
+    matching_chunks = []
+    chunks = pandas.read_csv(
+        classification_csv_in,
+        encoding='utf-8',
+        dtype={'workflow_version': str},
+        chunksize=chunk_size
+    )
+    for chunk in chunks:
+        wdx = (chunk.workflow_id == workflow_id).to_numpy()
+        # exports only hold a handful of distinct versions, parse each one once
+        for workflow_version in chunk.workflow_version.unique():
+            if workflow_version not in parsed_versions:
+                parsed_versions[workflow_version] = packaging.version.parse(workflow_version)
+        versions = chunk.workflow_version.map(parsed_versions)
+        vdx = np.ones(len(chunk), dtype=bool)
+        if 'min' in version_range:
+            vdx &= (versions >= version_range['min']).to_numpy()
+        if 'max' in version_range:
+            vdx &= (versions <= version_range['max']).to_numpy()
+        counts['workflow'] += wdx.sum()
+        counts['version'] += vdx.sum()
+        counts['both'] += (wdx & vdx).sum()
+        matching_chunk = chunk[wdx & vdx].copy()
+        matching_chunk.workflow_version = versions[wdx & vdx]
+        matching_chunks.append(matching_chunk)
+    if len(matching_chunks) == 0:
+        return pandas.DataFrame(), counts
+    classifications = pandas.concat(matching_chunks)
+    return classifications, counts
+
+
 def extract_csv(
     classification_csv,
     config,
@@ -31,7 +94,11 @@ def extract_csv(
     order=False,
     verbose=False,
     cpu_count=1,
-    hide_progressbar=False
+    hide_progressbar=False,
+    chunk_size=100000,
+    output_format='csv',
+    stream=False,
+    stream_chunk_size=10000
 ):
     config = get_file_instance(config)
     with config as config_in:
@@ -66,30 +133,215 @@ def extract_csv(
 
     classification_csv = get_file_instance(classification_csv)
     with classification_csv as classification_csv_in:
-        classifications = pandas.read_csv(classification_csv_in, encoding='utf-8', dtype={'workflow_version': str})
+        classifications, counts = read_classifications(
+            classification_csv_in,
+            workflow_id,
+            version_range,
+            chunk_size=chunk_size
+        )
 
-    wdx = classifications.workflow_id == workflow_id
-    assert (wdx.sum() > 0), 'There are no classifications matching the configured workflow ID'
+    assert (counts['workflow'] > 0), 'There are no classifications matching the configured workflow ID'
+    assert (counts['version'] > 0), 'There are no classifications matching the configured version number(s)'
+    assert (counts['both'] > 0), 'There are no classifications matching the combined workflow ID and version number(s)'
 
-    classifications.workflow_version = classifications.workflow_version.apply(packaging.version.parse)
-    vdx = np.ones_like(classifications.workflow_version, dtype=bool)
-    if 'min' in version_range:
-        vdx &= classifications.workflow_version >= version_range['min']
-    if 'max' in version_range:
-        vdx &= classifications.workflow_version <= version_range['max']
-
-    assert (vdx.sum() > 0), 'There are no classifications matching the configured version number(s)'
-    assert ((vdx & wdx).sum() > 0), 'There are no classifications matching the combined workflow ID and version number(s)'
+    output_base_name, _ = os.path.splitext(output_name)
+    if stream:
+        return stream_extract(
+            classifications,
+            extractor_config,
+            output_dir,
+            output_base_name,
+            order=order,
+            verbose=verbose,
+            cpu_count=cpu_count,
+            hide_progressbar=hide_progressbar,
+            output_format=output_format,
+            stream_chunk_size=stream_chunk_size
+        )
 
-    extracted_data = batch_extract(classifications[vdx & wdx], extractor_config, cpu_count, verbose, hide_progressbar=hide_progressbar)
+    extracted_data = batch_extract(classifications, extractor_config, cpu_count, verbose, hide_progressbar=hide_progressbar)
 
-    # create one flat csv file for each extractor used
-    output_base_name, _ = os.path.splitext(output_name)
+    # create one flat csv (or parquet) file for each extractor used
     output_files = []
     for extractor_name, flat_extract in extracted_data.items():
-        output_path = os.path.join(output_dir, '{0}_{1}.csv'.format(extractor_name, output_base_name))
+        output_path = os.path.join(output_dir, '{0}_{1}.{2}'.format(extractor_name, output_base_name, output_format))
         output_files.append(output_path)
         if order:
             flat_extract = order_columns(flat_extract, front=['choice'])
-        flat_extract.to_csv(output_path, index=False, encoding='utf-8')
+        if output_format == 'parquet':
+            write_parquet(flat_extract, output_path)
+        else:
+            flat_extract.to_csv(output_path, index=False, encoding='utf-8')
+    return output_files
+
+
+def write_checkpoint(checkpoint, checkpoint_path):
+    '''Write the checkpoint to a temporary file and move it into place, so a
+    run stopped part way through writing never leaves a broken checkpoint'''
+    temporary_path = '{0}.tmp'.format(checkpoint_path)
+    with open(temporary_path, 'w', encoding='utf-8') as checkpoint_out:
+        json.dump(checkpoint, checkpoint_out)
+    os.replace(temporary_path, checkpoint_path)
+
+
+def combine_parts(part_paths, output_path, order=False, output_format='csv'):
+    '''
+        Join the part files written for one extractor into a single file
+
+        Inputs
+        ------
+        part_paths: list
+            The paths to the part files in the order they were written
+        output_path: str
+            The path to the combined file
+        order: bool
+            If True the data columns are arranged in alphabetical order
+        output_format: str
+            The format of the part files and the combined file (`csv` or `parquet`)
+    '''
+    if output_format == 'parquet':
+        flat_extract = pandas.concat([read_parquet(path) for path in part_paths], ignore_index=True)
+        if order:
+            flat_extract = order_columns(flat_extract, front=['choice'])
+        write_parquet(flat_extract, output_path)
+        return
+    # each part only has the data columns its extracts used, so find all of them
+    # first and copy the parts over one at a time (as text so no values change)
+    columns = []
+    for path in part_paths:
+        for column in pandas.read_csv(path, nrows=0, encoding='utf-8').columns:
+            if column not in columns:
+                columns.append(column)
+    if order:
+        columns = order_columns(pandas.DataFrame(columns=columns), front=['choice']).columns
+    for pdx, path in enumerate(part_paths):
+        part = pandas.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8')
+        part.reindex(columns=columns).to_csv(
+            output_path,
+            mode='w' if pdx == 0 else 'a',
+            header=(pdx == 0),
+            index=False,
+            encoding='utf-8'
+        )
+
+
+def stream_extract(
+    classifications,
+    extractor_config,
+    output_dir,
+    output_base_name,
+    order=False,
+    verbose=False,
+    cpu_count=1,
+    hide_progressbar=False,
+    output_format='csv',
+    stream_chunk_size=10000
+):
+    '''
+        Extract the classifications in chunks, writing the extracts of each chunk
+        to part files as soon as they are made.  A checkpoint file records the
+        last classification ID extracted and the part files written, so a run that
+        is stopped can be started again with the same inputs and only extract the
+        classifications that are left.  Once every chunk is done the part files for
+        each extractor are joined into the output file and the checkpoint is removed.
+
+        Inputs
+        ------
+        classifications: pandas.DataFrame
+            The classifications to extract (see `batch_extract`)
+        extractor_config: dict
+            A dictionary defining the configuration for the extractor
+        output_dir: str
+            The directory the output files, part files, and checkpoint are saved in
+        output_base_name: str
+            The base name of the output files
+        order: bool
+            If True the data columns are arranged in alphabetical order
+        verbose: bool
+            If True, increase output verbosity.
+        cpu_count: int
+            The number of CPU cores to be used.
+        hide_progressbar: bool
+            If True, the progress bar is hidden.
+        output_format: str
+            The format of the output files (`csv` or `parquet`)
+        stream_chunk_size: int
+            The number of classifications extracted between checkpoints
+
+        Returns
+        -------
+        output_files: list
+            The path to the output file of each extractor
+    '''
+    checkpoint_path = os.path.join(output_dir, '{0}_checkpoint.json'.format(output_base_name))
+    parts_dir = os.path.join(output_dir, '{0}_parts'.format(output_base_name))
+    checkpoint = {
+        'last_classification_id': None,
+        'number_of_chunks': 0,
+        'parts': {}
+    }
+    if os.path.isfile(checkpoint_path):
+        print('resuming from last run')
+        with open(checkpoint_path, 'r', encoding='utf-8') as checkpoint_in:
+            checkpoint = json.load(checkpoint_in)
+    os.makedirs(parts_dir, exist_ok=True)
+
+    classifications = classifications.sort_values('classification_id', kind='stable')
+    if checkpoint['last_classification_id'] is not None:
+        classifications = classifications[classifications.classification_id > checkpoint['last_classification_id']]
+
+    if not hide_progressbar:
+        widgets = [
+            'Extracting: ',
+            progressbar.Percentage(),
+            ' ', progressbar.Bar(),
+            ' ', progressbar.ETA()
+        ]
+        pbar = progressbar.ProgressBar(widgets=widgets, max_value=len(classifications))
+        pbar.start()
+    counter = 0
+
+    # one pool is used for every chunk
+    pool_context = worker_pool(cpu_count) if cpu_count > 1 else nullcontext()
+    with pool_context as pool:
+        for index in chunks(range(len(classifications)), stream_chunk_size):
+            chunk = classifications.iloc[index]
+            extracted_data = batch_extract(
+                chunk,
+                extractor_config,
+                cpu_count,
+                verbose,
+                hide_progressbar=True,
+                pool=pool
+            )
+            part_name = '{0:06d}.{1}'.format(checkpoint['number_of_chunks'], output_format)
+            for extractor_name, flat_extract in extracted_data.items():
+                part_path = os.path.join(parts_dir, '{0}_{1}'.format(extractor_name, part_name))
+                if output_format == 'parquet':
+                    write_parquet(flat_extract, part_path)
+                else:
+                    flat_extract.to_csv(part_path, index=False, encoding='utf-8')
+                checkpoint['parts'].setdefault(extractor_name, []).append(os.path.basename(part_path))
+            checkpoint['last_classification_id'] = int(chunk.classification_id.iloc[-1])
+            checkpoint['number_of_chunks'] += 1
+            write_checkpoint(checkpoint, checkpoint_path)
+            counter += len(chunk)
+            if not hide_progressbar:
+                pbar.update(counter)
+
+    if not hide_progressbar:
+        pbar.finish()
+
+    output_files = []
+    for extractor_name, part_names in checkpoint['parts'].items():
+        output_path = os.path.join(output_dir, '{0}_{1}.{2}'.format(extractor_name, output_base_name, output_format))
+        output_files.append(output_path)
+        combine_parts(
+            [os.path.join(parts_dir, part_name) for part_name in part_names],
+            output_path,
+            order=order,
+            output_format=output_format
+        )
+    shutil.rmtree(parts_dir)
+    os.remove(checkpoint_path)
     return output_files
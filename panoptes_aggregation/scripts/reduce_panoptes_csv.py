@@ -1,5 +1,6 @@
-from .batch_utils import batch_reduce, parse_reducer_config
+from .batch_utils import batch_reduce, parse_reducer_config, stream_index_path
 from panoptes_aggregation.csv_utils import flatten_data, order_columns
+from panoptes_aggregation.parquet_utils import is_parquet, read_parquet, write_parquet
 import pandas
 import io
 import os
@@ -28,15 +29,22 @@ def reduce_csv(
     order=False,
     stream=False,
     cpu_count=1,
-    hide_progressbar=False
+    hide_progressbar=False,
+    output_format='csv'
 ):
-    extracted_csv = get_file_instance(extracted_csv)
-    with extracted_csv as extracted_csv_in:
-        extracted = pandas.read_csv(
-            extracted_csv_in,
-            parse_dates=['created_at'],
-            encoding='utf-8'
-        )
+    if is_parquet(extracted_csv):
+        if isinstance(extracted_csv, io.IOBase):
+            extracted_csv.close()
+        extracted = read_parquet(getattr(extracted_csv, 'name', extracted_csv))
+        extracted['created_at'] = pandas.to_datetime(extracted.created_at)
+    else:
+        extracted_csv = get_file_instance(extracted_csv)
+        with extracted_csv as extracted_csv_in:
+            extracted = pandas.read_csv(
+                extracted_csv_in,
+                parse_dates=['created_at'],
+                encoding='utf-8'
+            )
 
     reducer_config = get_file_instance(reducer_config)
     with reducer_config as config:
@@ -51,6 +59,10 @@ def reduce_csv(
                                  stream=stream, output_path=output_path,
                                  hide_progressbar=hide_progressbar)
     if stream:
+        # every subject is reduced so the index used to resume is not needed
+        index_path = stream_index_path(output_path)
+        if os.path.isfile(index_path):
+            os.remove(index_path)
         reduced_csv = pandas.read_csv(output_path, encoding='utf-8')
         if 'data' in reduced_csv:
             def eval_func(a):
@@ -66,5 +78,12 @@ def reduce_csv(
         flat_reduced_data = flatten_data(non_flat_data)
     if order:
         flat_reduced_data = order_columns(flat_reduced_data, front=['choice', 'total_vote_count', 'choice_count'])
-    flat_reduced_data.to_csv(output_path, index=False, encoding='utf-8')
+    if output_format == 'parquet':
+        if stream:
+            # the streamed csv is only needed to resume an unfinished run
+            os.remove(output_path)
+        output_path = '{0}.parquet'.format(os.path.splitext(output_path)[0])
+        write_parquet(flat_reduced_data, output_path)
+    else:
+        flat_reduced_data.to_csv(output_path, index=False, encoding='utf-8')
     return output_path
@@ -21,6 +21,17 @@ cls_export = 'panoptes_aggregation/tests/batch_aggregation/cls_export.csv'
 @unittest.skipIf(OFFLINE, 'Installed in offline mode')
 @patch("panoptes_aggregation.batch_aggregation.BatchAggregator._connect_api_client", new=MagicMock())
 class TestBatchAggregation(unittest.TestCase):
+    def _patch_batch_utils(self, batch_extract, batch_reduce_extracts, flatten_extracts=None):
+        functions = [
+            ('batch_extract', batch_extract),
+            ('batch_reduce_extracts', batch_reduce_extracts),
+            ('flatten_extracts', flatten_extracts or MagicMock())
+        ]
+        for name, value in functions:
+            patcher = patch.object(batch_utils, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     @patch("panoptes_aggregation.batch_aggregation.BatchAggregator")
     def test_run_aggregation_permission_failure(self, mock_aggregator):
         mock_aggregator_instance = mock_aggregator.return_value
@@ -38,10 +49,10 @@ class TestBatchAggregation(unittest.TestCase):
         mock_aggregator_instance.check_permission.return_value = True
 
         mock_df = MagicMock()
-        test_extracts = {'question_extractor': mock_df}
-        batch_utils.batch_extract = MagicMock(return_value=test_extracts)
+        test_extracts = {'question_extractor': [MagicMock()]}
         mock_reducer = MagicMock()
-        batch_utils.batch_reduce = mock_reducer
+        # patched for this test only so the real functions are left for the other tests
+        self._patch_batch_utils(MagicMock(return_value=test_extracts), mock_reducer, MagicMock(return_value=mock_df))
         mock_combo_df = MagicMock()
         mock_concat.return_value = mock_combo_df
 
@@ -50,13 +61,54 @@ class TestBatchAggregation(unittest.TestCase):
         mock_aggregator.assert_called_once_with(1, 10, 'fake-token')
         mock_wf_ext_conf.assert_called_once()
         batch_utils.batch_extract.assert_called_once()
+        self.assertFalse(batch_utils.batch_extract.call_args.kwargs['flatten'])
+        batch_utils.flatten_extracts.assert_called_once_with(test_extracts['question_extractor'])
         mock_df.to_csv.assert_called()
-        batch_utils.batch_reduce.assert_called()
+        batch_utils.batch_reduce_extracts.assert_called()
         self.assertEqual(mock_reducer.call_count, 2)
         mock_combo_df.to_csv.assert_called_once()
         mock_aggregator_instance.upload_files.assert_called_once()
         mock_aggregator_instance.update_panoptes.assert_called_once()
 
+    @patch("panoptes_aggregation.batch_aggregation.available_cpu_count", return_value=4)
+    @patch("panoptes_aggregation.batch_aggregation.Pool")
+    @patch("panoptes_aggregation.batch_aggregation.pd.concat")
+    @patch("panoptes_aggregation.batch_aggregation.workflow_extractor_config")
+    @patch("panoptes_aggregation.batch_aggregation.BatchAggregator")
+    def test_run_aggregation_shared_pool(self, mock_aggregator, mock_wf_ext_conf, mock_concat, mock_pool, mock_cpu_count):
+        mock_aggregator_instance = mock_aggregator.return_value
+        mock_aggregator_instance.check_permission.return_value = True
+        pool = mock_pool.return_value.__enter__.return_value
+
+        test_extracts = {'question_extractor': [MagicMock()], 'survey_extractor': [MagicMock()]}
+        mock_reducer = MagicMock()
+        # patched for this test only so the real functions are left for the other tests
+        self._patch_batch_utils(MagicMock(return_value=test_extracts), mock_reducer)
+
+        run_aggregation(1, 10, 'fake-token')
+        mock_pool.assert_called_once_with(4)
+        batch_utils.batch_extract.assert_called_once()
+        self.assertIs(batch_utils.batch_extract.call_args.kwargs['pool'], pool)
+        self.assertEqual(batch_utils.batch_extract.call_args.kwargs['cpu_count'], 4)
+        self.assertEqual(mock_reducer.call_count, 3)
+        reducers = set()
+        for reduce_call in mock_reducer.call_args_list:
+            self.assertIs(reduce_call.kwargs['pool'], pool)
+            self.assertEqual(reduce_call.kwargs['cpu_count'], 4)
+            reducers.update(reduce_call.args[1]['reducer_config'].keys())
+        self.assertEqual(reducers, {'question_reducer', 'question_consensus_reducer', 'survey_reducer'})
+
+    @patch.dict(os.environ, {'AGGREGATION_CPU_COUNT': '3'})
+    def test_available_cpu_count_env(self):
+        self.assertEqual(batch_agg.available_cpu_count(), 3)
+
+    @patch("panoptes_aggregation.cpu_count._cgroup_cpu_quota", return_value=1.5)
+    @patch("panoptes_aggregation.cpu_count.os.sched_getaffinity", return_value=set(range(8)), create=True)
+    def test_available_cpu_count_quota(self, mock_affinity, mock_quota):
+        with patch.dict(os.environ):
+            os.environ.pop('AGGREGATION_CPU_COUNT', None)
+            self.assertEqual(batch_agg.available_cpu_count(), 2)
+
     @patch("panoptes_aggregation.batch_aggregation.os.makedirs")
     @patch("panoptes_aggregation.batch_aggregation.Workflow")
     @patch("panoptes_aggregation.batch_aggregation.Project")
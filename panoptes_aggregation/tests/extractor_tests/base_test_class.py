@@ -73,6 +73,14 @@ def ExtractorTest(
             append_version(blank_extract)
             self.assertTestType(result, blank_extract)
 
+        @unittest.skipIf(getattr(function, '_mutates_input', True), 'Extractor may modify its input')
+        def test_extract_does_not_mutate_input(self):
+            '''Test the annotations are not modified when the extractor says they are not'''
+            classification_by_task = annotation_by_task(copy.deepcopy(classification))
+            expected_annotations = copy.deepcopy(classification_by_task['annotations'])
+            function(copy.copy(classification_by_task), **copy.deepcopy(kwargs))
+            self.assertEqual(classification_by_task['annotations'], expected_annotations)
+
         @unittest.skipIf(OFFLINE, 'Installed in offline mode')
         def test_request(self):
             '''Test the online extract function'''
@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+from panoptes_aggregation.reducers.cluster_summary import cluster_summary
+
+
+class TestClusterSummary(unittest.TestCase):
+    def test_cluster_summary(self):
+        '''Test cluster_summary matches the stats of each cluster'''
+        rng = np.random.default_rng(0)
+        loc = rng.normal(size=(50, 3))
+        labels = rng.integers(-1, 5, 50)
+        # a cluster with only one point
+        labels[labels == 4] = 3
+        labels[0] = 4
+        counts, means, covariances, members = cluster_summary(loc, labels)
+        self.assertEqual(len(counts), 5)
+        for k in range(5):
+            with self.subTest(k=k):
+                idx = labels == k
+                self.assertEqual(counts[k], idx.sum())
+                np.testing.assert_array_equal(members[k], np.flatnonzero(idx))
+                np.testing.assert_allclose(means[k], loc[idx].mean(axis=0))
+                if idx.sum() > 1:
+                    np.testing.assert_allclose(covariances[k], np.cov(loc[idx].T))
+                else:
+                    self.assertTrue(np.isnan(covariances[k]).all())
+
+    def test_cluster_summary_no_clusters(self):
+        '''Test cluster_summary when no points are in a cluster'''
+        loc = np.array([[0, 0], [1, 1]])
+        labels = np.array([-1, -1])
+        counts, means, covariances, members = cluster_summary(loc, labels)
+        self.assertEqual(counts.shape, (0,))
+        self.assertEqual(means.shape, (0, 2))
+        self.assertEqual(covariances.shape, (0, 2, 2))
+        self.assertEqual(members, [])
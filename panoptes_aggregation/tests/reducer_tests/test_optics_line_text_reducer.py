@@ -498,7 +498,10 @@ reduced_data = {
         'gutter_eps': 150.0,
         'low_consensus_threshold': 3.0,
         'min_line_length': 0.0,
-        'minimum_views': 5
+        'minimum_views': 5,
+        'precompute_distances': False,
+        'alignment': 'collatex',
+        'frame_workers': 1
     }
 }
 
@@ -524,6 +527,81 @@ TestOpticsLTReducer = ReducerTest(
     test_name='TestOpticsLTReducer'
 )
 
+reduced_data_numpy = copy.deepcopy(reduced_data)
+reduced_data_numpy['parameters']['alignment'] = 'numpy'
+TestOpticsLTReducerNumpyAlignment = ReducerTest(
+    optics_line_text_reducer,
+    process_data,
+    extracted_data,
+    processed_data,
+    reduced_data_numpy,
+    'Test optics line-text reducer with the numpy alignment',
+    kwargs={
+        'angle_eps': 30.0,
+        'gutter_eps': 150.0,
+        'low_consensus_threshold': 3.0,
+        'minimum_views': 5,
+        'alignment': 'numpy'
+    },
+    okwargs={
+        'min_samples': 'auto',
+        'xi': 0.15
+    },
+    network_kwargs=kwargs_extra_data,
+    output_kwargs=True,
+    test_name='TestOpticsLTReducerNumpyAlignment'
+)
+
+reduced_data_frame_workers = copy.deepcopy(reduced_data)
+reduced_data_frame_workers['parameters']['frame_workers'] = 2
+TestOpticsLTReducerFrameWorkers = ReducerTest(
+    optics_line_text_reducer,
+    process_data,
+    extracted_data,
+    processed_data,
+    reduced_data_frame_workers,
+    'Test optics line-text reducer with the frames reduced in parallel',
+    kwargs={
+        'angle_eps': 30.0,
+        'gutter_eps': 150.0,
+        'low_consensus_threshold': 3.0,
+        'minimum_views': 5,
+        'frame_workers': 2
+    },
+    okwargs={
+        'min_samples': 'auto',
+        'xi': 0.15
+    },
+    network_kwargs=kwargs_extra_data,
+    output_kwargs=True,
+    test_name='TestOpticsLTReducerFrameWorkers'
+)
+
+reduced_data_precomputed = copy.deepcopy(reduced_data)
+reduced_data_precomputed['parameters']['precompute_distances'] = True
+TestOpticsLTReducerPrecomputed = ReducerTest(
+    optics_line_text_reducer,
+    process_data,
+    extracted_data,
+    processed_data,
+    reduced_data_precomputed,
+    'Test optics line-text reducer with precomputed distances',
+    kwargs={
+        'angle_eps': 30.0,
+        'gutter_eps': 150.0,
+        'low_consensus_threshold': 3.0,
+        'minimum_views': 5,
+        'precompute_distances': True
+    },
+    okwargs={
+        'min_samples': 'auto',
+        'xi': 0.15
+    },
+    network_kwargs=kwargs_extra_data,
+    output_kwargs=True,
+    test_name='TestOpticsLTReducerPrecomputed'
+)
+
 reduced_data2 = copy.deepcopy(reduced_data)
 reduced_data2['parameters']['min_samples'] = 2
 TestOpticsLTReducerWithMinSamples = ReducerTest(
@@ -698,7 +776,10 @@ reduced_data_with_dollar_sign = {
         'gutter_eps': 150.0,
         'low_consensus_threshold': 3.0,
         'min_line_length': 0.0,
-        'minimum_views': 5
+        'minimum_views': 5,
+        'precompute_distances': False,
+        'alignment': 'collatex',
+        'frame_workers': 1
     }
 }
 
@@ -724,6 +805,31 @@ TestOpticsLTReducerWithDollarSign = ReducerTest(
     test_name='TestOpticsLTReducerWithDollarSign'
 )
 
+reduced_data_with_dollar_sign_numpy = copy.deepcopy(reduced_data_with_dollar_sign)
+reduced_data_with_dollar_sign_numpy['parameters']['alignment'] = 'numpy'
+TestOpticsLTReducerWithDollarSignNumpyAlignment = ReducerTest(
+    optics_line_text_reducer,
+    process_data,
+    extracted_data_with_dollar_sign,
+    processed_data_with_dollar_sign,
+    reduced_data_with_dollar_sign_numpy,
+    'Test optics line-text reducer with dollar sign and the numpy alignment',
+    kwargs={
+        'angle_eps': 30.0,
+        'gutter_eps': 150.0,
+        'low_consensus_threshold': 3.0,
+        'minimum_views': 5,
+        'alignment': 'numpy'
+    },
+    okwargs={
+        'min_samples': 'auto',
+        'xi': 0.15
+    },
+    network_kwargs=kwargs_extra_data_with_dollar_sign,
+    output_kwargs=True,
+    test_name='TestOpticsLTReducerWithDollarSignNumpyAlignment'
+)
+
 # this is a real classification that happened on ASM
 extracted_data_no_length = [
     {
@@ -771,7 +877,10 @@ reduced_data_no_length = {
         'gutter_eps': 300.0,
         'low_consensus_threshold': 3.0,
         'min_line_length': 0.0,
-        'minimum_views': 5
+        'minimum_views': 5,
+        'precompute_distances': False,
+        'alignment': 'collatex',
+        'frame_workers': 1
     }
 }
 
@@ -1,5 +1,6 @@
 from panoptes_aggregation.reducers.poly_line_text_reducer import process_data, poly_line_text_reducer
 from .base_test_class import ReducerTest
+import copy
 
 extracted_data = [
     {
@@ -925,7 +926,9 @@ reduced_data = {
         'min_word_count': 1,
         'low_consensus_threshold': 4.0,
         'process_by_line': False,
-        'minimum_views': 5
+        'minimum_views': 5,
+        'alignment': 'collatex',
+        'frame_workers': 1
     }
 }
 
@@ -954,6 +957,62 @@ TestPLTReducer = ReducerTest(
     test_name='TestPLTReducer'
 )
 
+reduced_data_numpy = copy.deepcopy(reduced_data)
+reduced_data_numpy['parameters']['alignment'] = 'numpy'
+TestPLTReducerNumpyAlignment = ReducerTest(
+    poly_line_text_reducer,
+    process_data,
+    extracted_data,
+    processed_data,
+    reduced_data_numpy,
+    'Test poly-line-text reducer by word and the numpy alignment',
+    okwargs={
+        'gutter_tol': 0.0
+    },
+    kwargs={
+        'eps_slope': 25.0,
+        'eps_line': 40.0,
+        'eps_word': 50.0,
+        'min_samples': 1,
+        'dot_freq': 'word',
+        'min_word_count': 1,
+        'low_consensus_threshold': 4.0,
+        'minimum_views': 5,
+        'alignment': 'numpy'
+    },
+    network_kwargs=kwargs_extra_data,
+    output_kwargs=True,
+    test_name='TestPLTReducerNumpyAlignment'
+)
+
+reduced_data_frame_workers = copy.deepcopy(reduced_data)
+reduced_data_frame_workers['parameters']['frame_workers'] = 2
+TestPLTReducerFrameWorkers = ReducerTest(
+    poly_line_text_reducer,
+    process_data,
+    extracted_data,
+    processed_data,
+    reduced_data_frame_workers,
+    'Test poly-line-text reducer by word with the frames reduced in parallel',
+    okwargs={
+        'gutter_tol': 0.0
+    },
+    kwargs={
+        'eps_slope': 25.0,
+        'eps_line': 40.0,
+        'eps_word': 50.0,
+        'min_samples': 1,
+        'dot_freq': 'word',
+        'min_word_count': 1,
+        'low_consensus_threshold': 4.0,
+        'minimum_views': 5,
+        'frame_workers': 2
+    },
+    network_kwargs=kwargs_extra_data,
+    output_kwargs=True,
+    test_name='TestPLTReducerFrameWorkers'
+)
+
 processed_data_by_line = {
     'frame0': {
         'x': [
@@ -1543,7 +1602,9 @@ reduced_data_by_line = {
         'min_word_count': 1,
         'low_consensus_threshold': 4.0,
         'process_by_line': True,
-        'minimum_views': 5
+        'minimum_views': 5,
+        'alignment': 'collatex',
+        'frame_workers': 1
     }
 }
 
@@ -1575,6 +1636,37 @@ TestPLTReducerByLine = ReducerTest(
     test_name='TestPLTReducerByLine'
 )
 
+reduced_data_by_line_numpy = copy.deepcopy(reduced_data_by_line)
+reduced_data_by_line_numpy['parameters']['alignment'] = 'numpy'
+TestPLTReducerByLineNumpyAlignment = ReducerTest(
+    poly_line_text_reducer,
+    process_data,
+    extracted_data,
+    processed_data_by_line,
+    reduced_data_by_line_numpy,
+    'Test poly-line-text reducer by line and the numpy alignment',
+    okwargs={
+        'gutter_tol': 0.0
+    },
+    pkwargs={
+        'process_by_line': True
+    },
+    kwargs={
+        'eps_slope': 25.0,
+        'eps_line': 40.0,
+        'eps_word': 50.0,
+        'min_samples': 1,
+        'dot_freq': 'line',
+        'min_word_count': 1,
+        'low_consensus_threshold': 4.0,
+        'minimum_views': 5,
+        'alignment': 'numpy'
+    },
+    network_kwargs=kwargs_extra_data,
+    output_kwargs=True,
+    test_name='TestPLTReducerByLineNumpyAlignment'
+)
+
 reduced_data_min_word = {
     'reducer': 'poly_line_text_reducer',
     'low_consensus_lines': 2,
@@ -1849,7 +1941,9 @@ reduced_data_min_word = {
         'min_word_count': 4,
         'low_consensus_threshold': 4.0,
         'process_by_line': True,
-        'minimum_views': 5
+        'minimum_views': 5,
+        'alignment': 'collatex',
+        'frame_workers': 1
     }
 }
 
@@ -1881,6 +1975,37 @@ TestPLTReducerWithMinWordCount = ReducerTest(
     test_name='TestPLTReducerWithMinWordCount'
 )
 
+reduced_data_min_word_numpy = copy.deepcopy(reduced_data_min_word)
+reduced_data_min_word_numpy['parameters']['alignment'] = 'numpy'
+TestPLTReducerWithMinWordCountNumpyAlignment = ReducerTest(
+    poly_line_text_reducer,
+    process_data,
+    extracted_data,
+    processed_data_by_line,
+    reduced_data_min_word_numpy,
+    'Test poly-line-text reducer by line with a min word count and the numpy alignment',
+    okwargs={
+        'gutter_tol': 0.0
+    },
+    pkwargs={
+        'process_by_line': True
+    },
+    kwargs={
+        'eps_slope': 25.0,
+        'eps_line': 40.0,
+        'eps_word': 50.0,
+        'min_samples': 1,
+        'dot_freq': 'line',
+        'min_word_count': 4,
+        'low_consensus_threshold': 4,
+        'minimum_views': 5,
+        'alignment': 'numpy'
+    },
+    network_kwargs=kwargs_extra_data,
+    output_kwargs=True,
+    test_name='TestPLTReducerWithMinWordCountNumpyAlignment'
+)
+
 # this is a real classification that happened on ASM
 extracted_data_no_length = [
     {
@@ -1934,7 +2059,9 @@ reduced_data_no_length = {
         'min_word_count': 1,
         'low_consensus_threshold': 4.0,
         'process_by_line': True,
-        'minimum_views': 5
+        'minimum_views': 5,
+        'alignment': 'collatex',
+        'frame_workers': 1
     }
 }
 
@@ -107,6 +107,89 @@ class TestIoUMetric(unittest.TestCase):
         result = utils.IoU_metric_polygon(a, b, data_in=data_in)
         self.assertEqual(result, expected)
 
+    def test_IoU_radius_graph_polygon(self):
+        square1 = shapely.Polygon(np.array([[0, 0], [0, 1], [1, 1], [1, 0]]))
+        square2 = shapely.Polygon(np.array([[0.5, 0.0], [0.5, 1.0], [1.5, 1.0], [1.5, 0.0]]))
+        square3 = shapely.Polygon(np.array([[0, 2], [0, 3], [1, 3], [1, 2]]))
+        square4 = shapely.Polygon(np.array([[0.0, 0.1], [1., 0.1], [1., 1.1], [0.0, 1.1]]))
+        square5 = shapely.Polygon(np.array([[0.0, 0.5], [1., 0.5], [1., 1.5], [0.0, 1.5]]))
+
+        data = [{'polygon': square1},
+                {'polygon': square2},
+                {'polygon': square3},
+                {'polygon': square4},
+                {'polygon': square5}]
+        # square4 is drawn by the same user as square1
+        X = np.array([[0, 0], [1, 1], [2, 2], [3, 0], [4, 4]])
+        eps = 0.7
+        result = utils.IoU_radius_graph_polygon(X, data, eps).toarray()
+        expected = np.zeros((5, 5))
+        for i in range(5):
+            for j in range(5):
+                distance = utils.IoU_metric_polygon(X[i], X[j], data_in=data)
+                if distance <= eps:
+                    expected[i, j] = distance
+        np.testing.assert_allclose(result, expected)
+        self.assertEqual(result[0, 3], 0)
+
+    def test_IoU_radius_graph_polygon_large_eps(self):
+        square1 = shapely.Polygon(np.array([[0, 0], [0, 1], [1, 1], [1, 0]]))
+        data = [{'polygon': square1}]
+        X = np.array([[0, 0]])
+        with self.assertRaises(ValueError):
+            utils.IoU_radius_graph_polygon(X, data, 1)
+
+    def _overlapping_polygons(self):
+        square1 = shapely.Polygon(np.array([[0, 0], [0, 1], [1, 1], [1, 0]]))
+        square2 = shapely.Polygon(np.array([[0.5, 0.0], [0.5, 1.0], [1.5, 1.0], [1.5, 0.0]]))
+        square3 = shapely.Polygon(np.array([[0, 2], [0, 3], [1, 3], [1, 2]]))
+        square4 = shapely.Polygon(np.array([[0.0, 0.1], [1., 0.1], [1., 1.1], [0.0, 1.1]]))
+        square5 = shapely.Polygon(np.array([[0.0, 0.5], [1., 0.5], [1., 1.5], [0.0, 1.5]]))
+        bowtie = shapely.Polygon(np.array([[0, 0], [1, 1], [1, 0], [0, 1]]))
+        data = [{'polygon': square1},
+                {'polygon': square2},
+                {'polygon': square3},
+                {'polygon': square4},
+                {'polygon': square5},
+                {'polygon': bowtie},
+                {'polygon': square1}]
+        # square4 is drawn by the same user as square1
+        X = np.array([[0, 0], [1, 1], [2, 2], [3, 0], [4, 4], [5, 5], [6, 6]])
+        return X, data
+
+    def test_IoU_distance_graph_polygon(self):
+        X, data = self._overlapping_polygons()
+        graph = utils.IoU_distance_graph_polygon(X, data)
+        result = utils.IoU_distance_matrix_from_graph(X, graph)
+        expected = np.array([
+            [utils.IoU_metric_polygon(a, b, data_in=data) for b in X]
+            for a in X
+        ])
+        np.testing.assert_allclose(result, expected)
+        # identical polygons are stored with a distance of zero
+        self.assertEqual(graph[0, 6], 0)
+        self.assertIn(6, graph[0].indices)
+
+    def test_IoU_precomputed_distances_polygon(self):
+        X, data = self._overlapping_polygons()
+        graph = utils.IoU_distance_graph_polygon(X, data)
+        np.testing.assert_allclose(
+            utils.IoU_precomputed_distances_polygon(X, data, 0.7, distance_graph=graph).toarray(),
+            utils.IoU_radius_graph_polygon(X, data, 0.7).toarray()
+        )
+        result = utils.IoU_precomputed_distances_polygon(X, data, 1.5)
+        self.assertEqual(result[0, 3], 2.5)
+        self.assertEqual(result[0, 2], 1)
+        self.assertTrue(np.isfinite(result).all())
+
+    def test_IoU_distance_matrix_of_cluster_from_graph(self):
+        X, data = self._overlapping_polygons()
+        graph = utils.IoU_distance_graph_polygon(X, data)
+        cdx = np.array([True, True, False, True, True, True, True])
+        result = utils.IoU_distance_matrix_of_cluster(cdx, X, data, distance_graph=graph)
+        expected = utils.IoU_distance_matrix_of_cluster(cdx, X, data)
+        np.testing.assert_allclose(result, expected)
+
     def test_IoU_distance_matrix_of_cluster(self):
         square1 = shapely.Polygon(np.array([[0, 0], [0, 1], [1, 1], [1, 0]]))
         square2 = shapely.Polygon(np.array([[0.5, 0.0], [0.5, 1.0], [1.5, 1.0], [1.5, 0.0]]))
@@ -526,6 +609,32 @@ class TestIoUMetric(unittest.TestCase):
         result = utils.cluster_average_intersection_contours(data, **kwargs)
         self.assertTrue(all([shapely.equals(result[i], expected[i]) for i in range(len(expected))]))
 
+    def test__add_polygon_to_grid(self):
+        rng = np.random.default_rng(0)
+        angles = np.linspace(0, 2 * np.pi, 30, endpoint=False)
+        polygons = [
+            shapely.Polygon(np.array([[0, 0], [0, 1], [1, 1], [1, 0]])),
+            shapely.Polygon(np.array([[0, 0], [2, 2], [2, 0]])),
+            shapely.box(0, 0, 2, 2).difference(shapely.box(0.5, 0.5, 1, 1)),
+            # self-intersecting
+            shapely.Polygon(np.array([[0, 0], [2, 2], [2, 0], [0, 2]]))
+        ]
+        for _ in range(5):
+            radius = 0.8 + rng.normal(0, 0.1, len(angles))
+            polygons.append(shapely.Polygon(np.array([
+                1 + radius * np.cos(angles),
+                1 + radius * np.sin(angles)
+            ]).T))
+        for num_grid_points in [5, 21, 64]:
+            x_values = np.linspace(0, 2, num_grid_points)
+            y_values = np.linspace(-0.1, 2, num_grid_points)
+            x_grid, y_grid = np.meshgrid(x_values, y_values)
+            for polygon in polygons:
+                expected = shapely.contains_xy(polygon, x_grid, y_grid).astype(float)
+                result = np.zeros(np.shape(x_grid))
+                utils._add_polygon_to_grid(polygon, x_values, y_values, result)
+                np.testing.assert_array_equal(result, expected)
+
     def test_cluster_average_intersection_contours_rasterisation(self):
         square1 = shapely.Polygon(np.array([[0, 0], [0, 1], [1, 1], [1, 0]]))
         square2 = shapely.Polygon(np.array([[0.5, 0.0], [0.5, 1.0], [1.5, 1.0], [1.5, 0.0]]))
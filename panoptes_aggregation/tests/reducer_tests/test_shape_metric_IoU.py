@@ -75,6 +75,51 @@ class TestIoUMetric(unittest.TestCase):
         result = IoU.IoU_metric([0, 0, 0], [1, 1, 0], 'circle')
         self.assertEqual(result, expected)
 
+    def test_IoU_distance_matrix(self):
+        '''Test the IoU distance matrix matches the IoU metric for each pair'''
+        shapes = {
+            'rectangle': [[0, 0, 2, 2], [0, 2 / 3, 2, 2], [0, 2, 2, 2], [10, 10, 1, 1]],
+            'rotateRectangle': [[0, 0, 2, 2, 0], [0, 0, 2, 2, 45], [5, 5, 2, 2, 10]],
+            'circle': [[0, 0, 1], [0.5, 0, 1], [10, 0, 1], [20, 0, 0]],
+            'ellipse': [[0, 0, 3, 1, 0], [0, 0, 3, 1, 90], [10, 10, 3, 1, 0]],
+            'triangle': [[0, 0, 3, 0], [0, 0, 3, 60], [20, 20, 3, 0]],
+            'temporalRotateRectangle': [[0, 0, 2, 2, 0, 0.5], [0, 0, 2, 2, 0, 0.4], [0, 0, 2, 2, 0, 2]]
+        }
+        for shape, params_list in shapes.items():
+            with self.subTest(shape=shape):
+                expected = numpy.array([
+                    [IoU.IoU_metric(params_1, params_2, shape, eps_t=0.5) for params_2 in params_list]
+                    for params_1 in params_list
+                ])
+                result = IoU.IoU_distance_matrix(params_list, shape, eps_t=0.5)
+                numpy.testing.assert_almost_equal(result, expected, 10)
+
+    def test_precomputed_IoU_kwargs(self):
+        '''Test swapping the IoU metric for a precomputed distance matrix'''
+        params_list = [[0, 0, 2, 2], [0, 2 / 3, 2, 2]]
+        kwargs = {'eps': 0.5, 'metric': IoU.IoU_metric, 'metric_params': {'shape': 'rectangle'}}
+        X, result_kwargs = IoU.precomputed_IoU_kwargs(params_list, 'rectangle', None, kwargs)
+        numpy.testing.assert_almost_equal(X, [[0, 0.5], [0.5, 0]], 10)
+        self.assertDictEqual(result_kwargs, {'eps': 0.5, 'metric': 'precomputed'})
+
+    def test_precomputed_IoU_kwargs_no_area(self):
+        '''Test the IoU metric is kept if a shape has no area'''
+        params_list = [[0, 0, 0], [1, 1, 0]]
+        kwargs = {'eps': 0.5, 'metric': IoU.IoU_metric, 'metric_params': {'shape': 'circle'}}
+        X, result_kwargs = IoU.precomputed_IoU_kwargs(params_list, 'circle', None, kwargs)
+        self.assertIs(X, params_list)
+        self.assertIs(result_kwargs, kwargs)
+
+    def test_precomputed_IoU_kwargs_tree_algorithm(self):
+        '''Test the IoU metric is kept for tree based neighbor searches'''
+        params_list = [[0, 0, 2, 2], [0, 2 / 3, 2, 2]]
+        for algorithm in ['ball_tree', 'kd_tree']:
+            with self.subTest(algorithm=algorithm):
+                kwargs = {'eps': 0.5, 'metric': IoU.IoU_metric, 'metric_params': {'shape': 'rectangle'}, 'algorithm': algorithm}
+                X, result_kwargs = IoU.precomputed_IoU_kwargs(params_list, 'rectangle', None, kwargs)
+                self.assertIs(X, params_list)
+                self.assertIs(result_kwargs, kwargs)
+
     def test_average_bounds_rect(self):
         '''Test finding the average bounds for rectangles'''
         params_list = [
@@ -98,6 +98,25 @@ TestShapeReducerRectangleIoU = ReducerTest(
     round=1
 )
 
+TestShapeReducerRectangleIoUBallTree = ReducerTest(
+    shape_reducer_dbscan,
+    process_data_dbscan,
+    extracted_data,
+    processed_data,
+    reduced_data,
+    'Test shape rectangle reducer with DBSCAN, IoU metric, and ball_tree algorithm',
+    network_kwargs=kwargs_extra_data,
+    pkwargs={'shape': 'rectangle'},
+    kwargs={
+        'eps': 0.9,
+        'min_samples': 2,
+        'metric_type': 'IoU',
+        'algorithm': 'ball_tree'
+    },
+    test_name='TestShapeReducerRectangleIoUBallTree',
+    round=1
+)
+
 TestShapeReducerRectangleIoUOptics = ReducerTest(
     shape_reducer_optics,
     process_data_optics,
@@ -115,6 +134,24 @@ TestShapeReducerRectangleIoUOptics = ReducerTest(
     round=1
 )
 
+TestShapeReducerRectangleIoUOpticsBallTree = ReducerTest(
+    shape_reducer_optics,
+    process_data_optics,
+    extracted_data,
+    processed_data,
+    reduced_data,
+    'Test shape rectangle reducer with OPTICS, IoU metric, and ball_tree algorithm',
+    network_kwargs=kwargs_extra_data,
+    pkwargs={'shape': 'rectangle'},
+    kwargs={
+        'min_samples': 2,
+        'metric_type': 'IoU',
+        'algorithm': 'ball_tree'
+    },
+    test_name='TestShapeReducerRectangleIoUOpticsBallTree',
+    round=1
+)
+
 reduced_data_hdbscan = copy.deepcopy(reduced_data)
 reduced_data_hdbscan['frame0']['T0_tool0_cluster_probabilities'] = [1.0, 1.0, 1.0, 1.0]
 
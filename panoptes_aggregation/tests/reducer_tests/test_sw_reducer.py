@@ -1,5 +1,6 @@
 from panoptes_aggregation.reducers.poly_line_text_reducer import process_data, poly_line_text_reducer
 from .base_test_class import ReducerTest
+import copy
 
 extracted_data = [
     {
@@ -1204,7 +1205,9 @@ reduced_data = {
         'min_word_count': 1,
         'low_consensus_threshold': 3.0,
         'process_by_line': False,
-        'minimum_views': 5
+        'minimum_views': 5,
+        'alignment': 'collatex',
+        'frame_workers': 1
     }
 }
 
@@ -1233,6 +1236,34 @@ TestSWReducer = ReducerTest(
     test_name='TestSWReducer'
 )
 
+reduced_data_numpy = copy.deepcopy(reduced_data)
+reduced_data_numpy['parameters']['alignment'] = 'numpy'
+TestSWReducerNumpyAlignment = ReducerTest(
+    poly_line_text_reducer,
+    process_data,
+    extracted_data,
+    processed_data,
+    reduced_data_numpy,
+    'Test SW text reducer with the numpy alignment',
+    okwargs={
+        'gutter_tol': 0.0,
+        'min_word_count': 1,
+        'low_consensus_threshold': 3.0,
+        'minimum_views': 5
+    },
+    kwargs={
+        'eps_slope': 0.5,
+        'eps_line': 15.0,
+        'eps_word': 30.0,
+        'dot_freq': 'line',
+        'min_samples': 2,
+        'alignment': 'numpy'
+    },
+    network_kwargs=kwargs_extra_data,
+    output_kwargs=True,
+    test_name='TestSWReducerNumpyAlignment'
+)
+
 extracted_data_all_blank = [
     {
         'frame0': {
@@ -1300,7 +1331,9 @@ reduced_data_all_blank = {
         'min_word_count': 1,
         'low_consensus_threshold': 3.0,
         'process_by_line': False,
-        'minimum_views': 5
+        'minimum_views': 5,
+        'alignment': 'collatex',
+        'frame_workers': 1
     }
 }
 
@@ -89,7 +89,9 @@ reduced_data = {
         'min_word_count': 1,
         'low_consensus_threshold': 3.0,
         'process_by_line': False,
-        'minimum_views': 5
+        'minimum_views': 5,
+        'alignment': 'collatex',
+        'frame_workers': 1
     }
 }
 
@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+from panoptes_aggregation.reducers.text_alignment import align_texts
+
+texts = [
+    ['this is some test text', 'this is some text text', 'this is some test text'],
+    ['the cat sat on the mat', 'the cat sat on teh mat', 'cat sat on the the mat', 'the the cat'],
+    ['words on a page', 'words on a apge', 'on a page words', 'words words on'],
+    ['Costs $ 100', 'Costs $100', 'Costs $ 100 $', '$ $ Costs'],
+    ['<sw>Pot</sw> Pourri', 'Pot <sw>Pourri</sw>', 'Pot Pourri'],
+    ['single'],
+    ['a b c', 'c b a', 'b a c', 'a a b b c c']
+]
+
+
+def noisy_copies(rng, vocabulary, number_of_copies):
+    base = rng.choice(vocabulary, size=rng.integers(5, 20))
+    copies = []
+    for _ in range(number_of_copies):
+        words = []
+        for word in base:
+            draw = rng.random()
+            if draw < 0.1:
+                continue
+            if draw < 0.2:
+                words.append(rng.choice(vocabulary))
+            elif draw < 0.25:
+                words += [word, rng.choice(vocabulary)]
+            else:
+                words.append(word)
+        copies.append(' '.join(words) or 'x')
+    return copies
+
+
+class TestTextAlignment(unittest.TestCase):
+    def test_align_texts_collatex(self):
+        expected = [
+            {0: 'this', 1: 'this', 2: 'this'},
+            {0: 'is', 1: 'is', 2: 'is'},
+            {0: 'some', 1: 'some', 2: 'some'},
+            {0: 'test', 1: 'text', 2: 'test'},
+            {0: 'text', 1: 'text', 2: 'text'}
+        ]
+        self.assertEqual(align_texts(texts[0]), expected)
+
+    def test_align_texts_numpy(self):
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(align_texts(text, 'numpy'), align_texts(text, 'collatex'))
+
+    def test_align_texts_numpy_random(self):
+        rng = np.random.default_rng(42)
+        vocabulary = ['the', 'of', 'and', 'a', 'to', 'teh', 'cat', 'cats', '<sw>', '$']
+        for _ in range(50):
+            text = noisy_copies(rng, vocabulary, rng.integers(2, 10))
+            with self.subTest(text=text):
+                self.assertEqual(align_texts(text, 'numpy'), align_texts(text, 'collatex'))
+
+    def test_align_texts_empty(self):
+        self.assertEqual(align_texts([], 'collatex'), [])
+        self.assertEqual(align_texts([], 'numpy'), [])
+
+    def test_align_texts_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            align_texts(['some text'], 'not_a_backend')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -65,6 +65,21 @@ TestTextReducer = ReducerTest(
     test_name='TestTextReducer'
 )
 
+TestTextReducerNumpyAlignment = ReducerTest(
+    text_reducer,
+    process_data,
+    extracted_data,
+    processed_data,
+    reduced_data,
+    'Test text reducer with the numpy alignment',
+    kwargs={
+        'alignment': 'numpy'
+    },
+    network_kwargs=kwargs_extra_data,
+    processed_type='list',
+    test_name='TestTextReducerNumpyAlignment'
+)
+
 extracted_data_blank = [
     {'text': ''},
     {'text': ' '},
@@ -9,6 +9,8 @@ except ImportError:
 import unittest
 from unittest.mock import patch, MagicMock
 import numpy as np
+import json
+import multiprocessing
 import os
 import panoptes_aggregation
 
@@ -53,6 +55,69 @@ class RouterTest(unittest.TestCase):
                     extractor_name
                 )
 
+    def test_extractor_batch_routes(self):
+        '''Test all batch extractor routes exists'''
+        for extractor_name in panoptes_aggregation.extractors.extractors.keys():
+            with self.subTest(extractor=extractor_name):
+                self.route_exists(
+                    '/extractors/{0}/batch'.format(extractor_name),
+                    '{0}/batch'.format(extractor_name)
+                )
+
+    def test_post_to_batch_extractor_route(self):
+        '''Test POST to a batch extractor route extracts each classification in order'''
+        classifications = [
+            {'annotations': {'T0': [{'task': 'T0', 'value': 0}]}, 'metadata': {'first': 'a'}},
+            {'annotations': {'T0': [{'task': 'T0', 'value': 1}]}, 'metadata': {'first': 'b'}},
+            {'annotations': {'T0': [{'task': 'T0', 'value': 0}]}, 'metadata': {'first': 'c'}},
+            {'annotations': {'T1': [{'task': 'T1', 'value': 0}]}, 'metadata': {'first': 'd'}}
+        ]
+        with self.application.test_client() as client:
+            response = client.post(
+                '/extractors/question_extractor/batch?task=T0&pluck={"first": "metadata.first"}',
+                json=classifications
+            )
+        self.assertEqual(response.status_code, 200)
+        result = response.get_json()
+        self.assertEqual(len(result), 4)
+        self.assertEqual(result[0]['extraction']['0'], 1)
+        self.assertEqual(result[1]['extraction']['1'], 1)
+        self.assertEqual(result[2]['extraction']['0'], 1)
+        self.assertEqual(result[3]['extraction']['aggregation_version'], panoptes_aggregation.__version__)
+        self.assertEqual([r['extraction']['pluck.first'] for r in result], ['a', 'b', 'c', 'd'])
+
+    def test_post_to_batch_extractor_route_error(self):
+        '''Test a classification that fails in a batch only reports an error for that item'''
+        mock_extractor = MagicMock(side_effect=['OK', ValueError('bad classification'), 'OK'])
+        with patch.dict('panoptes_aggregation.routes.extractors.extractors', {'question_extractor': mock_extractor}):
+            with routes.make_application().test_client() as client:
+                response = client.post(
+                    '/extractors/question_extractor/batch?task=T0',
+                    json=[{'annotations': []}, {'annotations': []}, {'annotations': []}]
+                )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [
+            {'extraction': 'OK'},
+            {'error': 'ValueError: bad classification'},
+            {'extraction': 'OK'}
+        ])
+        for extractor_call in mock_extractor.call_args_list:
+            self.assertEqual(extractor_call.kwargs, {'task': 'T0'})
+
+    def test_post_to_batch_extractor_route_bad_body(self):
+        '''Test a batch extractor request with a body that is not a JSON list is rejected'''
+        with self.application.test_client() as client:
+            for kwargs in [
+                {'data': 'null', 'content_type': 'application/json'},
+                {'json': {'annotations': []}},
+                {'json': 3},
+                {'data': 'not json'}
+            ]:
+                with self.subTest(kwargs=kwargs):
+                    response = client.post('/extractors/question_extractor/batch?task=T0', **kwargs)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn('JSON list', response.get_json()['error'])
+
     def test_reducer_routes(self):
         '''Test all reducer routes exists'''
         for reducer_name in panoptes_aggregation.reducers.reducers.keys():
@@ -62,6 +127,114 @@ class RouterTest(unittest.TestCase):
                     reducer_name
                 )
 
+    def test_reducer_batch_routes(self):
+        '''Test all batch reducer routes exists'''
+        for reducer_name in panoptes_aggregation.reducers.reducers.keys():
+            with self.subTest(reducer=reducer_name):
+                self.route_exists(
+                    '/reducers/{0}/batch'.format(reducer_name),
+                    '{0}/batch'.format(reducer_name)
+                )
+
+    def post_to_batch_reducer(self, processes):
+        subjects = {
+            '1': [
+                {'data': {'yes': 1}, 'user_id': 1},
+                {'data': {'no': 1}, 'user_id': 2},
+                {'data': {'yes': 1}, 'user_id': 3}
+            ],
+            '2': [{'data': {'no': 1}, 'user_id': 1}],
+            '3': [{'data': {'yes': 1}}]
+        }
+        with patch.dict(os.environ, {'AGGREGATION_CPU_COUNT': str(processes)}):
+            with self.application.test_client() as client:
+                response = client.post(
+                    '/reducers/question_reducer/batch?pairs=False&processes={0}'.format(processes),
+                    json=subjects
+                )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        result = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        version = panoptes_aggregation.__version__
+        self.assertEqual(result, [
+            {'subject_id': '1', 'reduction': {'yes': 2, 'no': 1, 'aggregation_version': version}},
+            {'subject_id': '2', 'reduction': {'no': 1, 'aggregation_version': version}},
+            {'subject_id': '3', 'error': "KeyError: 'user_id'"}
+        ])
+
+    def test_post_to_batch_reducer_route(self):
+        '''Test POST to a batch reducer route streams one line per subject'''
+        self.post_to_batch_reducer(1)
+
+    def test_post_to_batch_reducer_route_processes(self):
+        '''Test POST to a batch reducer route with a worker pool'''
+        start_method = multiprocessing.get_start_method()
+        multiprocessing.set_start_method('fork', force=True)
+        self.post_to_batch_reducer(2)
+        multiprocessing.set_start_method(start_method, force=True)
+
+    def test_post_to_batch_reducer_route_bad_processes(self):
+        '''Test a batch reducer request with a bad processes keyword is rejected'''
+        with self.application.test_client() as client:
+            for processes in ['two', '0']:
+                with self.subTest(processes=processes):
+                    response = client.post(
+                        '/reducers/question_reducer/batch?processes={0}'.format(processes),
+                        json={'1': [{'data': {'yes': 1}, 'user_id': 1}]}
+                    )
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn('processes', response.get_json()['error'])
+
+    def test_post_to_batch_reducer_route_bad_body(self):
+        '''Test a batch reducer request with a body that is not a JSON object is rejected'''
+        with self.application.test_client() as client:
+            for kwargs in [{'json': [{'data': {'yes': 1}}]}, {'data': 'not json'}]:
+                with self.subTest(kwargs=kwargs):
+                    response = client.post('/reducers/question_reducer/batch', **kwargs)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn('JSON object', response.get_json()['error'])
+
+    def test_reducer_route_cache(self):
+        '''Test a repeated POST to a reducer route is answered from the cache'''
+        from panoptes_aggregation.reduction_cache import MemoryCache
+        mock_reducer = MagicMock(return_value={'yes': np.int64(2)})
+        cache = MemoryCache()
+        extracts = [{'data': {'yes': 1}}, {'data': {'yes': 1}}]
+        with patch.dict('panoptes_aggregation.routes.reducers.reducers', {'question_reducer': mock_reducer}):
+            with routes.make_application(reduction_cache=cache).test_client() as client:
+                responses = [
+                    client.post('/reducers/question_reducer?pairs=False', json=extracts),
+                    client.post('/reducers/question_reducer?pairs=False', json=extracts),
+                    client.post('/reducers/question_reducer?pairs=True', json=extracts)
+                ]
+                stats = client.get('/reduction_cache').get_json()
+        self.assertEqual([r.get_json() for r in responses], [{'yes': 2}] * 3)
+        self.assertEqual(mock_reducer.call_count, 2)
+        self.assertEqual(stats, {'hits': 1, 'misses': 2, 'size': 2, 'max_size': 1024})
+
+    def test_reducer_route_cache_outage(self):
+        '''Test the reducer still runs when the redis cache server is down'''
+        import redis
+        from panoptes_aggregation.reduction_cache import RedisCache
+        client = MagicMock()
+        client.get.side_effect = redis.ConnectionError('Connection refused')
+        client.set.side_effect = redis.ConnectionError('Connection refused')
+        mock_reducer = MagicMock(return_value={'yes': 2})
+        with patch.dict('panoptes_aggregation.routes.reducers.reducers', {'question_reducer': mock_reducer}):
+            with routes.make_application(reduction_cache=RedisCache(client)).test_client() as client:
+                with self.assertLogs('panoptes_aggregation.reduction_cache', level='WARNING'):
+                    response = client.post('/reducers/question_reducer', json=[{'data': {'yes': 1}}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'yes': 2})
+        mock_reducer.assert_called_once()
+
+    def test_reducer_route_cache_env(self):
+        '''Test the reduction cache is set up from the environment'''
+        with patch.dict(os.environ, {'REDUCTION_CACHE': 'memory', 'REDUCTION_CACHE_SIZE': '5'}):
+            with routes.make_application().test_client() as client:
+                response = client.get('/reduction_cache')
+        self.assertEqual(response.get_json(), {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 5})
+
     def test_one_running_reducer_route(self):
         '''Test all running reducer routes exists'''
         for running_reducer_name in panoptes_aggregation.running_reducers.running_reducers.keys():
@@ -0,0 +1,62 @@
+import unittest
+import copy
+from panoptes_aggregation.running_reducers.dropdown_reducer import dropdown_reducer_rr
+from panoptes_aggregation.reducers.dropdown_reducer import dropdown_reducer
+from .base_test_class import RunningReducerTestNoProcessing
+
+extracted_data = [
+    {'value': [{'option-1': 1}, {'option-2': 1}, {'None': 1}]},
+    {},
+    {'value': [{'option-4': 1}, {'option-2': 1}, {'None': 1}]},
+    {'value': [{'option-1': 1}, {'option-3': 1}, {'option-5': 1}]}
+]
+
+kwargs_extra_data = {
+    'store': {
+        'value': [
+            {'option-1': 1},
+            {'option-2': 1},
+            {'None': 1}
+        ]
+    }
+}
+
+reduced_data = {
+    'value': [
+        {'option-1': 2, 'option-4': 1},
+        {'option-2': 2, 'option-3': 1},
+        {'None': 2, 'option-5': 1}
+    ],
+    '_store': {
+        'value': [
+            {'option-1': 2, 'option-4': 1},
+            {'option-2': 2, 'option-3': 1},
+            {'None': 2, 'option-5': 1}
+        ]
+    }
+}
+
+TestDropdownRunningReducer = RunningReducerTestNoProcessing(
+    dropdown_reducer_rr,
+    extracted_data[1:],
+    reduced_data,
+    'Test dropdown running reducer',
+    network_kwargs=kwargs_extra_data,
+    test_name='TestDropdownRunningReducer'
+)
+
+
+class TestDropdownRunningReducerMatchesReducer(unittest.TestCase):
+    def test_one_at_a_time(self):
+        '''Test folding in one extract at a time matches the dropdown reducer'''
+        store = {}
+        for extract in extracted_data:
+            running = dropdown_reducer_rr([copy.deepcopy(extract)], store=store)
+            store = running.pop('_store')
+        expected = dropdown_reducer(copy.deepcopy(extracted_data))
+        self.assertDictEqual(running, expected)
+
+    def test_no_votes(self):
+        '''Test a blank extract with no previous votes gives an empty reduction'''
+        running = dropdown_reducer_rr([{}], store={}, no_version=True)
+        self.assertDictEqual(running, {'_store': {'value': []}})
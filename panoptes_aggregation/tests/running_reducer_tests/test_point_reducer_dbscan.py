@@ -0,0 +1,97 @@
+import unittest
+import copy
+import json
+import numpy as np
+from sklearn.cluster import DBSCAN
+from panoptes_aggregation.running_reducers.point_reducer_dbscan import point_reducer_dbscan_rr, dbscan_labels, add_points
+from panoptes_aggregation.reducers.point_reducer_dbscan import point_reducer_dbscan
+from .base_test_class import RunningReducerTestNoProcessing
+
+rng = np.random.default_rng(5000)
+xy = np.vstack([
+    rng.normal([12, 15], 2, size=(15, 2)),
+    rng.normal([20, 25], 2, size=(8, 2)),
+    rng.uniform(0, 40, size=(10, 2))
+]).round(3)
+extracted_data = []
+for start, end in [(0, 7), (7, 12), (12, 20), (20, 33)]:
+    extracted_data.append({
+        'frame0': {
+            'tool1_x': xy[start:end, 0].tolist(),
+            'tool1_y': xy[start:end, 1].tolist(),
+            'tool2_x': [3, None],
+            'tool2_y': [4, None]
+        }
+    })
+extracted_data.append({'frame1': {'tool1_x': [1, 1.5, 2], 'tool1_y': [1, 1.5, 2]}})
+
+kwargs = {'eps': 3, 'min_samples': 3}
+
+
+def run_one_at_a_time(extracts, **kwargs):
+    store = {}
+    for extract in extracts:
+        running = point_reducer_dbscan_rr([copy.deepcopy(extract)], store=store, **kwargs)
+        # the store is sent to caesar and back as json
+        store = json.loads(json.dumps(running.pop('_store')))
+    return running
+
+
+kwargs_extra_data = {
+    'store': point_reducer_dbscan_rr(copy.deepcopy(extracted_data[:1]), store={}, **kwargs)['_store']
+}
+
+reduced_data = point_reducer_dbscan_rr(
+    copy.deepcopy(extracted_data[1:2]),
+    store=copy.deepcopy(kwargs_extra_data['store']),
+    no_version=True,
+    **kwargs
+)
+
+TestPointRunningReducerDBSCAN = RunningReducerTestNoProcessing(
+    point_reducer_dbscan_rr,
+    extracted_data[1:2],
+    reduced_data,
+    'Test point running reducer DBSCAN',
+    kwargs=kwargs,
+    network_kwargs=kwargs_extra_data,
+    test_name='TestPointRunningReducerDBSCAN'
+)
+
+
+class TestPointRunningReducerDBSCANMatchesReducer(unittest.TestCase):
+    def test_one_at_a_time(self):
+        '''Test adding one extract at a time matches the DBSCAN point reducer'''
+        for eps, min_samples in [(3, 3), (1.5, 2), (6, 5), (0.1, 3)]:
+            with self.subTest(eps=eps, min_samples=min_samples):
+                running = run_one_at_a_time(extracted_data, eps=eps, min_samples=min_samples)
+                expected = point_reducer_dbscan(
+                    copy.deepcopy(extracted_data),
+                    user_id=list(range(len(extracted_data))),
+                    eps=eps,
+                    min_samples=min_samples
+                )
+                self.assertEqual(json.loads(json.dumps(running)), json.loads(json.dumps(expected)))
+
+    def test_change_parameters(self):
+        '''Test the neighbourhoods are found again if eps changes'''
+        store = point_reducer_dbscan_rr(copy.deepcopy(extracted_data[:2]), store={}, eps=1, min_samples=3)['_store']
+        running = point_reducer_dbscan_rr(copy.deepcopy(extracted_data[2:]), store=store, eps=3, min_samples=3)
+        running.pop('_store')
+        expected = point_reducer_dbscan(
+            copy.deepcopy(extracted_data),
+            user_id=list(range(len(extracted_data))),
+            eps=3,
+            min_samples=3
+        )
+        self.assertEqual(running, expected)
+
+    def test_dbscan_labels(self):
+        '''Test the labels match sklearn's DBSCAN, including border points near two clusters'''
+        for seed in range(20):
+            with self.subTest(seed=seed):
+                loc = np.random.default_rng(seed).uniform(0, 20, size=(200, 2))
+                state = add_points({'points': [], 'neighbors': []}, loc[:50], eps=1.2)
+                add_points(state, loc[50:], eps=1.2)
+                labels = dbscan_labels(state['neighbors'], 4)
+                np.testing.assert_array_equal(labels, DBSCAN(eps=1.2, min_samples=4).fit(loc).labels_)
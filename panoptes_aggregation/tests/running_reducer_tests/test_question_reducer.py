@@ -0,0 +1,69 @@
+import unittest
+import copy
+from panoptes_aggregation.running_reducers.question_reducer import question_reducer_rr
+from panoptes_aggregation.reducers.question_reducer import question_reducer
+from .base_test_class import RunningReducerTestNoProcessing
+
+extracted_data = [
+    {'a': 1, 'b': 1},
+    {'a': 1},
+    {'b': 1, 'c': 1},
+    {},
+    {'a': 1, 'b': 1}
+]
+
+user_ids = [1, 2, 3, 4, 5]
+
+kwargs_extra_data = {
+    'user_id': user_ids[2:],
+    'store': {
+        'reduction': {
+            'a': 2,
+            'user_ids_a': [1, 2],
+            'b': 1,
+            'user_ids_b': [1]
+        }
+    }
+}
+
+reduced_data = {
+    'a': 3,
+    'user_ids_a': [1, 2, 5],
+    'b': 3,
+    'user_ids_b': [1, 3, 5],
+    'c': 1,
+    'user_ids_c': [3],
+    '_store': {
+        'reduction': {
+            'a': 3,
+            'user_ids_a': [1, 2, 5],
+            'b': 3,
+            'user_ids_b': [1, 3, 5],
+            'c': 1,
+            'user_ids_c': [3]
+        }
+    }
+}
+
+TestQuestionRunningReducer = RunningReducerTestNoProcessing(
+    question_reducer_rr,
+    extracted_data[2:],
+    reduced_data,
+    'Test question running reducer',
+    kwargs={'track_user_ids': True},
+    network_kwargs=kwargs_extra_data,
+    test_name='TestQuestionRunningReducer'
+)
+
+
+class TestQuestionRunningReducerMatchesReducer(unittest.TestCase):
+    def test_one_at_a_time(self):
+        '''Test folding in one extract at a time matches the question reducer'''
+        for kwargs in [{}, {'pairs': True}, {'track_user_ids': True}, {'pairs': True, 'track_user_ids': True}]:
+            with self.subTest(**kwargs):
+                store = {}
+                for extract, user_id in zip(extracted_data, user_ids):
+                    running = question_reducer_rr([copy.deepcopy(extract)], user_id=[user_id], store=store, **kwargs)
+                    store = running.pop('_store')
+                expected = question_reducer(copy.deepcopy(extracted_data), user_id=user_ids, **kwargs)
+                self.assertDictEqual(running, expected)
@@ -0,0 +1,82 @@
+import unittest
+import copy
+from panoptes_aggregation.running_reducers.survey_reducer import survey_reducer_rr
+from panoptes_aggregation.reducers.survey_reducer import survey_reducer
+from .base_test_class import RunningReducerTestNoProcessing
+
+extracted_data = [
+    {'answers_howmany': {'1': 1.0}, 'answers_doing': {'grooming': 1.0}, 'choice': 'raccoon'},
+    {'answers_howmany': {'2': 1.0}, 'answers_doing': {'standing': 1.0}, 'answers_wow': {'wow': 1.0}, 'choice': 'raccoon'},
+    {'answers_howmany': {'1': 1.0}, 'answers_doing': {'interacting': 1.0, 'grooming': 1.0}, 'choice': 'blackbear'},
+    {'answers_howmany': {'1': 1.0}, 'answers_doing': {}, 'choice': 'raccoon'}
+]
+
+kwargs_extra_data = {
+    'store': {
+        'vote_count': 2,
+        'choices': {
+            'raccoon': {
+                'choice_count': 2,
+                'answers_howmany': {'1': 1.0, '2': 1.0},
+                'answers_doing': {'grooming': 1.0, 'standing': 1.0},
+                'answers_wow': {'wow': 1.0}
+            }
+        }
+    }
+}
+
+reduced_data = {
+    'choices': [
+        {
+            'choice': 'raccoon',
+            'total_vote_count': 4,
+            'choice_count': 3,
+            'answers_howmany': {'1': 2.0, '2': 1.0},
+            'answers_doing': {'grooming': 1.0, 'standing': 1.0},
+            'answers_wow': {'wow': 1.0}
+        },
+        {
+            'choice': 'blackbear',
+            'total_vote_count': 4,
+            'choice_count': 1,
+            'answers_howmany': {'1': 1.0},
+            'answers_doing': {'interacting': 1.0, 'grooming': 1.0}
+        }
+    ],
+    '_store': {
+        'vote_count': 4,
+        'choices': {
+            'raccoon': {
+                'choice_count': 3,
+                'answers_howmany': {'1': 2.0, '2': 1.0},
+                'answers_doing': {'grooming': 1.0, 'standing': 1.0},
+                'answers_wow': {'wow': 1.0}
+            },
+            'blackbear': {
+                'choice_count': 1,
+                'answers_howmany': {'1': 1.0},
+                'answers_doing': {'interacting': 1.0, 'grooming': 1.0}
+            }
+        }
+    }
+}
+
+TestSurveyRunningReducer = RunningReducerTestNoProcessing(
+    survey_reducer_rr,
+    extracted_data[2:],
+    reduced_data,
+    'Test survey running reducer',
+    network_kwargs=kwargs_extra_data,
+    test_name='TestSurveyRunningReducer'
+)
+
+
+class TestSurveyRunningReducerMatchesReducer(unittest.TestCase):
+    def test_one_at_a_time(self):
+        '''Test folding in one extract at a time matches the survey reducer'''
+        store = {}
+        for extract in extracted_data:
+            running = survey_reducer_rr([copy.deepcopy(extract)], store=store, no_version=True)
+            store = running['_store']
+        expected = survey_reducer(copy.deepcopy(extracted_data), no_version=True)
+        self.assertEqual(running['choices'], expected)
@@ -35,9 +35,25 @@ class TestAggregationParser(unittest.TestCase):
             verbose=False,
             output_name='extractions',
             cpu_count=1,
-            hide_progressbar=False
+            hide_progressbar=False,
+            output_format='csv',
+            stream=False
         )
 
+    @patch('panoptes_aggregation.scripts.aggregation_parser.argparse.FileType')
+    @patch('panoptes_aggregation.scripts.extract_csv')
+    def test_extract_called_stream(self, mock_extract_csv, mock_FileType):
+        '''Test panoptes_aggregation extract passes the stream flag to extract_csv'''
+        panoptes_aggregation.scripts.parser_main(['extract', 'file_in_1', 'file_in_2', '-s'])
+        self.assertTrue(mock_extract_csv.call_args.kwargs['stream'])
+
+    @patch('panoptes_aggregation.scripts.aggregation_parser.argparse.FileType')
+    @patch('panoptes_aggregation.scripts.extract_csv')
+    def test_extract_called_parquet(self, mock_extract_csv, mock_FileType):
+        '''Test panoptes_aggregation extract passes the output format to extract_csv'''
+        panoptes_aggregation.scripts.parser_main(['extract', 'file_in_1', 'file_in_2', '-f', 'parquet'])
+        self.assertEqual(mock_extract_csv.call_args.kwargs['output_format'], 'parquet')
+
     @patch('panoptes_aggregation.scripts.aggregation_parser.argparse.FileType')
     @patch('panoptes_aggregation.scripts.reduce_csv')
     def test_reduce_called(self, mock_reduce_csv, mock_FileType):
@@ -52,5 +68,6 @@ class TestAggregationParser(unittest.TestCase):
             stream=False,
             output_name='reductions',
             cpu_count=1,
-            hide_progressbar=False
+            hide_progressbar=False,
+            output_format='csv'
         )
@@ -2,7 +2,9 @@ import unittest
 from unittest.mock import patch, MagicMock, call
 from io import StringIO
 import os
+import packaging.version
 import pandas
+import tempfile
 from pandas.testing import assert_frame_equal
 import panoptes_aggregation.scripts.extract_panoptes_csv as extract_panoptes_csv
 import panoptes_aggregation.scripts.batch_utils as batch_utils
@@ -158,6 +160,13 @@ class TestExtractCSV(unittest.TestCase):
 
         self.config_yaml_fail = StringIO(extractor_config_yaml_fail)
 
+    def test_parse_json_column(self):
+        '''Test decoding a column of JSON strings'''
+        column = pandas.Series(['[{"task": "T0"}]', '{}', '{"value": NaN}'])
+        result = batch_utils.parse_json_column(column)
+        self.assertEqual(result[:2], [[{'task': 'T0'}], {}])
+        self.assertTrue(pandas.isnull(result[2]['value']))
+
     @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
     @patch('panoptes_aggregation.scripts.extract_panoptes_csv.pandas.DataFrame.to_csv')
     @patch.dict('panoptes_aggregation.scripts.batch_utils.extractors.extractors', mock_extractors_dict)
@@ -181,6 +190,31 @@ class TestExtractCSV(unittest.TestCase):
         assert_frame_equal(result_dataframe, self.extracts_dataframe_question, check_like=True)
         mock_to_csv.assert_called_once_with(output_path, index=False, encoding='utf-8')
 
+    @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
+    @patch('panoptes_aggregation.scripts.extract_panoptes_csv.pandas.DataFrame.to_csv')
+    @patch('panoptes_aggregation.scripts.extract_panoptes_csv.write_parquet')
+    @patch.dict('panoptes_aggregation.scripts.batch_utils.extractors.extractors', mock_extractors_dict)
+    def test_extract_csv_object_parquet(self, mock_write_parquet, mock_to_csv, *_):
+        '''Test one (object) extractor makes one parquet file'''
+        mock_question_extractor.side_effect = [
+            {'yes': 1},
+            {'blue': 1, 'green': 1},
+            {'no': 1},
+            {}
+        ]
+        output_file_names = extract_panoptes_csv.extract_csv(
+            self.classification_data_dump_two_tasks,
+            self.config_yaml_question,
+            cpu_count=1,
+            output_format='parquet'
+        )
+        output_path = os.path.join(os.getcwd(), 'question_extractor_extractions.parquet')
+        self.assertEqual(output_file_names, [output_path])
+        result_dataframe, result_path = mock_write_parquet.call_args.args
+        self.assertEqual(result_path, output_path)
+        assert_frame_equal(result_dataframe, self.extracts_dataframe_question, check_like=True)
+        mock_to_csv.assert_not_called()
+
     @unittest.skipIf(WINDOWS, 'Installed on windows, skipping multi core test')
     @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
     @patch('panoptes_aggregation.scripts.extract_panoptes_csv.pandas.DataFrame.to_csv')
@@ -235,6 +269,119 @@ class TestExtractCSV(unittest.TestCase):
         assert_frame_equal(result_dataframe, self.extracts_dataframe_question_min, check_like=True)
         mock_to_csv.assert_called_once_with(output_path, index=False, encoding='utf-8')
 
+    @patch.dict('panoptes_aggregation.scripts.batch_utils.extractors.extractors', mock_extractors_dict)
+    def test_extract_csv_stream(self):
+        '''Test extracting in chunks makes the same csv file and removes the checkpoint'''
+        mock_question_extractor.side_effect = [
+            {'yes': 1},
+            {'blue': 1, 'green': 1},
+            {'yes': 1},
+            {'blue': 1, 'green': 1},
+            {'no': 1},
+            {}
+        ]
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_file_names = extract_panoptes_csv.extract_csv(
+                self.classification_data_dump_two_tasks,
+                self.config_yaml_question_min,
+                output_dir=output_dir,
+                hide_progressbar=True,
+                stream=True,
+                stream_chunk_size=1
+            )
+            output_path = os.path.join(output_dir, 'question_extractor_extractions.csv')
+            self.assertEqual(output_file_names, [output_path])
+            self.assertEqual(os.listdir(output_dir), ['question_extractor_extractions.csv'])
+            result_dataframe = pandas.read_csv(output_path)
+        assert_frame_equal(result_dataframe, self.extracts_dataframe_question_min, check_like=True)
+
+    @patch.dict('panoptes_aggregation.scripts.batch_utils.extractors.extractors', mock_extractors_dict)
+    def test_extract_csv_stream_resume(self):
+        '''Test a stopped stream extraction resumes after the last checkpoint'''
+        batch_extract = extract_panoptes_csv.batch_extract
+
+        def stop_on_second_chunk(chunk, *args, **kwargs):
+            if chunk.classification_id.iloc[0] == 3:
+                raise RuntimeError('stopped')
+            return batch_extract(chunk, *args, **kwargs)
+
+        mock_question_extractor.side_effect = [
+            {'yes': 1},
+            {'blue': 1, 'green': 1}
+        ]
+        with tempfile.TemporaryDirectory() as output_dir:
+            with patch('panoptes_aggregation.scripts.extract_panoptes_csv.batch_extract', stop_on_second_chunk):
+                with self.assertRaises(RuntimeError):
+                    extract_panoptes_csv.extract_csv(
+                        self.classification_data_dump_two_tasks,
+                        self.config_yaml_question_min,
+                        output_dir=output_dir,
+                        hide_progressbar=True,
+                        stream=True,
+                        stream_chunk_size=1
+                    )
+            self.assertTrue(os.path.isfile(os.path.join(output_dir, 'extractions_checkpoint.json')))
+            # only the classifications after the checkpoint are extracted again
+            mock_question_extractor.reset_mock()
+            mock_question_extractor.side_effect = [
+                {'yes': 1},
+                {'blue': 1, 'green': 1},
+                {'no': 1},
+                {}
+            ]
+            output_file_names = extract_panoptes_csv.extract_csv(
+                StringIO(classification_data_dump_two_tasks),
+                StringIO(extractor_config_yaml_question_min),
+                output_dir=output_dir,
+                hide_progressbar=True,
+                stream=True,
+                stream_chunk_size=1
+            )
+            self.assertEqual(mock_question_extractor.call_count, 4)
+            result_dataframe = pandas.read_csv(output_file_names[0])
+        assert_frame_equal(result_dataframe, self.extracts_dataframe_question_min, check_like=True)
+
+    @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
+    @patch('panoptes_aggregation.scripts.extract_panoptes_csv.pandas.DataFrame.to_csv')
+    @patch.dict('panoptes_aggregation.scripts.batch_utils.extractors.extractors', mock_extractors_dict)
+    @patch('panoptes_aggregation.scripts.batch_utils.flatten_data', CaptureValues(batch_utils.flatten_data))
+    def test_extract_csv_object_min_version_chunked(self, mock_to_csv, *_):
+        '''Test one (object) extractor makes one csv file when the classifications are read in chunks'''
+        mock_question_extractor.side_effect = [
+            {'yes': 1},
+            {'blue': 1, 'green': 1},
+            {'yes': 1},
+            {'blue': 1, 'green': 1},
+            {'no': 1},
+            {}
+        ]
+        output_file_names = extract_panoptes_csv.extract_csv(
+            self.classification_data_dump_two_tasks,
+            self.config_yaml_question_min,
+            cpu_count=1,
+            chunk_size=1
+        )
+        output_path = os.path.join(os.getcwd(), 'question_extractor_extractions.csv')
+        self.assertEqual(output_file_names, [output_path])
+        result_dataframe = batch_utils.flatten_data.return_values[0]
+        assert_frame_equal(result_dataframe, self.extracts_dataframe_question_min, check_like=True)
+        mock_to_csv.assert_called_once_with(output_path, index=False, encoding='utf-8')
+
+    def test_read_classifications(self):
+        '''Test reading classifications in chunks only keeps matching rows'''
+        version_range = {
+            'min': packaging.version.parse('14.1'),
+            'max': packaging.version.parse('14.1')
+        }
+        classifications, counts = extract_panoptes_csv.read_classifications(
+            self.classification_data_dump_two_tasks,
+            4249,
+            version_range,
+            chunk_size=3
+        )
+        self.assertEqual(classifications.classification_id.tolist(), [2])
+        self.assertEqual(counts, {'workflow': 4, 'version': 1, 'both': 1})
+
     @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
     @patch('panoptes_aggregation.scripts.extract_panoptes_csv.pandas.DataFrame.to_csv')
     @patch.dict('panoptes_aggregation.scripts.batch_utils.extractors.extractors', mock_extractors_dict)
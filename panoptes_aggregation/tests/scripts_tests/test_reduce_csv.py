@@ -1,12 +1,23 @@
 import unittest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, MagicMock
 from io import StringIO
+import json
 import os
+import numpy
 import pandas
+import yaml
 from pandas.testing import assert_frame_equal
 import panoptes_aggregation.scripts.reduce_panoptes_csv as reduce_panoptes_csv
 import panoptes_aggregation.scripts.batch_utils as batch_utils
 import multiprocessing
+import tempfile
+
+try:
+    import pyarrow  # noqa: F401
+    from panoptes_aggregation.parquet_utils import read_parquet, write_parquet
+    NO_PYARROW = False
+except ImportError:
+    NO_PYARROW = True
 
 extracted_csv_question = '''classification_id,user_name,user_id,workflow_id,task,created_at,subject_id,extractor,data.blue,data.green,data.no,data.yes
 1,1,1,4249,T0,2017-05-31 12:33:46 UTC,1,question_extractor,,,,1.0
@@ -54,6 +65,46 @@ reduced_csv_survey = '''subject_id,workflow_id,task,reducer,data.choice,data.tot
 '''
 
 
+extracted_point = pandas.DataFrame({
+    'classification_id': [1, 2, 3, 4, 5, 5],
+    'user_name': ['a', 'b', 'c', 'a', 'b', 'b'],
+    'user_id': [1, 2, 3, 1, 2, 2],
+    'workflow_id': 4249,
+    'task': 'T0',
+    'created_at': [
+        '2017-05-31 12:33:46 UTC',
+        '2017-05-31 12:33:47 UTC',
+        '2017-05-31 12:33:48 UTC',
+        '2017-05-31 12:33:49 UTC',
+        '2017-05-31 12:33:50 UTC',
+        '2017-05-31 12:33:50 UTC'
+    ],
+    'subject_id': [1, 1, 1, 2, 2, 2],
+    'extractor': 'point_extractor_by_frame',
+    'data.frame0.T0_tool0_x': [[1.0, 10.0], [1.5, 10.5], [0.5], [3.0], [3.5, 7.0], [3.5, 7.0]],
+    'data.frame0.T0_tool0_y': [[1.0, 10.0], [1.5, 10.2], [0.8], [3.0], [2.5, 1.0], [2.5, 1.0]]
+})
+
+reducer_config_yaml_point = '''{'reducer_config': {'point_reducer_dbscan': {'eps': 2, 'min_samples': 2}}}'''
+
+
+def extract_rows_from_dataframe(extracted_dataframe):
+    '''Make the extract rows `batch_extract` gives with `flatten=False`'''
+    info = extracted_dataframe[[name for name in extracted_dataframe.columns if not name.startswith('data.')]]
+    data = batch_utils.unflatten_dataframe(extracted_dataframe)
+    return [dict(row, data=row_data) for row, row_data in zip(info.to_dict('records'), data)]
+
+
+def double_chunk(chunk):
+    return [2 * i for i in chunk]
+
+
+def failing_chunk(chunk):
+    if 50 in chunk:
+        raise ValueError('bad task')
+    return double_chunk(chunk)
+
+
 class CaptureValues(object):
     def __init__(self, func):
         self.func = func
@@ -106,6 +157,15 @@ mock_survey_reducer.side_effect = [
     ]
 ]
 
+
+def stream_question_answer(data, **kwargs):
+    if 'yes' in data[0]:
+        return {'yes': 1, 'no': 1}
+    return {'blue': 1, 'green': 1}
+
+
+stream_question_reducer = MagicMock(side_effect=stream_question_answer)
+
 mock_reducers_dict = {
     'question_reducer': mock_question_reducer,
     'survey_reducer': mock_survey_reducer
@@ -159,6 +219,128 @@ class TestReduceCSV(unittest.TestCase):
         )
         mock_progress_bar.assert_not_called()
 
+    def test_chunks(self):
+        '''Test splitting an iterable into chunks'''
+        result = list(batch_utils.chunks(range(7), 3))
+        self.assertEqual(result, [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_submit_chunked(self):
+        '''Test chunked submission to a pool returns every result'''
+        start_method = multiprocessing.get_start_method()
+        multiprocessing.set_start_method('fork', force=True)
+        results = []
+        with multiprocessing.Pool(2) as pool:
+            batch_utils.submit_chunked(
+                pool,
+                double_chunk,
+                iter(range(100)),
+                results.append,
+                chunk_size=7,
+                max_in_flight=2
+            )
+        self.assertEqual(sorted(results), [2 * i for i in range(100)])
+        multiprocessing.set_start_method(start_method, force=True)
+
+    def test_submit_chunked_error(self):
+        '''Test an error in a chunk is raised rather than the chunk being dropped'''
+        start_method = multiprocessing.get_start_method()
+        multiprocessing.set_start_method('fork', force=True)
+        results = []
+        try:
+            with multiprocessing.Pool(2) as pool:
+                with self.assertRaises(ValueError):
+                    batch_utils.submit_chunked(
+                        pool,
+                        failing_chunk,
+                        iter(range(100)),
+                        results.append,
+                        chunk_size=7,
+                        max_in_flight=2
+                    )
+        finally:
+            multiprocessing.set_start_method(start_method, force=True)
+
+    def test_worker_pool_reuses_pool(self):
+        '''Test an existing pool is used and left open'''
+        pool = MagicMock()
+        with batch_utils.worker_pool(2, pool=pool) as active_pool:
+            self.assertIs(active_pool, pool)
+        pool.close.assert_not_called()
+        pool.terminate.assert_not_called()
+
+    @patch('panoptes_aggregation.scripts.batch_utils.Pool')
+    def test_worker_pool_new_pool(self, mock_pool):
+        '''Test a new pool is started and closed when none is given'''
+        new_pool = mock_pool.return_value.__enter__.return_value
+        with batch_utils.worker_pool(2) as active_pool:
+            self.assertIs(active_pool, new_pool)
+        mock_pool.assert_called_once_with(2)
+        new_pool.close.assert_called_once()
+        new_pool.join.assert_called_once()
+
+    def test_partition_extracts(self):
+        '''Test partitioning extracts by subject and task'''
+        extracted_dataframe = pandas.read_csv(self.extracted_csv_question, parse_dates=['created_at'])
+        extracted_dataframe.sort_values(['subject_id', 'created_at'], inplace=True)
+        partitions = list(batch_utils.partition_extracts(extracted_dataframe, [1, 2], ['T0', 'T1', 'T2']))
+        self.assertEqual([(s, t) for s, t, _ in partitions], [
+            (1, 'T0'), (1, 'T1'), (1, 'T2'),
+            (2, 'T0'), (2, 'T1'), (2, 'T2')
+        ])
+        for subject, task, result in partitions:
+            with self.subTest(subject=subject, task=task):
+                idx = (extracted_dataframe.subject_id == subject) & (extracted_dataframe.task == task)
+                assert_frame_equal(result, extracted_dataframe[idx])
+
+    def test_partition_extract_rows(self):
+        '''Test partitioning extract rows by subject and task'''
+        extract_rows = extract_rows_from_dataframe(self.extracted_dataframe_question)
+        partitions = list(batch_utils.partition_extract_rows(extract_rows[::-1]))
+        self.assertEqual([(s, t) for s, t, _ in partitions], [
+            (1, 'T1'), (1, 'T0'),
+            (2, 'T1'), (2, 'T0')
+        ])
+        for subject, task, rows in partitions:
+            with self.subTest(subject=subject, task=task):
+                expected = [row for row in extract_rows if (row['subject_id'] == subject) and (row['task'] == task)]
+                self.assertEqual(rows, expected)
+
+    def test_drop_duplicate_extracts(self):
+        '''Test repeated extract rows are dropped'''
+        extract_rows = extract_rows_from_dataframe(extracted_point.assign(user_id=numpy.nan))
+        result = batch_utils.drop_duplicate_extracts(extract_rows)
+        self.assertEqual(result, extract_rows[:-1])
+
+    def test_batch_reduce_extracts(self):
+        '''Test reducing extract rows gives the same reductions as the flattened extracts'''
+        tests = [
+            (self.extracted_dataframe_question, reducer_config_yaml_question),
+            (pandas.read_csv(StringIO(extracted_csv_survey)), reducer_config_yaml_survey),
+            (extracted_point, reducer_config_yaml_point)
+        ]
+        for extracted_dataframe, config_yaml in tests:
+            config = yaml.load(config_yaml, Loader=yaml.SafeLoader)
+            with self.subTest(reducer=list(config['reducer_config'])[0]):
+                extract_rows = extract_rows_from_dataframe(extracted_dataframe)
+                expected = batch_utils.batch_reduce(extracted_dataframe.copy(), config, hide_progressbar=True)
+                result = batch_utils.batch_reduce_extracts(extract_rows, config, hide_progressbar=True)
+                assert_frame_equal(result, expected)
+                # the extracts are not changed
+                self.assertEqual(extract_rows, extract_rows_from_dataframe(extracted_dataframe))
+
+    @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
+    def test_batch_reduce_extracts_multi(self, mock_pbar):
+        '''Test reducing extract rows with cpu_count=2'''
+        start_method = multiprocessing.get_start_method()
+        multiprocessing.set_start_method('fork', force=True)
+        config = yaml.load(reducer_config_yaml_question, Loader=yaml.SafeLoader)
+        extract_rows = extract_rows_from_dataframe(self.extracted_dataframe_question)
+        result = batch_utils.batch_reduce_extracts(extract_rows, config, cpu_count=2)
+        expected = batch_utils.batch_reduce(self.extracted_dataframe_question.copy(), config, hide_progressbar=True)
+        assert_frame_equal(result, expected)
+        mock_pbar.return_value.finish.assert_called_once()
+        multiprocessing.set_start_method(start_method, force=True)
+
     @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
     @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.pandas.DataFrame.to_csv')
     @patch.dict('panoptes_aggregation.scripts.batch_utils.reducers.reducers', mock_reducers_dict)
@@ -204,102 +386,153 @@ class TestReduceCSV(unittest.TestCase):
         # set back to default
         multiprocessing.set_start_method(start_method, force=True)
 
-    @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
-    @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.pandas.DataFrame.to_csv')
-    @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.pandas.read_csv')
-    @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.os.path.isfile')
-    @patch.dict('panoptes_aggregation.scripts.batch_utils.reducers.reducers', mock_reducers_dict)
-    @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.flatten_data', CaptureValues(batch_utils.flatten_data))
-    def test_reduce_csv_stream(self, mock_is_file, mock_read_csv, mock_to_csv, mock_pbar):
-        '''Test streaming object reducer makes one csv file'''
-        mock_is_file.return_value = False
-        mock_read_csv.side_effect = [
-            self.extracted_dataframe_question,
-            self.reduced_dataframe_question_stream
-        ]
-        output_file_name = reduce_panoptes_csv.reduce_csv(
-            self.extracted_csv_question,
-            self.config_yaml_question,
-            filter='all',
-            stream=True,
-            cpu_count=1
-        )
-        output_path = os.path.join(os.getcwd(), 'question_reducer_reductions.csv')
-        mock_is_file.assert_called_once_with(output_path)
-        self.assertEqual(output_file_name, output_path)
-        to_csv_calls = [
-            call(output_path, mode='w', index=False, encoding='utf-8'),
-            call(output_path, mode='a', index=False, header=False, encoding='utf-8'),
-            call(output_path, mode='a', index=False, header=False, encoding='utf-8'),
-            call(output_path, mode='a', index=False, header=False, encoding='utf-8'),
-            call(output_path, index=False, encoding='utf-8')
-        ]
-        mock_to_csv.assert_has_calls(to_csv_calls, any_order=False)
-        mock_read_csv.assert_has_calls([call(output_path, encoding='utf-8')])
-        result_dataframe = reduce_panoptes_csv.flatten_data.return_values[0]
+    @patch.dict('panoptes_aggregation.scripts.batch_utils.reducers.reducers', {'question_reducer': stream_question_reducer})
+    def test_reduce_csv_stream(self):
+        '''Test streaming object reducer makes one csv file and removes the index'''
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_file_name = reduce_panoptes_csv.reduce_csv(
+                self.extracted_csv_question,
+                self.config_yaml_question,
+                filter='all',
+                output_dir=output_dir,
+                stream=True,
+                cpu_count=1,
+                hide_progressbar=True
+            )
+            output_path = os.path.join(output_dir, 'question_reducer_reductions.csv')
+            self.assertEqual(output_file_name, output_path)
+            self.assertEqual(os.listdir(output_dir), ['question_reducer_reductions.csv'])
+            result_dataframe = pandas.read_csv(output_path)
         assert_frame_equal(result_dataframe, self.reduced_dataframe_question, check_like=True)
 
-    @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
-    @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.pandas.DataFrame.to_csv')
-    @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.pandas.read_csv')
-    @patch('panoptes_aggregation.scripts.batch_utils.os.path.isfile')
-    @patch('panoptes_aggregation.scripts.batch_utils.open')
-    @patch.dict('panoptes_aggregation.scripts.batch_utils.reducers.reducers', mock_reducers_dict)
-    @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.flatten_data', CaptureValues(batch_utils.flatten_data))
-    def test_reduce_csv_stream_resume(self, mock_open, mock_is_file, mock_read_csv, mock_to_csv, mock_pbar):
-        '''Test resuming works'''
-        mock_is_file.return_value = True
-        mock_read_csv.side_effect = [
-            self.extracted_dataframe_question,
-            self.reduced_dataframe_question_stream_partial,
-            self.reduced_dataframe_question_stream
-        ]
-        output_file_name = reduce_panoptes_csv.reduce_csv(
-            self.extracted_csv_question,
-            self.config_yaml_question,
-            filter='all',
-            stream=True,
-            cpu_count=1
-        )
-        output_path = os.path.join(os.getcwd(), 'question_reducer_reductions.csv')
-        mock_is_file.assert_called_once_with(output_path)
-        self.assertEqual(output_file_name, output_path)
-        to_csv_calls = [
-            call(output_path, mode='a', index=False, header=False, encoding='utf-8'),
-            call(output_path, index=False, encoding='utf-8')
-        ]
-        mock_to_csv.assert_has_calls(to_csv_calls, any_order=False)
-        mock_read_csv.assert_has_calls([call(output_path, encoding='utf-8')])
-        result_dataframe = reduce_panoptes_csv.flatten_data.return_values[0]
-        assert_frame_equal(result_dataframe, self.reduced_dataframe_question, check_like=True)
+    @patch.dict('panoptes_aggregation.scripts.batch_utils.reducers.reducers', {'question_reducer': stream_question_reducer})
+    def test_batch_reduce_stream_flush(self):
+        '''Test the streamed rows are written in batches and indexed'''
+        extracted_dataframe = pandas.read_csv(self.extracted_csv_question, parse_dates=['created_at'])
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_path = os.path.join(output_dir, 'reductions.csv')
+            with patch('panoptes_aggregation.scripts.batch_utils.pandas.DataFrame.to_csv', autospec=True) as mock_to_csv:
+                batch_utils.batch_reduce(
+                    extracted_dataframe,
+                    {'reducer_config': {'question_reducer': {}}},
+                    stream=True,
+                    output_path=output_path,
+                    hide_progressbar=True,
+                    flush_size=3
+                )
+            self.assertEqual([len(c.args[0]) for c in mock_to_csv.call_args_list], [3, 1])
+            self.assertEqual([c.kwargs['header'] for c in mock_to_csv.call_args_list], [True, False])
+            with open(batch_utils.stream_index_path(output_path), 'r', encoding='utf-8') as index_file:
+                index = [json.loads(line) for line in index_file]
+        self.assertEqual([entry['subject_id'] for entry in index], [[1, 1, 2], [2]])
+        self.assertEqual([entry['task'] for entry in index], [['T0', 'T1', 'T0'], ['T1']])
 
-    @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
-    @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.pandas.DataFrame.to_csv')
-    @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.pandas.read_csv')
-    @patch('panoptes_aggregation.scripts.batch_utils.os.path.isfile')
-    @patch('panoptes_aggregation.scripts.batch_utils.open')
-    @patch.dict('panoptes_aggregation.scripts.batch_utils.reducers.reducers', mock_reducers_dict)
-    @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.flatten_data', CaptureValues(batch_utils.flatten_data))
-    def test_reduce_csv_stream_resume_nothing_new_to_do(self, mock_open, mock_is_file, mock_read_csv, mock_to_csv, mock_pbar):
-        '''Test resuming a finished file does not change it'''
-        mock_is_file.return_value = True
-        mock_read_csv.side_effect = [
-            self.extracted_dataframe_question,
-            self.reduced_dataframe_question,
-            self.reduced_dataframe_question
-        ]
-        output_file_name = reduce_panoptes_csv.reduce_csv(
-            self.extracted_csv_question,
-            self.config_yaml_question,
-            filter='all',
-            stream=True,
-            cpu_count=1
-        )
-        output_path = os.path.join(os.getcwd(), 'question_reducer_reductions.csv')
-        mock_is_file.assert_called_once_with(output_path)
-        self.assertEqual(output_file_name, output_path)
-        mock_read_csv.assert_has_calls([call(output_path, encoding='utf-8')])
-        mock_to_csv.assert_not_called()
+    @patch.dict('panoptes_aggregation.scripts.batch_utils.reducers.reducers', {'question_reducer': stream_question_reducer})
+    def test_batch_reduce_stream_resume(self):
+        '''Test resuming skips the indexed pairs and removes rows written after the index'''
+        extracted_dataframe = pandas.read_csv(self.extracted_csv_question, parse_dates=['created_at'])
+        config = {'reducer_config': {'question_reducer': {}}}
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_path = os.path.join(output_dir, 'reductions.csv')
+            index_path = batch_utils.stream_index_path(output_path)
+            batch_utils.batch_reduce(
+                extracted_dataframe.copy(),
+                config,
+                stream=True,
+                output_path=output_path,
+                hide_progressbar=True,
+                flush_size=2
+            )
+            assert_frame_equal(pandas.read_csv(output_path), self.reduced_dataframe_question_stream)
+            with open(output_path, 'r', encoding='utf-8') as output_file:
+                expected = output_file.read()
+            # stop after the first subject with a row written but not indexed
+            with open(index_path, 'r', encoding='utf-8') as index_file:
+                first_line = index_file.readline()
+            with open(index_path, 'w', encoding='utf-8') as index_file:
+                index_file.write(first_line + '{"offset": ')
+            with open(output_path, 'r+', encoding='utf-8') as output_file:
+                output_file.truncate(json.loads(first_line)['offset'])
+                output_file.seek(0, os.SEEK_END)
+                output_file.write('2,4249,T0,question_reducer,{}\n')
+            stream_question_reducer.reset_mock()
+            with patch('panoptes_aggregation.scripts.batch_utils.pandas.read_csv') as mock_read_csv:
+                batch_utils.batch_reduce(
+                    extracted_dataframe.copy(),
+                    config,
+                    stream=True,
+                    output_path=output_path,
+                    hide_progressbar=True
+                )
+            mock_read_csv.assert_not_called()
+            self.assertEqual(stream_question_reducer.call_count, 2)
+            with open(output_path, 'r', encoding='utf-8') as output_file:
+                self.assertEqual(output_file.read(), expected)
+            # nothing is left to do once every pair is in the index
+            stream_question_reducer.reset_mock()
+            batch_utils.batch_reduce(
+                extracted_dataframe.copy(),
+                config,
+                stream=True,
+                output_path=output_path,
+                hide_progressbar=True
+            )
+            stream_question_reducer.assert_not_called()
+            with open(output_path, 'r', encoding='utf-8') as output_file:
+                self.assertEqual(output_file.read(), expected)
+
+    @patch.dict('panoptes_aggregation.scripts.batch_utils.reducers.reducers', {'question_reducer': stream_question_reducer})
+    def test_batch_reduce_stream_index_without_csv(self):
+        '''Test an index left after its csv was removed does not skip any pairs'''
+        extracted_dataframe = pandas.read_csv(self.extracted_csv_question, parse_dates=['created_at'])
+        config = {'reducer_config': {'question_reducer': {}}}
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_path = os.path.join(output_dir, 'reductions.csv')
+            index_path = batch_utils.stream_index_path(output_path)
+            batch_utils.batch_reduce(
+                extracted_dataframe.copy(),
+                config,
+                stream=True,
+                output_path=output_path,
+                hide_progressbar=True,
+                flush_size=2
+            )
+            os.remove(output_path)
+            stream_question_reducer.reset_mock()
+            batch_utils.batch_reduce(
+                extracted_dataframe.copy(),
+                config,
+                stream=True,
+                output_path=output_path,
+                hide_progressbar=True,
+                flush_size=2
+            )
+            self.assertEqual(stream_question_reducer.call_count, 4)
+            assert_frame_equal(pandas.read_csv(output_path), self.reduced_dataframe_question_stream)
+            with open(index_path, 'r', encoding='utf-8') as index_file:
+                index = [json.loads(line) for line in index_file]
+        self.assertEqual([entry['subject_id'] for entry in index], [[1, 1], [2, 2]])
+
+    @patch.dict('panoptes_aggregation.scripts.batch_utils.reducers.reducers', {'question_reducer': stream_question_reducer})
+    def test_reduce_csv_stream_resume_without_index(self):
+        '''Test resuming a csv streamed without an index'''
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_path = os.path.join(output_dir, 'question_reducer_reductions.csv')
+            self.reduced_dataframe_question_stream_partial.to_csv(output_path, index=False, encoding='utf-8')
+            stream_question_reducer.reset_mock()
+            reduce_panoptes_csv.reduce_csv(
+                self.extracted_csv_question,
+                self.config_yaml_question,
+                filter='all',
+                output_dir=output_dir,
+                stream=True,
+                cpu_count=1,
+                hide_progressbar=True
+            )
+            self.assertEqual(stream_question_reducer.call_count, 2)
+            self.assertEqual(os.listdir(output_dir), ['question_reducer_reductions.csv'])
+            result_dataframe = pandas.read_csv(output_path)
+        assert_frame_equal(result_dataframe, self.reduced_dataframe_question, check_like=True)
 
     @patch('panoptes_aggregation.scripts.batch_utils.progressbar.ProgressBar')
     @patch('panoptes_aggregation.scripts.reduce_panoptes_csv.pandas.DataFrame.to_csv')
@@ -318,3 +551,37 @@ class TestReduceCSV(unittest.TestCase):
         result_dataframe = reduce_panoptes_csv.order_columns.return_values[0]
         assert_frame_equal(result_dataframe, self.reduced_dataframe_survey)
         mock_to_csv.assert_called_once_with(output_path, index=False, encoding='utf-8')
+
+    @unittest.skipIf(NO_PYARROW, 'pyarrow is not installed')
+    def test_reduce_parquet(self):
+        '''Test reducing a parquet file gives the same reductions as the csv file'''
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, 'point_extractions.csv')
+            parquet_path = os.path.join(directory, 'point_extractions.parquet')
+            extracted_point.to_csv(csv_path, index=False, encoding='utf-8')
+            write_parquet(extracted_point, parquet_path)
+            output_csv = reduce_panoptes_csv.reduce_csv(
+                csv_path,
+                StringIO(reducer_config_yaml_point),
+                output_dir=directory,
+                output_name='csv',
+                hide_progressbar=True
+            )
+            for stream in [False, True]:
+                with self.subTest(stream=stream):
+                    with open(parquet_path, 'r', encoding='utf-8') as parquet_file:
+                        output_parquet = reduce_panoptes_csv.reduce_csv(
+                            parquet_file,
+                            StringIO(reducer_config_yaml_point),
+                            output_dir=directory,
+                            output_name='parquet',
+                            output_format='parquet',
+                            stream=stream,
+                            hide_progressbar=True
+                        )
+                    self.assertEqual(output_parquet, os.path.join(directory, 'point_reducer_dbscan_parquet.parquet'))
+                    self.assertFalse(os.path.isfile(os.path.join(directory, 'point_reducer_dbscan_parquet.csv')))
+                    expected = batch_utils.unflatten_dataframe(pandas.read_csv(output_csv, encoding='utf-8'))
+                    result = batch_utils.unflatten_dataframe(read_parquet(output_parquet))
+                    self.assertEqual(result, expected)
+                    self.assertEqual(result[0]['frame0']['T0_tool0_cluster_labels'], [0, 1, 0, 1, 0])
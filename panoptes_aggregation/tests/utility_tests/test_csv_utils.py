@@ -49,6 +49,21 @@ flat_data_array = pandas.DataFrame({
 flat_row_array = flat_data_array.iloc[0]
 expected_unflatten_array = {'array': [[137, 592]]}
 
+flat_data_mixed = pandas.DataFrame({
+    'classification_id': [1, 2, 3],
+    'user_id': [1, 2, 3],
+    'data.frame0.T0_tool0_x': ['[1.0, 2.5]', np.nan, '[nan, -3]'],
+    'data.frame0.T0_tool0_details': ["[[{'0': 1}]]", np.nan, '[[{"1": 1}]]'],
+    'data.text': ['5 bags [blue]', 'hello', np.nan],
+    'data.yes': [1.0, np.nan, 1.0]
+})
+
+expected_unflatten_mixed = [
+    {'frame0': {'T0_tool0_x': [1.0, 2.5], 'T0_tool0_details': [[{'0': 1}]]}, 'text': '5 bags [blue]', 'yes': 1.0},
+    {'text': 'hello'},
+    {'frame0': {'T0_tool0_x': [None, -3], 'T0_tool0_details': [[{'1': 1}]]}, 'yes': 1.0}
+]
+
 json_data = pandas.DataFrame({
     'classification_id': [1, 2, 3, 4],
     'data.points': [
@@ -136,6 +151,27 @@ class TestCSVUtils(unittest.TestCase):
         result = csv_utils.unflatten_data(flat_row, renest=False)
         self.assertDictEqual(result, expected_unflatten)
 
+    def test_unflatten_dataframe(self):
+        '''Test unflattening all rows of a dataframe at once'''
+        result = csv_utils.unflatten_dataframe(flat_data_mixed)
+        self.assertEqual(result, expected_unflatten_mixed)
+
+    def test_unflatten_dataframe_matches_rows(self):
+        '''Test unflattening a dataframe matches unflattening each row'''
+        for renest in [True, False]:
+            with self.subTest(renest=renest):
+                result = csv_utils.unflatten_dataframe(flat_data_mixed, renest=renest)
+                expected = [csv_utils.unflatten_data(row, renest=renest) for _, row in flat_data_mixed.iterrows()]
+                self.assertEqual(result, expected)
+
+    def test_parse_literal(self):
+        '''Test literals are parsed without evaluating code'''
+        self.assertEqual(csv_utils.parse_literal('[true, false, null]'), [True, False, None])
+        self.assertEqual(csv_utils.parse_literal("{'a': (1, -2.5), 'b': nan}"), {'a': (1, -2.5), 'b': None})
+        unsafe = "[__import__('os').getcwd()]"
+        self.assertEqual(csv_utils.parse_literal(unsafe), unsafe)
+        self.assertEqual(csv_utils.parse_literal('[NaN]'), '[NaN]')
+
     def test_unjson_dataframe(self):
         '''Test unjson dataframe with `nan` values'''
         csv_utils.unjson_dataframe(json_data)
@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import patch
+import sys
+import types
+from panoptes_aggregation.lazy_registry import LazyRegistry, lazy_package
+
+
+def make_registry():
+    return LazyRegistry(
+        'panoptes_aggregation.reducers',
+        {
+            'question_reducer': 'question_reducer',
+            'consensus': 'question_consensus_reducer:question_consensus_reducer'
+        },
+        aliases={'shortcut': 'question_reducer'}
+    )
+
+
+class TestLazyRegistry(unittest.TestCase):
+    def test_keys(self):
+        '''Test the registry lists every name without importing them'''
+        registry = make_registry()
+        self.assertEqual(list(registry), ['question_reducer', 'consensus', 'shortcut'])
+        self.assertEqual(len(registry), 3)
+        self.assertIn('shortcut', registry)
+        self.assertNotIn('point_reducer', registry)
+        self.assertEqual(registry.loaded(), [])
+
+    def test_getitem(self):
+        '''Test looking up a name imports the function from its module'''
+        from panoptes_aggregation.reducers.question_consensus_reducer import question_consensus_reducer
+        registry = make_registry()
+        self.assertIs(registry['consensus'], question_consensus_reducer)
+        self.assertEqual(registry.loaded(), ['consensus'])
+        with self.assertRaises(KeyError):
+            registry['point_reducer']
+
+    def test_alias(self):
+        '''Test an alias is a renamed copy of the original function'''
+        registry = make_registry()
+        shortcut = registry['shortcut']
+        self.assertEqual(shortcut.__name__, 'shortcut')
+        self.assertIsNot(shortcut, registry['question_reducer'])
+        self.assertIs(shortcut, registry['shortcut'])
+
+    def test_attributes(self):
+        '''Test only functions named after their module are package attributes'''
+        self.assertEqual(make_registry().attributes(), ['question_reducer', 'shortcut'])
+
+    def test_patch_dict(self):
+        '''Test patch.dict restores the registry without importing it'''
+        registry = make_registry()
+        with patch.dict(registry, {'question_reducer': 'mock'}):
+            self.assertEqual(registry['question_reducer'], 'mock')
+        self.assertEqual(registry.loaded(), [])
+        self.assertEqual(list(registry), ['question_reducer', 'consensus', 'shortcut'])
+        self.assertEqual(registry['question_reducer'].__name__, 'question_reducer')
+        with patch.dict(registry, {'new_reducer': 'mock'}, clear=True):
+            self.assertEqual(list(registry), ['new_reducer'])
+        self.assertEqual(list(registry), ['question_reducer', 'consensus', 'shortcut'])
+
+    def test_delitem(self):
+        '''Test removing a name from the registry'''
+        registry = make_registry()
+        del registry['shortcut']
+        self.assertNotIn('shortcut', registry)
+        with self.assertRaises(KeyError):
+            del registry['shortcut']
+
+
+class TestLazyPackage(unittest.TestCase):
+    def setUp(self):
+        self.package = types.ModuleType('lazy_test_package')
+        sys.modules['lazy_test_package'] = self.package
+        lazy_package('lazy_test_package', make_registry())
+
+    def tearDown(self):
+        del sys.modules['lazy_test_package']
+
+    def test_getattr(self):
+        '''Test the package attributes are looked up in the registry'''
+        self.assertEqual(self.package.shortcut.__name__, 'shortcut')
+        self.assertIn('question_reducer', dir(self.package))
+        with self.assertRaises(AttributeError):
+            self.package.point_reducer
+
+    def test_setattr_module(self):
+        '''Test a submodule named after a function does not replace the function'''
+        self.package.question_reducer = types.ModuleType('question_reducer')
+        self.assertEqual(self.package.question_reducer.__name__, 'question_reducer')
+        self.assertTrue(callable(self.package.question_reducer))
+        self.package.other = types.ModuleType('other')
+        self.assertIsInstance(self.package.other, types.ModuleType)
+
+    def test_reducers_package(self):
+        '''Test the reducers package attributes are the reducer functions'''
+        import panoptes_aggregation.reducers.question_reducer  # noqa: F401
+        self.assertIsInstance(panoptes_aggregation.reducers.question_reducer, types.FunctionType)
+        self.assertEqual(panoptes_aggregation.reducers.shortcut_reducer.__name__, 'shortcut_reducer')
+        self.assertEqual(panoptes_aggregation.extractors.shortcut_extractor.__name__, 'shortcut_extractor')
+        self.assertIsInstance(panoptes_aggregation.running_reducers.tess_reducer_column, types.ModuleType)
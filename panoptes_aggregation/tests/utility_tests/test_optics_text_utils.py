@@ -66,6 +66,28 @@ class TextOpticsTextUtils(unittest.TestCase):
                 result = optics_text_utils.metric(a, b, data_in=data)
                 self.assertEqual(result, expected_distances[i])
 
+    def test_metric_matrix(self):
+        '''Test the distance matrix matches the metric for every pair'''
+        X = np.array([[0, 0], [1, 1], [2, 1], [3, 2]])
+        result = optics_text_utils.metric_matrix(X, data_in=data)
+        expected = np.array([[optics_text_utils.metric(a, b, data_in=data) for b in X] for a in X])
+        np.testing.assert_array_equal(result, expected)
+
+    def test_finite_metric_matrix(self):
+        '''Test inf distances are replaced by a value larger than max_eps'''
+        distances = np.array([
+            [0, 2, np.inf],
+            [2, 0, 5],
+            [np.inf, 5, 0]
+        ])
+        result, max_eps = optics_text_utils.finite_metric_matrix(distances)
+        self.assertTrue(np.isfinite(result).all())
+        self.assertTrue(max_eps > 5)
+        self.assertTrue(result[0, 2] > max_eps)
+        result, max_eps = optics_text_utils.finite_metric_matrix(distances, max_eps=3)
+        self.assertEqual(max_eps, 3)
+        self.assertTrue(result[0, 2] > max_eps)
+
     def test_get_min_samples(self):
         '''Test auto values for min_samples'''
         number_users = [2, 7, 11, 16, 21, 24, 40]
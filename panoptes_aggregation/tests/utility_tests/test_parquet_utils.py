@@ -0,0 +1,66 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas
+from pandas.testing import assert_frame_equal
+from panoptes_aggregation.csv_utils import unflatten_dataframe
+
+try:
+    import pyarrow  # noqa: F401
+    from panoptes_aggregation.parquet_utils import is_parquet, read_parquet, write_parquet, JSON_COLUMNS_KEY
+    NO_PYARROW = False
+except ImportError:
+    NO_PYARROW = True
+
+flat_data = pandas.DataFrame({
+    'classification_id': [1, 2, 3],
+    'user_name': ['a', 'b', 'c'],
+    'created_at': ['2017-05-31 12:33:46 UTC'] * 3,
+    'data.frame0.T0_tool0_x': [[1.0, 2.5], [], np.nan],
+    'data.frame0.T0_tool0_y': [[3, 4], [5], np.nan],
+    'data.frame0.T0_tool0_details': [[{'value': 0}, {'value': [1, 2]}], np.nan, [{'other': 'a'}]],
+    'data.yes': [1.0, np.nan, 1.0],
+    'data.value': ['a', 1, np.nan]
+})
+
+
+@unittest.skipIf(NO_PYARROW, 'pyarrow is not installed')
+class TestParquetUtils(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'extractions.parquet')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_is_parquet(self):
+        '''Test parquet files are found from the extension of a path or file'''
+        self.assertTrue(is_parquet('a/b.parquet'))
+        self.assertFalse(is_parquet('a/b.csv'))
+        with open(self.path, 'w') as file:
+            self.assertTrue(is_parquet(file))
+
+    def test_round_trip(self):
+        '''Test a flat DataFrame is the same after writing and reading it'''
+        write_parquet(flat_data, self.path)
+        result = read_parquet(self.path)
+        columns = ['classification_id', 'user_name', 'created_at', 'data.yes']
+        assert_frame_equal(result[columns], flat_data[columns])
+        self.assertEqual(unflatten_dataframe(result), [
+            {'frame0': {'T0_tool0_x': [1.0, 2.5], 'T0_tool0_y': [3, 4], 'T0_tool0_details': [{'value': 0}, {'value': [1, 2]}]}, 'yes': 1.0, 'value': 'a'},
+            {'frame0': {'T0_tool0_x': [], 'T0_tool0_y': [5]}, 'value': 1},
+            {'frame0': {'T0_tool0_details': [{'other': 'a'}]}, 'yes': 1.0}
+        ])
+
+    def test_native_columns(self):
+        '''Test lists of numbers are stored as list columns and only the other columns as JSON'''
+        write_parquet(flat_data, self.path)
+        table = pyarrow.parquet.read_table(self.path)
+        self.assertTrue(pyarrow.types.is_list(table.schema.field('data.frame0.T0_tool0_x').type))
+        self.assertTrue(pyarrow.types.is_list(table.schema.field('data.frame0.T0_tool0_y').type))
+        self.assertEqual(
+            table.schema.metadata[JSON_COLUMNS_KEY],
+            b'["data.frame0.T0_tool0_details", "data.value"]'
+        )
+        self.assertEqual(pyarrow.parquet.ParquetFile(self.path).metadata.row_group(0).column(0).compression, 'ZSTD')
@@ -0,0 +1,139 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import redis
+from panoptes_aggregation.reduction_cache import (
+    reduction_key,
+    MemoryCache,
+    RedisCache,
+    make_reduction_cache
+)
+
+
+class LocalRedis:
+    '''Stand in for a redis client that stores the values in a dictionary'''
+    def __init__(self):
+        self.store = {}
+        self.expires = {}
+
+    def get(self, name):
+        return self.store.get(name)
+
+    def set(self, name, value, px=None):
+        self.store[name] = value.encode('utf-8')
+        self.expires[name] = px
+
+
+class TestReductionKey(unittest.TestCase):
+    def test_same_request(self):
+        '''Test the key does not depend on the order or form of the keywords'''
+        extracts = [{'data': {'yes': 1}}, {'data': {'no': 1}}]
+        key = reduction_key('question_reducer', {'pairs': 'False', 'eps': '5'}, extracts)
+        self.assertEqual(key, reduction_key('question_reducer', {'eps': ['5'], 'pairs': ['False']}, extracts))
+
+    def test_different_request(self):
+        '''Test the key changes with the reducer, keywords, or extracts'''
+        extracts = [{'data': {'yes': 1}}]
+        key = reduction_key('question_reducer', {}, extracts)
+        self.assertNotEqual(key, reduction_key('shortcut_reducer', {}, extracts))
+        self.assertNotEqual(key, reduction_key('question_reducer', {'pairs': 'True'}, extracts))
+        self.assertNotEqual(key, reduction_key('question_reducer', {}, extracts + extracts))
+
+
+class TestMemoryCache(unittest.TestCase):
+    def test_get_set(self):
+        '''Test values are stored and the hits and misses are counted'''
+        cache = MemoryCache()
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', '{"yes": 1}')
+        self.assertEqual(cache.get('a'), '{"yes": 1}')
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'size': 1, 'max_size': 1024})
+
+    def test_lru(self):
+        '''Test the least recently used value is removed when the cache is full'''
+        cache = MemoryCache(max_size=2)
+        cache.set('a', '1')
+        cache.set('b', '2')
+        cache.get('a')
+        cache.set('c', '3')
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), '1')
+        self.assertEqual(cache.get('c'), '3')
+
+    @patch('panoptes_aggregation.reduction_cache.time.monotonic')
+    def test_ttl(self, monotonic):
+        '''Test values expire after the time to live'''
+        cache = MemoryCache(ttl=10)
+        monotonic.return_value = 100
+        cache.set('a', '1')
+        monotonic.return_value = 105
+        self.assertEqual(cache.get('a'), '1')
+        monotonic.return_value = 111
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+
+class TestRedisCache(unittest.TestCase):
+    def test_get_set(self):
+        '''Test values are stored on the server with a prefix and time to live'''
+        client = LocalRedis()
+        cache = RedisCache(client, ttl=60, prefix='test:')
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', '{"yes": 1}')
+        self.assertEqual(client.expires, {'test:a': 60000})
+        self.assertEqual(cache.get('a'), '{"yes": 1}')
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_shared(self):
+        '''Test two caches using the same server share values'''
+        client = LocalRedis()
+        RedisCache(client).set('a', '1')
+        self.assertEqual(RedisCache(client).get('a'), '1')
+
+    def test_fractional_ttl(self):
+        '''Test a time to live under a second is kept in milliseconds'''
+        client = LocalRedis()
+        RedisCache(client, ttl=0.25).set('a', '1')
+        self.assertEqual(client.expires, {'panoptes_aggregation:reduction:a': 250})
+
+    def test_bad_ttl(self):
+        '''Test a time to live that is not positive raises an error'''
+        with self.assertRaises(ValueError):
+            RedisCache(LocalRedis(), ttl=0)
+
+    def test_server_error(self):
+        '''Test a server error is treated as a cache miss'''
+        client = MagicMock()
+        client.get.side_effect = redis.ConnectionError('Connection refused')
+        client.set.side_effect = redis.TimeoutError('Timeout')
+        cache = RedisCache(client)
+        with self.assertLogs('panoptes_aggregation.reduction_cache', level='WARNING'):
+            self.assertIsNone(cache.get('a'))
+            cache.set('a', '1')
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 1})
+
+
+class TestMakeReductionCache(unittest.TestCase):
+    def test_off(self):
+        '''Test no cache is made without a url'''
+        self.assertIsNone(make_reduction_cache(None))
+        self.assertIsNone(make_reduction_cache(''))
+
+    def test_memory(self):
+        '''Test making a memory cache'''
+        cache = make_reduction_cache('memory', max_size=10, ttl=5)
+        self.assertIsInstance(cache, MemoryCache)
+        self.assertEqual(cache.max_size, 10)
+        self.assertEqual(cache.ttl, 5)
+
+    def test_redis(self):
+        '''Test making a redis cache from a url'''
+        cache = make_reduction_cache('redis://localhost:6379/1', ttl=0.5)
+        self.assertIsInstance(cache, RedisCache)
+        self.assertEqual(cache.ttl, 0.5)
+        self.assertEqual(cache.client.connection_pool.connection_kwargs['db'], 1)
+
+    def test_bad_url(self):
+        '''Test an unknown cache raises an error'''
+        with self.assertRaises(ValueError):
+            make_reduction_cache('memcached://localhost')
@@ -1,4 +1,7 @@
 import unittest
+from unittest.mock import patch
+import multiprocessing
+import os
 import numpy as np
 from panoptes_aggregation.reducers import text_utils
 
@@ -62,6 +65,69 @@ class TestTextUtils(unittest.TestCase):
         result = text_utils.gutter([])
         np.testing.assert_equal(result, np.array([]))
 
+    def test_gutter(self):
+        '''Test lines are labeled by the gutter they are in'''
+        lines = [
+            [510, 600, 950],
+            [0, 400],
+            [20, 250, 450],
+            [1100, 1500],
+            [500, 900],
+            [460, 480]
+        ]
+        with self.subTest(tol=0):
+            result = text_utils.gutter(lines)
+            np.testing.assert_equal(result, np.array([2, 0, 0, 3, 2, 1]))
+        with self.subTest(tol=-50):
+            result = text_utils.gutter(lines, tol=-50)
+            np.testing.assert_equal(result, np.array([0, 0, 0, 1, 0, 0]))
+        with self.subTest(tol=30):
+            # the line at [460, 480] is too short to overlap any line, even itself
+            result = text_utils.gutter(lines, tol=30)
+            np.testing.assert_equal(result, np.array([2, 0, 0, 3, 2, -1]))
+
+    def test_gutter_in_order(self):
+        '''Test the gutters found by merging lines in order match the sweep'''
+        rng = np.random.default_rng(1)
+        for i in range(50):
+            with self.subTest(i=i):
+                starts = rng.uniform(0, 1000, 40)
+                lines = np.stack([starts, starts + rng.uniform(50, 300, 40)], axis=1)
+                tol = rng.choice([-20, 0, 20])
+                np.testing.assert_equal(
+                    text_utils.gutter(lines.tolist(), tol=tol),
+                    text_utils._gutter_in_order(lines, tol=tol)
+                )
+
+    @patch.dict(os.environ, {'AGGREGATION_CPU_COUNT': '4'})
+    def test_map_frames(self):
+        '''Test frames reduced in parallel come back in order'''
+        values = [1, 2, 3, 4, 5]
+        for frame_workers in [1, 3, 10]:
+            with self.subTest(frame_workers=frame_workers):
+                result = text_utils.map_frames(pow, values, frame_workers=frame_workers, exp=2)
+                self.assertEqual(result, [1, 4, 9, 16, 25])
+
+    @patch('panoptes_aggregation.reducers.text_utils.multiprocessing.Pool')
+    def test_map_frames_cpu_cap(self, mock_pool):
+        '''Test the number of processes is capped by the available CPUs'''
+        mock_pool.return_value.__enter__.return_value.map.return_value = [1, 4, 9, 16, 25]
+        with patch.dict(os.environ, {'AGGREGATION_CPU_COUNT': '2'}):
+            result = text_utils.map_frames(pow, [1, 2, 3, 4, 5], frame_workers=64, exp=2)
+        mock_pool.assert_called_once_with(2)
+        self.assertEqual(result, [1, 4, 9, 16, 25])
+        with patch.dict(os.environ, {'AGGREGATION_CPU_COUNT': '1'}):
+            result = text_utils.map_frames(pow, [1, 2, 3], frame_workers=64, exp=2)
+        mock_pool.assert_called_once()
+        self.assertEqual(result, [1, 4, 9])
+
+    @patch.dict(os.environ, {'AGGREGATION_CPU_COUNT': '4'})
+    def test_map_frames_in_worker(self):
+        '''Test frames are reduced one at a time inside a worker process'''
+        with multiprocessing.Pool(1) as pool:
+            result = pool.apply(text_utils.map_frames, (pow, [1, 2, 3]), {'frame_workers': 2, 'exp': 2})
+        self.assertEqual(result, [1, 4, 9])
+
     def test_no_consensus(self):
         '''Test empty list passed into consensus_score'''
         result = text_utils.consensus_score([])